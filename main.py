@@ -10,12 +10,14 @@ Modules:
 """
 
 import sys
-import customtkinter as ctk
-from ui.main_window import MainWindow
 from utils.global_config import get_global_config
 
 
 def main():
+    # GUI modules are imported here so loading the entry module stays cheap
+    import customtkinter as ctk
+    from ui.main_window import MainWindow
+
     # 1. Load global configuration
     global_config = get_global_config()
 
@@ -5,9 +5,31 @@ Global Settings Module - UI
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
+import ctypes
+from ctypes import wintypes
 import os
+import queue
+import threading
+import time
+import uuid
 import winreg
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 from utils.i18n import t
+from ui.components.fonts import get_font
+
+
+# Known Folder IDs probed for the Tarkov screenshots folder (in priority order)
+FOLDERID_DOCUMENTS = "{FDD39AD0-238F-46AF-ADB4-6C85480369C7}"
+FOLDERID_PICTURES = "{33E28130-4E1E-4676-835A-98395C3BC3BB}"
+FOLDERID_PUBLIC_DOCUMENTS = "{ED4824AF-DCE4-45A8-81E2-FC7965083634}"
+SCREENSHOT_KNOWN_FOLDERS = (FOLDERID_DOCUMENTS, FOLDERID_PICTURES, FOLDERID_PUBLIC_DOCUMENTS)
+
+# 自动检测结果（包括未找到）的缓存有效期（秒）
+DETECTION_CACHE_TTL = 60.0
+
+# 主线程轮询后台检测结果的间隔（毫秒）
+DETECTION_POLL_MS = 50
 
 
 class GlobalSettingsUI(ctk.CTkFrame):
@@ -24,46 +46,110 @@ class GlobalSettingsUI(ctk.CTkFrame):
         self.screenshots_path = self.global_config.get_screenshots_path()
         self.logs_path = self.global_config.get_logs_path()
 
-        # 如果配置为空,进行自动检测
-        if not self.screenshots_path:
-            self.screenshots_path = self._detect_screenshots_path()
-            self.global_config.set_screenshots_path(self.screenshots_path)
+        self._setup_ui()
+
+        # 如果配置为空,在后台线程自动检测（避免阻塞UI构建）
+        if not self.screenshots_path or not self.logs_path:
+            self._run_detection(self._detect_missing_paths, self._apply_detected_paths)
 
-        if not self.logs_path:
-            self.logs_path = self._detect_logs_path()
-            self.global_config.set_logs_path(self.logs_path)
+    def _run_detection(self, detect, on_result):
+        """
+        在后台线程运行路径检测，主线程用 after 轮询结果
 
-        self._setup_ui()
+        Tk不是线程安全的，工作线程只把结果放进队列，不调用任何Tk方法
+
+        Args:
+            detect: 后台执行的检测函数，返回 (截图路径, 日志路径)
+            on_result: 主线程中以检测结果调用的回调
+        """
+        results = queue.Queue(maxsize=1)
+
+        def worker():
+            try:
+                result = detect()
+            except Exception as e:
+                print(f"[全局设置] 路径检测失败: {e}")
+                result = ("", "")
+            results.put(result)
+
+        def poll():
+            try:
+                result = results.get_nowait()
+            except queue.Empty:
+                self.after(DETECTION_POLL_MS, poll)
+                return
+            on_result(*result)
+
+        threading.Thread(target=worker, daemon=True, name="PathDetection").start()
+        self.after(DETECTION_POLL_MS, poll)
+
+    def _detect_missing_paths(self) -> tuple:
+        """后台检测缺失的路径（工作线程中调用）"""
+        screenshots_path = "" if self.screenshots_path else self._cached_detect(
+            "screenshots_path", self._detect_screenshots_path)
+        logs_path = "" if self.logs_path else self._cached_detect(
+            "logs_path", self._detect_logs_path)
+        return screenshots_path, logs_path
+
+    def _cached_detect(self, path_type: str, detect) -> str:
+        """在缓存有效期内复用上次的检测结果，避免重复探测注册表和磁盘"""
+        cached = self.global_config.get_detection_cache(path_type)
+        if cached is not None and time.time() - cached[1] <= DETECTION_CACHE_TTL:
+            return cached[0]
+
+        path = detect()
+        self.global_config.set_detection_cache(path_type, path, time.time())
+        return path
+
+    def _apply_detected_paths(self, screenshots_path: str, logs_path: str):
+        """应用自动检测到的路径（主线程），不覆盖用户已输入的内容"""
+        if screenshots_path and not self.screenshots_path_entry.get():
+            self.screenshots_path = screenshots_path
+            self.screenshots_path_entry.insert(0, screenshots_path)
+            self.global_config.set_screenshots_path(screenshots_path)
+
+        if logs_path and not self.logs_path_entry.get():
+            self.logs_path = logs_path
+            self.logs_path_entry.insert(0, logs_path)
+            self.global_config.set_logs_path(logs_path)
+
+    @staticmethod
+    def _get_known_folder(folder_id: str) -> str:
+        """通过 SHGetKnownFolderPath 获取已知文件夹路径（支持中文和重定向的文件夹）"""
+        guid = (ctypes.c_byte * 16).from_buffer_copy(uuid.UUID(folder_id).bytes_le)
+        path_ptr = wintypes.LPWSTR()
+        hr = ctypes.windll.shell32.SHGetKnownFolderPath(
+            ctypes.byref(guid), 0, None, ctypes.byref(path_ptr)
+        )
+        try:
+            return path_ptr.value if hr == 0 and path_ptr.value else ""
+        finally:
+            ctypes.windll.ole32.CoTaskMemFree(path_ptr)
 
     def _detect_screenshots_path(self) -> str:
         """
-        自动检测截图路径（支持中文Windows和非标准路径）
+        自动检测截图路径（支持中文Windows和重定向的文件夹）
 
         检测策略：
-        1. Windows Shell API - 获取用户Documents文件夹（支持中文）
+        1. SHGetKnownFolderPath - 获取 Documents / Pictures / Public Documents 下的 Escape from Tarkov\Screenshots
         2. 遍历常见驱动器 - 查找 Escape from Tarkov\Screenshots
         3. 硬编码路径 - 兼容旧逻辑
         """
-        import ctypes.wintypes
-        from ctypes import windll, create_unicode_buffer
-
-        # 策略1: 使用Windows Shell API获取Documents文件夹（截图默认在文档目录）
-        try:
-            # CSIDL_PERSONAL = 0x0005 (My Documents)
-            CSIDL_PERSONAL = 0x05
-            SHGFP_TYPE_CURRENT = 0
-
-            buf = create_unicode_buffer(ctypes.wintypes.MAX_PATH)
-            windll.shell32.SHGetFolderPathW(None, CSIDL_PERSONAL, None, SHGFP_TYPE_CURRENT, buf)
-
-            documents_folder = buf.value
-            tarkov_screenshots = os.path.join(documents_folder, "Escape from Tarkov", "Screenshots")
-
-            if os.path.exists(tarkov_screenshots):
-                print(f"[全局设置] 检测到截图路径（Shell API - Documents）: {tarkov_screenshots}")
-                return tarkov_screenshots
-        except Exception as e:
-            print(f"[全局设置] Shell API检测失败: {e}")
+        folders = []
+        for folder_id in SCREENSHOT_KNOWN_FOLDERS:
+            try:
+                folder = self._get_known_folder(folder_id)
+            except Exception as e:
+                print(f"[全局设置] Shell API检测失败: {e}")
+                continue
+            if folder:
+                folders.append(folder)
+
+        candidates = [os.path.join(folder, "Escape from Tarkov", "Screenshots") for folder in folders]
+        found = [path for path in candidates if os.path.isdir(path)]
+        if found:
+            print(f"[全局设置] 检测到截图路径（Known Folders）: {found[0]}")
+            return found[0]
 
         # 策略2: 遍历常见驱动器查找 Escape from Tarkov\Screenshots
         try:
@@ -105,9 +191,34 @@ class GlobalSettingsUI(ctk.CTkFrame):
         return ""
 
     def _detect_logs_path(self) -> str:
-        """自动检测日志路径"""
+        """
+        自动检测日志路径
+
+        并行探测官方启动器和Steam的注册表项，优先返回已存在的目录；
+        都不存在时按原优先级（官方启动器 > Steam）返回注册表给出的路径
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(self._probe_uninstall_key),
+                executor.submit(self._probe_steam_key)
+            ]
+            for future in as_completed(futures):
+                path = future.result()
+                if path and os.path.isdir(path):
+                    return path
+
+            # 没有已存在的目录，按优先级回退
+            for future in futures:
+                path = future.result()
+                if path:
+                    return path
+
+        return ""
+
+    @staticmethod
+    def _probe_uninstall_key() -> Optional[str]:
+        """从官方启动器的卸载注册表项读取日志路径"""
         try:
-            # 尝试从注册表读取
             key = winreg.OpenKey(
                 winreg.HKEY_LOCAL_MACHINE,
                 r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall\EscapeFromTarkov"
@@ -115,18 +226,22 @@ class GlobalSettingsUI(ctk.CTkFrame):
             install_location = winreg.QueryValueEx(key, "InstallLocation")[0]
             winreg.CloseKey(key)
             return os.path.join(install_location, "Logs")
-        except:
-            try:
-                # 尝试Steam
-                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
-                steam_path = winreg.QueryValueEx(key, "SteamPath")[0]
-                winreg.CloseKey(key)
-                return os.path.join(
-                    steam_path,
-                    "steamapps", "common", "Escape from Tarkov", "build", "Logs"
-                )
-            except:
-                return ""
+        except Exception:
+            return None
+
+    @staticmethod
+    def _probe_steam_key() -> Optional[str]:
+        """从Steam注册表项推导日志路径"""
+        try:
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam")
+            steam_path = winreg.QueryValueEx(key, "SteamPath")[0]
+            winreg.CloseKey(key)
+            return os.path.join(
+                steam_path,
+                "steamapps", "common", "Escape from Tarkov", "build", "Logs"
+            )
+        except Exception:
+            return None
 
     def _setup_ui(self):
         """设置UI"""
@@ -141,14 +256,14 @@ class GlobalSettingsUI(ctk.CTkFrame):
         title_label = ctk.CTkLabel(
             header_frame,
             text=t("global_settings.title"),
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=get_font(size=24, weight="bold")
         )
         title_label.pack(anchor="w")
 
         subtitle_label = ctk.CTkLabel(
             header_frame,
             text=t("global_settings.subtitle"),
-            font=ctk.CTkFont(size=12),
+            font=get_font(size=12),
             text_color="gray60"
         )
         subtitle_label.pack(anchor="w", pady=(5, 0))
@@ -171,7 +286,7 @@ class GlobalSettingsUI(ctk.CTkFrame):
         ctk.CTkLabel(
             path_title_frame,
             text=f"📁 {t('global_settings.sections.paths')}",
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(size=16, weight="bold")
         ).grid(row=0, column=0, sticky="w", padx=15, pady=10)
 
         # 内容框架
@@ -184,7 +299,7 @@ class GlobalSettingsUI(ctk.CTkFrame):
         ctk.CTkLabel(
             content_frame,
             text=t("global_settings.paths.screenshots"),
-            font=ctk.CTkFont(size=13)
+            font=get_font(size=13)
         ).grid(row=row, column=0, sticky="w", padx=10, pady=10)
 
         self.screenshots_path_entry = ctk.CTkEntry(
@@ -209,7 +324,7 @@ class GlobalSettingsUI(ctk.CTkFrame):
         ctk.CTkLabel(
             content_frame,
             text=t("global_settings.paths.logs"),
-            font=ctk.CTkFont(size=13)
+            font=get_font(size=13)
         ).grid(row=row, column=0, sticky="w", padx=10, pady=10)
 
         self.logs_path_entry = ctk.CTkEntry(
@@ -250,7 +365,7 @@ class GlobalSettingsUI(ctk.CTkFrame):
             height=40,
             fg_color="#2d4a5a",
             hover_color="#4a7a8d",
-            font=ctk.CTkFont(size=13, weight="bold")
+            font=get_font(size=13, weight="bold")
         )
         redetect_btn.grid(row=row, column=0, columnspan=3, pady=10)
 
@@ -263,7 +378,7 @@ class GlobalSettingsUI(ctk.CTkFrame):
             height=40,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=13, weight="bold")
+            font=get_font(size=13, weight="bold")
         )
         save_btn.grid(row=row, column=0, columnspan=3, pady=20)
 
@@ -279,12 +394,22 @@ class GlobalSettingsUI(ctk.CTkFrame):
             entry_widget.insert(0, folder)
 
     def _redetect_paths(self):
-        """重新检测截图和日志路径"""
-        # 检测截图路径
-        new_screenshots_path = self._detect_screenshots_path()
-        # 检测日志路径
-        new_logs_path = self._detect_logs_path()
-
+        """重新检测截图和日志路径（后台线程检测，结果由主线程显示）"""
+        def detect():
+            # 用户主动重新检测：跳过缓存，并刷新缓存
+            now = time.time()
+            # 检测截图路径
+            new_screenshots_path = self._detect_screenshots_path()
+            self.global_config.set_detection_cache("screenshots_path", new_screenshots_path, now)
+            # 检测日志路径
+            new_logs_path = self._detect_logs_path()
+            self.global_config.set_detection_cache("logs_path", new_logs_path, now)
+            return new_screenshots_path, new_logs_path
+
+        self._run_detection(detect, self._show_redetect_result)
+
+    def _show_redetect_result(self, new_screenshots_path: str, new_logs_path: str):
+        """显示重新检测的结果"""
         if new_screenshots_path or new_logs_path:
             if new_screenshots_path:
                 self.screenshots_path_entry.delete(0, "end")
@@ -6,7 +6,13 @@ Local Map Module - Configuration Manager
 
 import json
 import os
-from typing import Dict, List, Optional
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import fields
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from .models import (
     MapConfig, MapLayer, CalibrationPoint, Position3D,
@@ -14,93 +20,380 @@ from .models import (
 )
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，缺失时回退到标准库json
+    orjson = None
+
+
+def _parse_timestamp(value) -> datetime:
+    """解析校准点时间戳：POSIX秒数，兼容旧配置中的ISO字符串"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value)
+
+
+# 浮动地图配置的字段名及默认值（序列化时按字段遍历，新增字段无需改动此处）
+_FLOATING_CONFIG_FIELDS = tuple(f.name for f in fields(FloatingMapConfig))
+_FLOATING_CONFIG_DEFAULTS = FloatingMapConfig()
+
+# 默认地图（map_id, 显示名称），顺序即地图列表的显示顺序
+DEFAULT_MAPS: Tuple[Tuple[str, str], ...] = (
+    ("bigmap", "Customs"),
+    ("Interchange", "Interchange"),
+    ("Labyrinth", "Labyrinth"),  # 新增迷宫地图
+    ("Lighthouse", "Lighthouse"),
+    ("TarkovStreets", "Streets of Tarkov"),
+    ("Woods", "Woods"),
+    ("Shoreline", "Shoreline"),
+    ("RezervBase", "Reserve"),
+    ("factory4_day", "Factory (Day)"),
+    ("factory4_night", "Factory (Night)"),
+    ("laboratory", "Laboratory"),
+    ("Sandbox", "Ground Zero"),
+    ("Terminal", "Terminal"),
+)
+_DEFAULT_MAP_ORDER = {map_id: index for index, (map_id, _) in enumerate(DEFAULT_MAPS)}
+
+
+def _map_sort_key(map_id: str):
+    """默认地图按预设顺序在前，其余（导入的）地图按ID排序"""
+    return (_DEFAULT_MAP_ORDER.get(map_id, len(DEFAULT_MAPS)), map_id)
+
+
+@lru_cache(maxsize=None)
+def _default_config_file() -> str:
+    """默认配置文件路径（首次使用时才导入路径管理器，结果缓存）"""
+    from utils import path_manager
+    return path_manager.get_map_config_path()
+
+
+def _dumps_config(data: dict, pretty: bool = False) -> bytes:
+    """
+    序列化配置为UTF-8字节（保留非ASCII字符）
+
+    Args:
+        data: 配置字典
+        pretty: 是否使用2空格缩进（默认紧凑格式，体积更小、序列化更快）
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads_config(raw: bytes) -> dict:
+    """解析配置文件字节"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
 
 class MapConfigManager:
     """地图配置管理器"""
 
-    def __init__(self, config_file: Optional[str] = None):
+    # 修改后延迟写入的合并窗口（秒）
+    SAVE_DEBOUNCE_SECONDS = 0.5
+
+    # 变换缓存大小；玩家位置按0.1游戏单位量化作为缓存键
+    TRANSFORM_CACHE_MAX_SIZE = 256
+    TRANSFORM_POS_PRECISION = 1
+    POINT_SET_CACHE_MAX_SIZE = 64
+
+    def __init__(self, config_file: Optional[str] = None, scheduler=None):
+        """
+        Args:
+            config_file: 旧版单文件配置路径（默认由路径管理器决定）
+            scheduler: Tk控件，延迟写入通过其 after() 在Tk线程执行；
+                       为None时每次修改立即提交写入
+        """
         # 使用路径管理器获取配置文件路径
         if config_file is None:
-            from utils import path_manager
-            config_file = path_manager.get_map_config_path()
+            config_file = _default_config_file()
 
+        # 配置按地图分片存储: <config>/map_config/maps/<map_id>.json + floating_map.json
+        # config_file（旧的单文件配置）仅用于首次迁移
         self.config_file = config_file
+        self.config_dir = os.path.splitext(config_file)[0]
+        self.maps_dir = os.path.join(self.config_dir, 'maps')
+        self.floating_config_file = os.path.join(self.config_dir, 'floating_map.json')
+
         self.maps: Dict[str, MapConfig] = {}
         self.floating_config = FloatingMapConfig()
+
+        # 尚未反序列化的地图: map_id -> 配置文件路径（首次访问时才加载）
+        self._unloaded_maps: Dict[str, str] = {}
+
+        # 延迟写入状态：修改只记录脏地图，由Tk定时器或batch()退出时统一写入
+        # 序列化必须与修改地图的代码在同一线程（Tk线程），否则可能读到修改一半的配置
+        self._dirty_maps: set[str] = set()
+        self._batch_depth = 0
+        self._scheduler = scheduler
+        self._save_after_id: Optional[str] = None
+        self._save_lock = threading.RLock()
+
+        # 后台写入线程：调用方只负责序列化，文件写入在写入线程完成
+        # 待写入内容按路径合并（同一文件只保留最新内容），队列仅用于唤醒写入线程
+        self._pending_writes: Dict[str, bytes] = {}
+        self._pending_lock = threading.Lock()
+        self._write_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="MapConfigWriter", daemon=True
+        )
+        self._writer_thread.start()
+
+        # 坐标变换缓存: (map_id, layer_id, 校准点版本, 点数, 量化位置) -> 变换
+        # 校准点增删时版本号递增，旧缓存自然失效；地图对象被替换时整张地图的缓存清除
+        self._calibration_versions: Dict[Tuple[str, int], int] = {}
+        self._transform_cache: Dict[tuple, CoordinateTransform] = {}
+        # 校准点坐标数组缓存: (map_id, layer_id, 校准点版本, 点数) -> CalibrationPointSet
+        # 玩家移动时只有位置变化，校准点坐标数组无需每次重新提取
+        self._point_set_cache: Dict[tuple, object] = {}
+
         self.load_config()
 
     def load_config(self):
         """从文件加载配置"""
-        if not os.path.exists(self.config_file):
-            self._create_default_config()
+        if not os.path.isdir(self.maps_dir):
+            if Path(self.config_file).is_file():
+                self._migrate_legacy_config()
+            else:
+                self._create_default_config()
             return
 
+        # 只登记地图文件，首次访问时再解析（一次会话通常只用到一张地图）
+        for filename in os.listdir(self.maps_dir):
+            map_id, ext = os.path.splitext(filename)
+            if ext == '.json':
+                self._unloaded_maps[map_id] = os.path.join(self.maps_dir, filename)
+
+        if not self._unloaded_maps:
+            self._create_default_config()
+
+        # 加载浮动地图配置
+        if Path(self.floating_config_file).is_file():
+            try:
+                self.floating_config = self._deserialize_floating_config(
+                    self._read_config_file(self.floating_config_file)
+                )
+            except Exception as e:
+                print(f"加载浮动地图配置失败: {e}")
+
+    def _migrate_legacy_config(self):
+        """将旧的单文件配置拆分为按地图存储的文件（原文件保留作备份）"""
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._read_config_file(self.config_file)
 
-            # 加载地图配置
             for map_id, map_data in data.get('maps', {}).items():
                 self.maps[map_id] = self._deserialize_map_config(map_data)
+                self._invalidate_map_caches(map_id)
 
-            # 加载浮动地图配置
             if 'floating_map' in data:
                 self.floating_config = self._deserialize_floating_config(
                     data['floating_map']
                 )
-
         except Exception as e:
             print(f"加载地图配置失败: {e}")
             self._create_default_config()
+            return
 
-    def save_config(self):
-        """保存配置到文件"""
-        data = {
-            'maps': {
-                map_id: self._serialize_map_config(map_config)
-                for map_id, map_config in self.maps.items()
-            },
-            'floating_map': self._serialize_floating_config(self.floating_config)
-        }
+        self.save_config()
+        print(f"已将 {self.config_file} 迁移到 {self.config_dir}")
+
+    @staticmethod
+    def _read_config_file(path: str) -> dict:
+        """读取并解析单个配置文件"""
+        with open(path, 'rb') as f:
+            return _loads_config(f.read())
+
+    @staticmethod
+    def _write_payload(path: str, payload: bytes):
+        """写入单个配置文件"""
+        # 先写临时文件再原子替换，写入中途崩溃不会损坏原配置
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_file, path)
+
+    def _enqueue_write(self, path: str, data: dict, pretty: bool = False):
+        """在调用线程序列化为字节快照，交给写入线程写入文件"""
+        payload = _dumps_config(data, pretty)
+        with self._pending_lock:
+            self._pending_writes[path] = payload
+        try:
+            self._write_queue.put_nowait(None)
+        except queue.Full:
+            # 写入线程已有待处理的唤醒，会一并写入本次内容
+            pass
+
+    def _writer_loop(self):
+        """写入线程：每次唤醒写入所有待写入的文件"""
+        while True:
+            self._write_queue.get()
+            with self._pending_lock:
+                writes, self._pending_writes = self._pending_writes, {}
+
+            for path, payload in writes.items():
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    self._write_payload(path, payload)
+                except Exception as e:
+                    print(f"保存地图配置失败 {path}: {e}")
+
+            self._write_queue.task_done()
+
+    def _map_config_file(self, map_id: str) -> str:
+        """指定地图的配置文件路径"""
+        return os.path.join(self.maps_dir, f"{map_id}.json")
+
+    def save_config(self, pretty: bool = False):
+        """
+        立即保存全部配置到文件
 
+        Args:
+            pretty: 是否以缩进格式写入（便于手动查看，默认紧凑格式）
+        """
+        with self._save_lock:
+            self._dirty_maps.clear()
+            try:
+                for map_id, map_config in list(self.maps.items()):
+                    self._enqueue_write(
+                        self._map_config_file(map_id),
+                        self._serialize_map_config(map_config),
+                        pretty
+                    )
+                self._enqueue_write(
+                    self.floating_config_file,
+                    self._serialize_floating_config(self.floating_config),
+                    pretty
+                )
+            except Exception as e:
+                print(f"保存地图配置失败: {e}")
+
+    def _save_dirty_maps(self):
+        """只重写有修改的地图配置文件"""
+        with self._save_lock:
+            dirty_maps, self._dirty_maps = self._dirty_maps, set()
+            try:
+                for map_id in dirty_maps:
+                    map_config = self.maps.get(map_id)
+                    if map_config is not None:
+                        self._enqueue_write(
+                            self._map_config_file(map_id),
+                            self._serialize_map_config(map_config)
+                        )
+            except Exception as e:
+                print(f"保存地图配置失败: {e}")
+
+    def _mark_dirty(self, map_id: str):
+        """标记地图配置已修改，在合并窗口结束后再写入文件"""
+        with self._save_lock:
+            self._dirty_maps.add(map_id)
+            if self._batch_depth:
+                # batch()退出时统一写入
+                return
+
+            if self._scheduler is None:
+                self._save_dirty_maps()
+                return
+
+            self._cancel_scheduled_save()
+            self._save_after_id = self._scheduler.after(
+                int(self.SAVE_DEBOUNCE_SECONDS * 1000), self._flush_if_dirty
+            )
+
+    def _flush_if_dirty(self):
+        """定时器回调（Tk线程）：仍有未写入的修改时保存"""
+        with self._save_lock:
+            self._save_after_id = None
+            if self._dirty_maps:
+                self._save_dirty_maps()
+
+    def _cancel_scheduled_save(self):
+        """取消尚未执行的延迟写入"""
+        if self._save_after_id is not None:
+            try:
+                self._scheduler.after_cancel(self._save_after_id)
+            except Exception:
+                pass  # 控件已销毁
+            self._save_after_id = None
+
+    def _save_pending(self):
+        """取消延迟定时器，立即提交未保存的修改（不等待写入完成）"""
+        with self._save_lock:
+            self._cancel_scheduled_save()
+            if self._dirty_maps:
+                self._save_dirty_maps()
+
+    def flush(self):
+        """写入所有未保存的修改并等待写入完成（关闭程序前调用）"""
+        self._save_pending()
+        self._write_queue.join()
+
+    @contextmanager
+    def batch(self):
+        """
+        批量修改：块内的所有修改只在退出时写入一次
+
+        用法:
+            with config_manager.batch():
+                for point in points:
+                    config_manager.add_calibration_point(...)
+        """
+        with self._save_lock:
+            self._batch_depth += 1
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存地图配置失败: {e}")
+            yield self
+        finally:
+            with self._save_lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._save_pending()
 
     def _create_default_config(self):
         """创建默认配置"""
         # 创建默认的地图配置（空配置，等待用户导入地图）
-        default_maps = [
-            ("bigmap", "Customs"),
-            ("Interchange", "Interchange"),
-            ("Labyrinth", "Labyrinth"),  # 新增迷宫地图
-            ("Lighthouse", "Lighthouse"),
-            ("TarkovStreets", "Streets of Tarkov"),
-            ("Woods", "Woods"),
-            ("Shoreline", "Shoreline"),
-            ("RezervBase", "Reserve"),
-            ("factory4_day", "Factory (Day)"),
-            ("factory4_night", "Factory (Night)"),
-            ("laboratory", "Laboratory"),
-            ("Sandbox", "Ground Zero"),
-            ("Terminal", "Terminal"),
-        ]
-
-        for map_id, display_name in default_maps:
-            self.maps[map_id] = MapConfig(
-                map_id=map_id,
-                display_name=display_name,
-                layers=[],
-                default_layer_id=0
-            )
+        self.maps.update({
+            map_id: MapConfig(map_id, display_name, [], 0)
+            for map_id, display_name in DEFAULT_MAPS
+        })
+
+        self.save_config()
+
+    def _load_map(self, map_id: str) -> Optional[MapConfig]:
+        """反序列化尚未加载的地图（文件损坏时只跳过该地图）"""
+        path = self._unloaded_maps.pop(map_id, None)
+        if path is None:
+            return None
+
+        try:
+            map_config = self._deserialize_map_config(self._read_config_file(path))
+        except Exception as e:
+            print(f"加载地图配置失败 {path}: {e}")
+            return None
+
+        self.maps[map_id] = map_config
+        self._invalidate_map_caches(map_id)
+        return map_config
 
+    def replace_map_config(self, map_id: str, map_config: MapConfig):
+        """用新的地图配置对象替换（或新增）指定地图，并立即保存"""
+        self._unloaded_maps.pop(map_id, None)
+        self.maps[map_id] = map_config
+        self._invalidate_map_caches(map_id)
         self.save_config()
 
     def get_map_config(self, map_id: str) -> Optional[MapConfig]:
         """获取指定地图的配置"""
-        return self.maps.get(map_id)
+        map_config = self.maps.get(map_id)
+        if map_config is None and map_id in self._unloaded_maps:
+            map_config = self._load_map(map_id)
+        return map_config
+
+    def get_map_ids(self) -> List[str]:
+        """获取所有地图ID（不触发地图加载）"""
+        return sorted(set(self.maps) | set(self._unloaded_maps), key=_map_sort_key)
 
     def set_map_image(self, map_id: str, layer_id: int, image_path: str,
                       layer_name: str = "Ground Floor",
@@ -119,11 +412,11 @@ class MapConfigManager:
             height_max: 最大高度
             rotation_offset: 地图旋转偏移（度数）
         """
-        if map_id not in self.maps:
+        map_config = self.get_map_config(map_id)
+        if not map_config:
             print(f"地图ID '{map_id}' 不存在")
             return
 
-        map_config = self.maps[map_id]
         existing_layer = map_config.get_layer_by_id(layer_id)
 
         if existing_layer:
@@ -133,6 +426,7 @@ class MapConfigManager:
             existing_layer.height_min = height_min
             existing_layer.height_max = height_max
             existing_layer.rotation_offset = rotation_offset
+            map_config.invalidate_layer_caches()
         else:
             # 创建新层级
             new_layer = MapLayer(
@@ -146,7 +440,7 @@ class MapConfigManager:
             )
             map_config.add_layer(new_layer)
 
-        self.save_config()
+        self._mark_dirty(map_id)
 
     def add_calibration_point(self, map_id: str, layer_id: int,
                               game_pos: Position3D, map_x: float, map_y: float):
@@ -176,7 +470,8 @@ class MapConfigManager:
             map_y=map_y
         )
         layer.calibration_points.append(calibration_point)
-        self.save_config()
+        self._bump_calibration_version(map_id, layer_id)
+        self._mark_dirty(map_id)
 
     def clear_calibration_points(self, map_id: str, layer_id: int):
         """清除指定层级的所有校准点"""
@@ -187,7 +482,21 @@ class MapConfigManager:
         layer = map_config.get_layer_by_id(layer_id)
         if layer:
             layer.calibration_points.clear()
-            self.save_config()
+            self._bump_calibration_version(map_id, layer_id)
+            self._mark_dirty(map_id)
+
+    def _bump_calibration_version(self, map_id: str, layer_id: int):
+        """校准点变化后递增版本号，使该层级的变换缓存失效"""
+        key = (map_id, layer_id)
+        self._calibration_versions[key] = self._calibration_versions.get(key, 0) + 1
+
+    def _invalidate_map_caches(self, map_id: str):
+        """地图对象被替换后清除该地图的全部变换缓存（新对象的校准点版本从头计数）"""
+        for key in [k for k in self._calibration_versions if k[0] == map_id]:
+            self._calibration_versions[key] += 1
+        for cache in (self._transform_cache, self._point_set_cache):
+            for key in [k for k in cache if k[0] == map_id]:
+                del cache[key]
 
     def calculate_transform(
         self,
@@ -214,18 +523,65 @@ class MapConfigManager:
         if not layer or not layer.is_calibrated():
             return None
 
+        points = layer.calibration_points
+        pos_key = None
+        if player_pos is not None:
+            precision = self.TRANSFORM_POS_PRECISION
+            pos_key = (round(player_pos.x, precision),
+                       round(player_pos.y, precision),
+                       round(player_pos.z, precision))
+        points_key = (map_id, layer_id,
+                      self._calibration_versions.get((map_id, layer_id), 0),
+                      len(points))
+        cache_key = points_key + (pos_key,)
+
+        transform = self._transform_cache.get(cache_key)
+        if transform is not None:
+            return transform
+
         try:
-            return CoordinateTransform.calculate_from_points(
-                layer.calibration_points,
+            transform = CoordinateTransform.calculate_from_points(
+                self._get_point_set(points_key, points),
                 player_pos=player_pos
             )
         except Exception as e:
             print(f"计算坐标变换失败: {e}")
             return None
 
+        # 缓存已满时淘汰最早的条目
+        if len(self._transform_cache) >= self.TRANSFORM_CACHE_MAX_SIZE:
+            self._transform_cache.pop(next(iter(self._transform_cache)))
+        self._transform_cache[cache_key] = transform
+        return transform
+
+    def _get_point_set(self, points_key: tuple, points: List[CalibrationPoint]):
+        """
+        获取校准点的坐标数组（CalibrationPointSet），按校准点版本缓存
+
+        numpy不可用时直接返回原列表，由 calculate_from_points 处理
+        """
+        point_set = self._point_set_cache.get(points_key)
+        if point_set is not None:
+            return point_set
+
+        try:
+            from .coordinate_transform import CalibrationPointSet
+        except ImportError:
+            return points
+
+        point_set = CalibrationPointSet.from_points(points)
+
+        # 缓存已满时淘汰最早的条目
+        if len(self._point_set_cache) >= self.POINT_SET_CACHE_MAX_SIZE:
+            self._point_set_cache.pop(next(iter(self._point_set_cache)))
+        self._point_set_cache[points_key] = point_set
+        return point_set
+
     def get_all_maps(self) -> List[MapConfig]:
-        """获取所有地图配置"""
-        return list(self.maps.values())
+        """获取所有地图配置（会加载全部地图）"""
+        for map_id in list(self._unloaded_maps):
+            self._load_map(map_id)
+        return [self.maps[map_id] for map_id in sorted(self.maps, key=_map_sort_key)]
 
     def _serialize_map_config(self, map_config: MapConfig) -> dict:
         """序列化地图配置为字典"""
@@ -238,9 +594,10 @@ class MapConfigManager:
 
     def _deserialize_map_config(self, data: dict) -> MapConfig:
         """从字典反序列化地图配置"""
+        # 低基数字符串驻留，相同内容共享同一对象（map_id还作为self.maps的键）
         return MapConfig(
-            map_id=data['map_id'],
-            display_name=data['display_name'],
+            map_id=sys.intern(data['map_id']),
+            display_name=sys.intern(data['display_name']),
             default_layer_id=data.get('default_layer_id', 0),
             layers=[self._deserialize_layer(layer_data) for layer_data in data.get('layers', [])]
         )
@@ -256,9 +613,16 @@ class MapConfigManager:
             'rotation_offset': layer.rotation_offset,
             'is_base_map': layer.is_base_map,
             'region_owner_layer_id': layer.region_owner_layer_id,
+            # 校准点的磁盘格式只在此处定义（逐点内联为一个推导式）
             'calibration_points': [
-                self._serialize_calibration_point(point)
+                {
+                    'game_pos': {'x': pos.x, 'y': pos.y, 'z': pos.z},
+                    'map_x': point.map_x,
+                    'map_y': point.map_y,
+                    'timestamp': point.timestamp.timestamp()
+                }
                 for point in layer.calibration_points
+                for pos in (point.game_pos,)
             ]
         }
 
@@ -284,17 +648,24 @@ class MapConfigManager:
 
         return MapLayer(
             layer_id=data['layer_id'],
-            name=data['name'],
-            image_path=data['image_path'],
+            name=sys.intern(data['name']),
+            image_path=sys.intern(data['image_path']),
             height_min=data['height_min'],
             height_max=data['height_max'],
             rotation_offset=data.get('rotation_offset', 0.0),
             is_base_map=is_base_map,
             region=region,
             region_owner_layer_id=region_owner_layer_id,
+            # 与 _serialize_layer 中的校准点格式对应
             calibration_points=[
-                self._deserialize_calibration_point(point_data)
+                CalibrationPoint(
+                    Position3D(pos['x'], pos['y'], pos['z']),
+                    point_data['map_x'],
+                    point_data['map_y'],
+                    _parse_timestamp(point_data['timestamp'])
+                )
                 for point_data in data.get('calibration_points', [])
+                for pos in (point_data['game_pos'],)
             ]
         )
 
@@ -310,63 +681,16 @@ class MapConfigManager:
             points=data.get('points', [])
         )
 
-    def _serialize_calibration_point(self, point: CalibrationPoint) -> dict:
-        """序列化校准点为字典"""
-        return {
-            'game_pos': {
-                'x': point.game_pos.x,
-                'y': point.game_pos.y,
-                'z': point.game_pos.z
-            },
-            'map_x': point.map_x,
-            'map_y': point.map_y,
-            'timestamp': point.timestamp.isoformat()
-        }
-
-    def _deserialize_calibration_point(self, data: dict) -> CalibrationPoint:
-        """从字典反序列化校准点"""
-        return CalibrationPoint(
-            game_pos=Position3D(
-                x=data['game_pos']['x'],
-                y=data['game_pos']['y'],
-                z=data['game_pos']['z']
-            ),
-            map_x=data['map_x'],
-            map_y=data['map_y'],
-            timestamp=datetime.fromisoformat(data['timestamp'])
-        )
-
     def _serialize_floating_config(self, config: FloatingMapConfig) -> dict:
         """序列化浮动地图配置为字典"""
-        return {
-            'enabled': config.enabled,
-            'width': config.width,
-            'height': config.height,
-            'pos_x': config.pos_x,
-            'pos_y': config.pos_y,
-            'opacity': config.opacity,
-            'locked': config.locked,
-            'always_on_top': config.always_on_top,
-            'hotkey': config.hotkey,
-            'zoom': config.zoom,
-            'center_on_player': config.center_on_player
-        }
+        return {name: getattr(config, name) for name in _FLOATING_CONFIG_FIELDS}
 
     def _deserialize_floating_config(self, data: dict) -> FloatingMapConfig:
-        """从字典反序列化浮动地图配置"""
-        return FloatingMapConfig(
-            enabled=data.get('enabled', False),
-            width=data.get('width', 400),
-            height=data.get('height', 400),
-            pos_x=data.get('pos_x', 100),
-            pos_y=data.get('pos_y', 100),
-            opacity=data.get('opacity', 0.8),
-            locked=data.get('locked', False),
-            always_on_top=data.get('always_on_top', True),
-            hotkey=data.get('hotkey', 'F5'),
-            zoom=data.get('zoom', 1.0),
-            center_on_player=data.get('center_on_player', True)
-        )
+        """从字典反序列化浮动地图配置（缺失的字段使用默认值）"""
+        return FloatingMapConfig(**{
+            name: data.get(name, getattr(_FLOATING_CONFIG_DEFAULTS, name))
+            for name in _FLOATING_CONFIG_FIELDS
+        })
 
     # ==================== 区域管理方法 ====================
 
@@ -394,7 +718,8 @@ class MapConfigManager:
             return
 
         layer.region = region
-        self.save_config()
+        map_config.invalidate_layer_caches()
+        self._mark_dirty(map_id)
 
     def clear_layer_region(self, map_id: str, layer_id: int):
         """清除楼层图的激活区域"""
@@ -405,7 +730,8 @@ class MapConfigManager:
         layer = map_config.get_layer_by_id(layer_id)
         if layer:
             layer.region = None
-            self.save_config()
+            map_config.invalidate_layer_caches()
+            self._mark_dirty(map_id)
 
     def validate_region_no_overlap(
         self,
@@ -479,20 +805,10 @@ class MapConfigManager:
         if not map_config:
             return True, None
 
-        for layer in map_config.get_floor_maps():
-            # 跳过自己
-            if layer.layer_id == layer_id:
-                continue
-
-            # 跳过没有区域的层级
-            if layer.region is None:
-                continue
-
-            # 检查区域是否相同（通过点列表比较）
-            if layer.region.points == region.points:
-                # 同一区域，检查高度是否重合
-                if not (height_max <= layer.height_min or height_min >= layer.height_max):
-                    return False, f"高度范围与同区域的楼层 '{layer.name}' (ID:{layer.layer_id}, {layer.height_min}~{layer.height_max}) 重合"
+        # 同区域楼层的高度区间索引（按区域点坐标分组）
+        layer = map_config.find_height_conflict(region, layer_id, height_min, height_max)
+        if layer is not None:
+            return False, f"高度范围与同区域的楼层 '{layer.name}' (ID:{layer.layer_id}, {layer.height_min}~{layer.height_max}) 重合"
 
         return True, None
 
@@ -546,8 +862,9 @@ class MapConfigManager:
         layer.region = None
         # 设置引用
         layer.region_owner_layer_id = owner_layer_id
+        map_config.invalidate_layer_caches()
 
-        self.save_config()
+        self._mark_dirty(map_id)
 
     def unbind_layer_region(self, map_id: str, layer_id: int):
         """
@@ -565,10 +882,15 @@ class MapConfigManager:
         if not layer:
             return
 
+        # 没有区域也没有绑定时无需修改（不清缓存、不写文件）
+        if layer.region is None and layer.region_owner_layer_id is None:
+            return
+
         layer.region = None
         layer.region_owner_layer_id = None
+        map_config.invalidate_layer_caches()
 
-        self.save_config()
+        self._mark_dirty(map_id)
 
     def get_region_owner_info(self, map_id: str, region: Region) -> Optional[tuple[int, str]]:
         """
@@ -628,7 +950,8 @@ class MapConfigManager:
 
         # 删除层级
         if map_config.remove_layer(layer_id):
-            self.save_config()
+            self._bump_calibration_version(map_id, layer_id)
+            self._mark_dirty(map_id)
             return True, None
         else:
             return False, "删除失败（未知错误）"
@@ -679,14 +1002,16 @@ class MapConfigManager:
         # 交换大地图标记
         old_base_map.is_base_map = False
         new_base_layer.is_base_map = True
+        map_config.invalidate_layer_caches()
 
         # 清除所有楼层图的区域标记（大地图更改后区域坐标失效）
         for layer in map_config.layers:
-            if not layer.is_base_map:
+            if not layer.is_base_map and (
+                    layer.region is not None or layer.region_owner_layer_id is not None):
                 layer.region = None
                 layer.region_owner_layer_id = None
 
-        self.save_config()
+        self._mark_dirty(map_id)
         return True, None
 
     def delete_all_regions(self, map_id: str):
@@ -695,8 +1020,14 @@ class MapConfigManager:
         if not map_config:
             return
 
+        changed = False
         for layer in map_config.get_floor_maps():
-            layer.region = None
-            layer.region_owner_layer_id = None
+            if layer.region is not None or layer.region_owner_layer_id is not None:
+                layer.region = None
+                layer.region_owner_layer_id = None
+                changed = True
 
-        self.save_config()
+        # 没有任何区域时不清缓存、不写文件
+        if changed:
+            map_config.invalidate_layer_caches()
+            self._mark_dirty(map_id)
@@ -7,14 +7,59 @@ Local Map Module - Coordinate Transform
 - RANSAC鲁棒算法（处理异常点）
 """
 
+import logging
+import math
 import numpy as np
-from typing import List, Tuple, Optional
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Sequence, Union
 from .models import CalibrationPoint, Position3D, CoordinateTransform
-import random
+
+# 变换在玩家位置更新时频繁计算，诊断输出走 debug 级别日志
+log = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CalibrationPointSet:
+    """
+    校准点的结构化数组（SoA）表示
+
+    所有变换算法直接对连续的坐标数组切片运算，
+    校准点列表只在入口处转换一次
+    """
+    game_xz: np.ndarray  # (n, 2) 游戏坐标 x, z
+    map_xy: np.ndarray   # (n, 2) 地图坐标 x, y
+
+    @classmethod
+    def from_points(cls, points: Sequence[CalibrationPoint]) -> 'CalibrationPointSet':
+        """一次遍历提取校准点坐标"""
+        n = len(points)
+        coords = np.fromiter(
+            (v for p in points for v in (p.game_pos.x, p.game_pos.z, p.map_x, p.map_y)),
+            dtype=np.float64,
+            count=4 * n
+        ).reshape(n, 4)
+        return cls(game_xz=coords[:, :2], map_xy=coords[:, 2:])
+
+    def __len__(self) -> int:
+        return self.game_xz.shape[0]
+
+    def subset(self, indices) -> 'CalibrationPointSet':
+        """按下标数组取子集"""
+        return CalibrationPointSet(self.game_xz[indices], self.map_xy[indices])
+
+
+PointsLike = Union[Sequence[CalibrationPoint], CalibrationPointSet]
+
+
+def _as_point_set(points: PointsLike) -> CalibrationPointSet:
+    """将校准点列表转换为 CalibrationPointSet（已经是则直接返回）"""
+    if isinstance(points, CalibrationPointSet):
+        return points
+    return CalibrationPointSet.from_points(points)
 
 
 def calculate_affine_transform(
-    points: List[CalibrationPoint],
+    points: PointsLike,
     player_pos: Optional[Position3D] = None,
     use_local_interpolation: bool = True
 ) -> CoordinateTransform:
@@ -28,7 +73,7 @@ def calculate_affine_transform(
     - 7个点以上：RANSAC + 加权最小二乘法（鲁棒）
 
     Args:
-        points: 校准点列表（至少3个）
+        points: 校准点列表或 CalibrationPointSet（至少3个）
         player_pos: 玩家当前位置（可选，用于局部插值）
         use_local_interpolation: 是否启用局部插值（默认True）
 
@@ -42,23 +87,24 @@ def calculate_affine_transform(
         raise ValueError("至少需要3个校准点来计算变换矩阵")
 
     n = len(points)
+    point_set = _as_point_set(points)
 
     # 优先使用局部插值（如果提供了玩家位置）
     if player_pos is not None and use_local_interpolation and n >= 3:
-        print(f"算法选择: 局部插值（总共 {n} 个校准点）")
-        return _calculate_local_interpolation(points, player_pos)
+        log.debug("算法选择: 局部插值（总共 %d 个校准点）", n)
+        return _calculate_local_interpolation(point_set, player_pos)
 
     # 回退到原有算法
-    print(f"算法选择: 传统方法（{n} 个点）")
+    log.debug("算法选择: 传统方法（%d 个点）", n)
     if n <= 3:
-        return _calculate_basic_transform(points)
+        return _calculate_basic_transform(point_set)
     elif n <= 6:
-        return _calculate_weighted_transform(points)
+        return _calculate_weighted_transform(point_set)
     else:
-        return _calculate_ransac_transform(points)
+        return _calculate_ransac_transform(point_set)
 
 
-def _calculate_basic_transform(points: List[CalibrationPoint]) -> CoordinateTransform:
+def _calculate_basic_transform(points: CalibrationPointSet) -> CoordinateTransform:
     """
     基础最小二乘法（3-6个点）
 
@@ -66,33 +112,24 @@ def _calculate_basic_transform(points: List[CalibrationPoint]) -> CoordinateTran
     map_x = a * game_x + b * game_z + c
     map_y = d * game_x + e * game_z + f
     """
-    n = len(points)
-
-    # 提取游戏坐标和地图坐标
-    game_x = np.array([p.game_pos.x for p in points])
-    game_z = np.array([p.game_pos.z for p in points])
-    map_x = np.array([p.map_x for p in points])
-    map_y = np.array([p.map_y for p in points])
-
-    # 构建最小二乘法的系数矩阵 A
-    # [game_x, game_z, 1]
-    A = np.column_stack([game_x, game_z, np.ones(n)])
+    return _transform_from_coeffs(*_lstsq_affine_coeffs(points))
 
-    # 求解 map_x 方向的变换系数: [a, b, c]
-    coeffs_x, residuals_x, rank_x, s_x = np.linalg.lstsq(A, map_x, rcond=None)
-    a, b, c = coeffs_x
 
-    # 求解 map_y 方向的变换系数: [d, e, f]
-    coeffs_y, residuals_y, rank_y, s_y = np.linalg.lstsq(A, map_y, rcond=None)
-    d, e, f = coeffs_y
+def _transform_from_coeffs(a: float, b: float, c: float,
+                           d: float, e: float, f: float) -> CoordinateTransform:
+    """
+    由仿射系数创建变换对象，并提取几何参数
 
+    几何参数（缩放、旋转）仅用于显示，只在返回给调用方的最终结果上计算；
+    RANSAC 等内部拟合只使用系数
+    """
     # 从仿射矩阵参数提取几何变换参数（仅用于显示）
-    scale_x = np.sqrt(a**2 + d**2)
-    scale_z = np.sqrt(b**2 + e**2)
-    rotation = np.arctan2(d, a)
+    scale_x = math.sqrt(a * a + d * d)
+    scale_z = math.sqrt(b * b + e * e)
+    rotation = math.atan2(d, a)
 
     # 创建变换对象（包含完整的仿射系数）
-    transform = CoordinateTransform(
+    return CoordinateTransform(
         a=a, b=b, c=c,
         d=d, e=e, f=f,
         scale_x=scale_x,
@@ -102,131 +139,215 @@ def _calculate_basic_transform(points: List[CalibrationPoint]) -> CoordinateTran
         rotation=rotation
     )
 
-    return transform
 
+def _lstsq_affine_coeffs(points: CalibrationPointSet) -> Tuple[float, float, float, float, float, float]:
+    """
+    最小二乘拟合仿射系数
+
+    恰好3个点时方程组是方阵，直接用闭式解，跳过 lstsq 的 SVD 与包装开销；
+    点更多或三点共线时才调用 lstsq
+
+    Returns:
+        (a, b, c, d, e, f)
+    """
+    n = len(points)
+
+    if n == 3:
+        coeffs = _fit_affine_3pt(
+            points.game_xz[:, 0].tolist(), points.game_xz[:, 1].tolist(),
+            points.map_xy[:, 0].tolist(), points.map_xy[:, 1].tolist()
+        )
+        if coeffs is not None:
+            return coeffs
+
+    # 构建最小二乘法的系数矩阵 A
+    # [game_x, game_z, 1]
+    A = np.column_stack([points.game_xz, np.ones(n)])
+
+    # 两个方向共用系数矩阵，一次求解（只做一次SVD）
+    # 第0列为 map_x 方向的系数 [a, b, c]，第1列为 map_y 方向的系数 [d, e, f]
+    coeffs, residuals, rank, s = np.linalg.lstsq(A, points.map_xy, rcond=None)
+    a, b, c = coeffs[:, 0].tolist()
+    d, e, f = coeffs[:, 1].tolist()
+    return a, b, c, d, e, f
+
+
+def _fit_affine_3pt(gx, gz, mx, my) -> Optional[Tuple[float, float, float, float, float, float]]:
+    """
+    3个点的仿射系数闭式解（克莱姆法则）
+
+    3个点恰好确定仿射变换，直接展开 3×3 行列式和伴随矩阵求解，
+    避免 RANSAC 内循环中每次调用 lstsq（SVD）的开销
+
+    Args:
+        gx, gz: 3个点的游戏坐标 x, z
+        mx, my: 3个点的地图坐标
 
-def _calculate_weighted_transform(points: List[CalibrationPoint]) -> CoordinateTransform:
+    Returns:
+        (a, b, c, d, e, f)，三点共线（退化）时返回 None
+    """
+    x0, x1, x2 = gx
+    z0, z1, z2 = gz
+
+    # M = [[x0, z0, 1], [x1, z1, 1], [x2, z2, 1]] 的代数余子式
+    c00, c01, c02 = z1 - z2, x2 - x1, x1 * z2 - x2 * z1
+    c10, c11, c12 = z2 - z0, x0 - x2, x2 * z0 - x0 * z2
+    c20, c21, c22 = z0 - z1, x1 - x0, x0 * z1 - x1 * z0
+
+    det = x0 * c00 + z0 * c01 + c02
+    if abs(det) < 1e-9:
+        return None
+    inv_det = 1.0 / det
+
+    # coeffs = adj(M) @ rhs / det，adj(M) 为余子式矩阵的转置
+    m0, m1, m2 = mx
+    n0, n1, n2 = my
+    a = (c00 * m0 + c10 * m1 + c20 * m2) * inv_det
+    b = (c01 * m0 + c11 * m1 + c21 * m2) * inv_det
+    c = (c02 * m0 + c12 * m1 + c22 * m2) * inv_det
+    d = (c00 * n0 + c10 * n1 + c20 * n2) * inv_det
+    e = (c01 * n0 + c11 * n1 + c21 * n2) * inv_det
+    f = (c02 * n0 + c12 * n1 + c22 * n2) * inv_det
+    return a, b, c, d, e, f
+
+
+def _calculate_weighted_transform(points: CalibrationPointSet) -> CoordinateTransform:
     """
     加权最小二乘法（7-15个点）
 
     对离中心较远的点给予较低权重，减少边缘点误差的影响
     """
-    n = len(points)
+    return _transform_from_coeffs(*_weighted_affine_coeffs(points))
+
 
-    # 提取坐标
-    game_x = np.array([p.game_pos.x for p in points])
-    game_z = np.array([p.game_pos.z for p in points])
-    map_x = np.array([p.map_x for p in points])
-    map_y = np.array([p.map_y for p in points])
+def _weighted_affine_coeffs(points: CalibrationPointSet) -> Tuple[float, float, float, float, float, float]:
+    """
+    加权最小二乘拟合仿射系数（不提取几何参数）
+
+    Returns:
+        (a, b, c, d, e, f)
+    """
+    n = len(points)
+    game_x = points.game_xz[:, 0]
+    game_z = points.game_xz[:, 1]
 
     # 计算点的中心
     center_game_x = np.mean(game_x)
     center_game_z = np.mean(game_z)
 
-    # 计算每个点到中心的距离
-    distances = np.sqrt((game_x - center_game_x)**2 + (game_z - center_game_z)**2)
-    max_distance = np.max(distances) if np.max(distances) > 0 else 1.0
+    # 计算每个点到中心的距离平方（权重只用到 (d/max_d)^2，无需开方）
+    dx = game_x - center_game_x
+    dz = game_z - center_game_z
+    sq_distances = dx * dx + dz * dz
+    max_sq_distance = np.max(sq_distances)
+    if max_sq_distance <= 0:
+        max_sq_distance = 1.0
 
     # 计算权重：距离越近权重越大（使用高斯衰减）
     # 中心点权重=1.0，最远点权重≈0.5
-    weights = np.exp(-0.5 * (distances / max_distance)**2)
-
-    # 构建加权矩阵 W
-    W = np.diag(weights)
+    weights = np.exp(-0.5 * (sq_distances / max_sq_distance))
 
     # 构建系数矩阵 A
-    A = np.column_stack([game_x, game_z, np.ones(n)])
+    A = np.column_stack([points.game_xz, np.ones(n)])
 
     # 加权最小二乘: (A^T * W * A) * x = A^T * W * b
-    # 求解 map_x 方向
-    AWA_x = A.T @ W @ A
-    AWb_x = A.T @ W @ map_x
-    coeffs_x = np.linalg.solve(AWA_x, AWb_x)
-    a, b, c = coeffs_x
-
-    # 求解 map_y 方向
-    AWb_y = A.T @ W @ map_y
-    coeffs_y = np.linalg.solve(AWA_x, AWb_y)
-    d, e, f = coeffs_y
-
-    # 提取几何参数（仅用于显示）
-    scale_x = np.sqrt(a**2 + d**2)
-    scale_z = np.sqrt(b**2 + e**2)
-    rotation = np.arctan2(d, a)
-
-    transform = CoordinateTransform(
-        a=a, b=b, c=c,
-        d=d, e=e, f=f,
-        scale_x=scale_x,
-        scale_z=scale_z,
-        offset_x=c,
-        offset_z=f,
-        rotation=rotation
-    )
-
-    return transform
-
-
-def _calculate_ransac_transform(points: List[CalibrationPoint],
+    # W 是对角矩阵，W @ A 等价于按行缩放 A，无需构造 n×n 的 W
+    # map_x、map_y 两个方向作为两列右端项一次求解（只做一次分解）
+    B = points.map_xy
+    Aw = A * weights[:, np.newaxis]
+    AWA = A.T @ Aw
+    AWB = Aw.T @ B
+    coeffs = np.linalg.solve(AWA, AWB)
+    a, b, c = coeffs[:, 0].tolist()
+    d, e, f = coeffs[:, 1].tolist()
+    return a, b, c, d, e, f
+
+
+def _calculate_ransac_transform(points: CalibrationPointSet,
                                  max_iterations: int = 500,
-                                 inlier_threshold: float = 10.0) -> CoordinateTransform:
+                                 inlier_threshold: float = 10.0,
+                                 seed: Optional[int] = None,
+                                 confidence: float = 0.99) -> CoordinateTransform:
     """
     RANSAC鲁棒算法（16个点以上）
 
     随机抽样一致性算法，能够自动识别和排除异常点（outliers）
 
     Args:
-        points: 校准点列表
+        points: 校准点集合
         max_iterations: 最大迭代次数
         inlier_threshold: 内点阈值（像素），小于此值认为是好点
+        seed: 随机种子（可选，用于复现结果）
+        confidence: 至少抽到一次全内点样本的目标概率，用于自适应减少迭代次数
 
     Returns:
         CoordinateTransform: 最佳变换矩阵
     """
     n = len(points)
-    best_transform = None
-    best_inliers = []
+    best_mask = None
     best_score = 0
 
-    print(f"  RANSAC参数: 最大迭代={max_iterations}, 内点阈值={inlier_threshold}px")
+    log.debug("  RANSAC参数: 最大迭代=%d, 内点阈值=%spx", max_iterations, inlier_threshold)
+
+    # 坐标只提取一次：数组用于向量化打分，Python float 列表供闭式解使用
+    gx_arr, gz_arr = points.game_xz[:, 0], points.game_xz[:, 1]
+    mx_arr, my_arr = points.map_xy[:, 0], points.map_xy[:, 1]
+    game_x, game_z, map_x, map_y = gx_arr.tolist(), gz_arr.tolist(), mx_arr.tolist(), my_arr.tolist()
+    threshold_sq = inlier_threshold * inlier_threshold
+
+    # 一次性预先抽取所有迭代的3点样本（最少需要3个点来计算仿射变换）
+    # 每行取随机键最小的3个下标，等价于不放回抽样
+    rng = np.random.default_rng(seed)
+    keys = rng.random((max_iterations, n))
+    triplets = np.argpartition(keys, 2, axis=1)[:, :3].tolist()
+
+    # 自适应迭代次数：每次找到更好的模型后按内点率重新估计所需次数
+    required_iterations = max_iterations
+    log_failure = math.log(1.0 - confidence)
 
     # RANSAC主循环
-    for iteration in range(max_iterations):
-        # 随机选择3个点（最少需要3个点来计算仿射变换）
-        sample_indices = random.sample(range(n), 3)
-        sample_points = [points[i] for i in sample_indices]
-
-        try:
-            # 用这3个点计算变换
-            candidate_transform = _calculate_basic_transform(sample_points)
-
-            # 计算所有点的误差
-            inliers = []
-            for i, point in enumerate(points):
-                predicted_x, predicted_y = candidate_transform.transform(point.game_pos)
-                error = np.sqrt((predicted_x - point.map_x)**2 +
-                              (predicted_y - point.map_y)**2)
-
-                if error < inlier_threshold:
-                    inliers.append(i)
-
-            # 评估这个模型的质量（内点数量）
-            score = len(inliers)
-
-            # 更新最佳模型
-            if score > best_score:
-                best_score = score
-                best_inliers = inliers
-                best_transform = candidate_transform
-
-        except Exception as e:
+    for iteration, (i0, i1, i2) in enumerate(triplets):
+        if iteration >= required_iterations:
+            break
+
+        # 用这3个点计算变换（闭式解，三点共线时跳过）
+        coeffs = _fit_affine_3pt(
+            (game_x[i0], game_x[i1], game_x[i2]),
+            (game_z[i0], game_z[i1], game_z[i2]),
+            (map_x[i0], map_x[i1], map_x[i2]),
+            (map_y[i0], map_y[i1], map_y[i2])
+        )
+        if coeffs is None:
             continue
+        a, b, c, d, e, f = coeffs
+
+        # 一次向量运算计算所有点的误差（比较平方误差，省去开方）
+        err_x = a * gx_arr + b * gz_arr + c - mx_arr
+        err_y = d * gx_arr + e * gz_arr + f - my_arr
+        inlier_mask = err_x * err_x + err_y * err_y < threshold_sq
+
+        # 评估这个模型的质量（内点数量）
+        score = int(np.count_nonzero(inlier_mask))
+
+        # 更新最佳模型
+        if score > best_score:
+            best_score = score
+            best_mask = inlier_mask
+
+            # 所有点都是内点，不可能更好
+            if score == n:
+                break
+
+            # N = log(1-p) / log(1-w^3)，w 为当前内点率
+            log_all_inliers_fail = math.log(1.0 - (score / n) ** 3)
+            if log_all_inliers_fail < 0:
+                required_iterations = min(max_iterations, math.ceil(log_failure / log_all_inliers_fail))
 
     # 使用所有内点重新计算变换（提高精度）
-    if best_inliers and len(best_inliers) >= 3:
-        inlier_points = [points[i] for i in best_inliers]
+    if best_score >= 3:
+        inlier_points = points.subset(best_mask)
 
-        print(f"  RANSAC结果: {len(best_inliers)}/{n} 个内点")
+        log.debug("  RANSAC结果: %d/%d 个内点", best_score, n)
 
         # 根据内点数量选择算法
         if len(inlier_points) <= 6:
@@ -240,14 +361,14 @@ def _calculate_ransac_transform(points: List[CalibrationPoint],
         return _calculate_weighted_transform(points)
 
 
-def calculate_simple_transform(points: List[CalibrationPoint]) -> CoordinateTransform:
+def calculate_simple_transform(points: PointsLike) -> CoordinateTransform:
     """
     计算简化的坐标变换（仅缩放和平移，不考虑旋转）
 
     适用于地图方向已经对齐的情况
 
     Args:
-        points: 校准点列表（至少2个）
+        points: 校准点列表或 CalibrationPointSet（至少2个）
 
     Returns:
         CoordinateTransform: 变换矩阵
@@ -255,16 +376,11 @@ def calculate_simple_transform(points: List[CalibrationPoint]) -> CoordinateTran
     if len(points) < 2:
         raise ValueError("至少需要2个校准点")
 
-    # 计算游戏坐标和地图坐标的范围
-    game_x_vals = [p.game_pos.x for p in points]
-    game_z_vals = [p.game_pos.z for p in points]
-    map_x_vals = [p.map_x for p in points]
-    map_y_vals = [p.map_y for p in points]
+    point_set = _as_point_set(points)
 
-    game_x_range = max(game_x_vals) - min(game_x_vals)
-    game_z_range = max(game_z_vals) - min(game_z_vals)
-    map_x_range = max(map_x_vals) - min(map_x_vals)
-    map_y_range = max(map_y_vals) - min(map_y_vals)
+    # 计算游戏坐标和地图坐标的范围（按列一次求出）
+    game_x_range, game_z_range = np.ptp(point_set.game_xz, axis=0).tolist()
+    map_x_range, map_y_range = np.ptp(point_set.map_xy, axis=0).tolist()
 
     # 计算缩放比例
     if game_x_range > 0:
@@ -278,9 +394,10 @@ def calculate_simple_transform(points: List[CalibrationPoint]) -> CoordinateTran
         scale_z = 1.0
 
     # 计算偏移（使用第一个点）
-    first_point = points[0]
-    offset_x = first_point.map_x - first_point.game_pos.x * scale_x
-    offset_z = first_point.map_y - first_point.game_pos.z * scale_z
+    first_game_x, first_game_z = point_set.game_xz[0].tolist()
+    first_map_x, first_map_y = point_set.map_xy[0].tolist()
+    offset_x = first_map_x - first_game_x * scale_x
+    offset_z = first_map_y - first_game_z * scale_z
 
     # 简化变换：无旋转
     # map_x = scale_x * game_x + offset_x
@@ -296,33 +413,31 @@ def calculate_simple_transform(points: List[CalibrationPoint]) -> CoordinateTran
     )
 
 
-def validate_transform(transform: CoordinateTransform, points: List[CalibrationPoint]) -> Tuple[float, List[Tuple[float, float]]]:
+def validate_transform(transform: CoordinateTransform, points: PointsLike) -> Tuple[float, List[Tuple[float, float]]]:
     """
     验证变换矩阵的准确性
 
     Args:
         transform: 要验证的变换矩阵
-        points: 校准点列表
+        points: 校准点列表或 CalibrationPointSet
 
     Returns:
         (avg_error, errors): 平均误差和每个点的误差列表
     """
-    errors = []
+    point_set = _as_point_set(points)
 
-    for point in points:
-        # 使用变换矩阵计算预测的地图坐标
-        predicted_x, predicted_y = transform.transform(point.game_pos)
-
-        # 计算与实际标注点的误差
-        error_x = predicted_x - point.map_x
-        error_y = predicted_y - point.map_y
-        error = np.sqrt(error_x**2 + error_y**2)
-
-        errors.append((error_x, error_y))
+    # 一次矩阵乘法得到所有预测的地图坐标，平移和减去实际坐标都原地完成，
+    # 整个过程只分配一个 (n, 2) 数组
+    M = np.array([[transform.a, transform.d],
+                  [transform.b, transform.e]])
+    diff = point_set.game_xz @ M
+    diff += (transform.c, transform.f)
+    diff -= point_set.map_xy
 
     # 计算平均误差
-    avg_error = np.mean([np.sqrt(ex**2 + ey**2) for ex, ey in errors])
+    avg_error = np.mean(np.hypot(diff[:, 0], diff[:, 1]))
 
+    errors = [tuple(row) for row in diff.tolist()]
     return avg_error, errors
 
 
@@ -406,25 +521,26 @@ if __name__ == "__main__":
 
 # ==================== 局部插值定位算法 ====================
 
-def _calculate_2d_distance(pos1: Position3D, pos2: Position3D) -> float:
+def _squared_2d_distance(x1: float, z1: float, x2: float, z2: float) -> float:
     """
-    计算两点的 2D 水平距离（忽略 Y 轴高度）
+    计算两点的 2D 水平距离的平方（忽略 Y 轴高度）
 
-    使用 X, Z 坐标计算欧氏距离
+    距离平方与距离单调一致，比较/排序时无需开方，
+    需要真实距离时再用 math.sqrt
 
     Args:
-        pos1: 第一个位置
-        pos2: 第二个位置
+        x1, z1: 第一个位置的 X, Z 坐标
+        x2, z2: 第二个位置的 X, Z 坐标
 
     Returns:
-        float: 2D 距离（游戏单位）
+        float: 2D 距离的平方（游戏单位²）
     """
-    dx = pos1.x - pos2.x
-    dz = pos1.z - pos2.z
-    return np.sqrt(dx**2 + dz**2)
+    dx = x1 - x2
+    dz = z1 - z2
+    return dx * dx + dz * dz
 
 
-def _is_inside_triangle_2d(point: Position3D, triangle: List[Position3D]) -> bool:
+def _is_inside_triangle_2d(point: Position3D, triangle: np.ndarray) -> bool:
     """
     判断点是否在三角形内（2D，使用重心坐标法）
 
@@ -432,7 +548,7 @@ def _is_inside_triangle_2d(point: Position3D, triangle: List[Position3D]) -> boo
 
     Args:
         point: 待检测点
-        triangle: 三角形的3个顶点
+        triangle: 三角形的3个顶点 (x, z)，形状 (3, 2)
 
     Returns:
         bool: 是否在三角形内
@@ -442,9 +558,7 @@ def _is_inside_triangle_2d(point: Position3D, triangle: List[Position3D]) -> boo
 
     # 提取 2D 坐标 (x, z)
     p = np.array([point.x, point.z])
-    a = np.array([triangle[0].x, triangle[0].z])
-    b = np.array([triangle[1].x, triangle[1].z])
-    c = np.array([triangle[2].x, triangle[2].z])
+    a, b, c = triangle
 
     # 计算向量
     v0 = c - a
@@ -472,7 +586,7 @@ def _is_inside_triangle_2d(point: Position3D, triangle: List[Position3D]) -> boo
 
 
 def _calculate_local_interpolation(
-    points: List[CalibrationPoint],
+    points: CalibrationPointSet,
     player_pos: Position3D,
     k: int = 4,
     max_distance_threshold: float = 1000.0
@@ -502,37 +616,43 @@ def _calculate_local_interpolation(
     if n < 3:
         raise ValueError("局部插值至少需要3个校准点")
 
-    # 1. 计算 2D 距离（使用 x, z 坐标）
-    distances = []
-    for point in points:
-        dist = _calculate_2d_distance(player_pos, point.game_pos)
-        distances.append((dist, point))
+    # 1. 计算 2D 距离平方（使用 x, z 坐标，一次性向量计算；排序无需开方）
+    dx = points.game_xz[:, 0] - player_pos.x
+    dz = points.game_xz[:, 1] - player_pos.z
+    sq_distances = dx * dx + dz * dz
 
-    # 2. 按距离排序，选择最近的 k 个点
-    distances.sort(key=lambda x: x[0])
+    # 2. 选择最近的 k 个点：先用 O(n) 的 partition 找到第 k 小的距离，
+    #    只对不超过它的候选点做稳定排序（距离相同时保持原顺序）
     k_actual = min(k, n)
-    nearest_points = [point for _, point in distances[:k_actual]]
-    nearest_distances = [dist for dist, _ in distances[:k_actual]]
-
-    # 3. 距离检查（警告但不阻止）
-    max_dist = nearest_distances[-1]
+    if k_actual < n:
+        kth_sq_distance = np.partition(sq_distances, k_actual - 1)[k_actual - 1]
+        candidates = np.flatnonzero(sq_distances <= kth_sq_distance)
+    else:
+        candidates = np.arange(n)
+    order = np.argsort(sq_distances[candidates], kind='stable')[:k_actual]
+    nearest_indices = candidates[order]
+    nearest_points = points.subset(nearest_indices)
+
+    # 3. 距离检查（警告但不阻止），只对输出用到的两个距离开方
+    min_dist = math.sqrt(sq_distances[nearest_indices[0]])
+    max_dist = math.sqrt(sq_distances[nearest_indices[-1]])
     if max_dist > max_distance_threshold:
-        print(f"  警告: 最远的校准点距离 {max_dist:.1f} 游戏单位，超出阈值 {max_distance_threshold}")
+        log.debug("  警告: 最远的校准点距离 %.1f 游戏单位，超出阈值 %s", max_dist, max_distance_threshold)
 
     # 4. 日志输出
-    print(f"  局部插值: 使用最近 {k_actual}/{n} 个校准点")
-    print(f"    距离范围: {nearest_distances[0]:.1f} ~ {max_dist:.1f} 游戏单位")
+    log.debug("  局部插值: 使用最近 %d/%d 个校准点", k_actual, n)
+    log.debug("    距离范围: %.1f ~ %.1f 游戏单位", min_dist, max_dist)
 
-    # 5. 包围检测（简化版：只检测3个点的三角形）
-    if k_actual >= 3:
+    # 5. 包围检测（简化版：只检测3个点的三角形，结果仅用于日志，未开启 debug 时跳过）
+    if k_actual >= 3 and log.isEnabledFor(logging.DEBUG):
         is_inside = _is_inside_triangle_2d(
             player_pos,
-            [p.game_pos for p in nearest_points[:3]]
+            nearest_points.game_xz[:3]
         )
         if is_inside:
-            print(f"    ✓ 玩家位于校准点凸包内（最优）")
+            log.debug("    ✓ 玩家位于校准点凸包内（最优）")
         else:
-            print(f"    ⚠ 玩家位于校准点凸包外（次优，但可接受）")
+            log.debug("    ⚠ 玩家位于校准点凸包外（次优，但可接受）")
 
     # 6. 使用基础最小二乘法计算变换
     return _calculate_basic_transform(nearest_points)
@@ -2,9 +2,13 @@
 地图功能配置管理器
 管理快捷键、步进值等用户可配置的功能参数
 """
+import atexit
 import json
 import os
+import threading
+import weakref
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 
@@ -17,33 +21,90 @@ class FunctionConfig:
     zoom_step: float = 0.05              # 缩放步进值
 
 
+@lru_cache(maxsize=1)
+def _load_config_from_disk(path: str, mtime: float) -> dict:
+    """
+    读取并解析配置文件
+
+    以修改时间作为缓存键的一部分，文件被修改后自动重新解析；
+    返回的字典为共享缓存，调用方不得修改
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# 程序退出时写入所有存活管理器尚未保存的修改
+# 使用弱引用集合，退出钩子不会让已废弃的管理器常驻内存
+_live_managers: "weakref.WeakSet[FunctionConfigManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_managers():
+    """退出钩子：写入所有存活管理器的未保存修改"""
+    for manager in list(_live_managers):
+        manager.flush()
+
+
 class FunctionConfigManager:
     """功能配置管理器"""
 
     CONFIG_FILE = "map_function_config.json"
+    SAVE_DEBOUNCE_SECONDS = 0.2  # 连续修改（如拖动滑块）合并为一次写入
 
     def __init__(self):
         self.config = self._load()
 
+        # 延迟写入状态：save() 只标记修改，空闲一段时间后由定时器写入
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.RLock()
+        # 程序退出时写入尚未保存的修改（见 _flush_live_managers）
+        _live_managers.add(self)
+
     def _load(self) -> FunctionConfig:
         """加载配置文件"""
         try:
             if os.path.exists(self.CONFIG_FILE):
-                with open(self.CONFIG_FILE, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return FunctionConfig(
-                        overlay_hotkey=data.get("overlay_hotkey", "F5"),
-                        zoom_in_hotkey=data.get("zoom_in_hotkey", "+"),
-                        zoom_out_hotkey=data.get("zoom_out_hotkey", "-"),
-                        zoom_step=float(data.get("zoom_step", 0.05))
-                    )
+                data = _load_config_from_disk(self.CONFIG_FILE, os.path.getmtime(self.CONFIG_FILE))
+                return FunctionConfig(
+                    overlay_hotkey=data.get("overlay_hotkey", "F5"),
+                    zoom_in_hotkey=data.get("zoom_in_hotkey", "+"),
+                    zoom_out_hotkey=data.get("zoom_out_hotkey", "-"),
+                    zoom_step=float(data.get("zoom_step", 0.05))
+                )
         except Exception as e:
             print(f"加载功能配置失败: {e}")
 
         return FunctionConfig()
 
     def save(self):
-        """保存配置到文件"""
+        """标记配置已修改，空闲 SAVE_DEBOUNCE_SECONDS 后写入文件"""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.SAVE_DEBOUNCE_SECONDS, self._flush_if_dirty)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _flush_if_dirty(self):
+        """定时器回调：仍有未写入的修改时保存"""
+        with self._save_lock:
+            self._save_timer = None
+            if self._dirty:
+                self._write()
+
+    def flush(self):
+        """取消延迟定时器，立即写入未保存的修改（关闭程序前调用）"""
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        """保存配置到文件（替换成功后才清除修改标记，失败时退出前会重试）"""
         try:
             data = {
                 "overlay_hotkey": self.config.overlay_hotkey,
@@ -52,8 +113,12 @@ class FunctionConfigManager:
                 "zoom_step": self.config.zoom_step
             }
 
-            with open(self.CONFIG_FILE, "w", encoding="utf-8") as f:
+            # 先写临时文件再原子替换，写入中途崩溃不会损坏原配置
+            tmp_file = f"{self.CONFIG_FILE}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.CONFIG_FILE)
+            self._dirty = False
         except Exception as e:
             print(f"保存功能配置失败: {e}")
 
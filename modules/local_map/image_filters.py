@@ -0,0 +1,196 @@
+"""
+图片滤镜内核
+悬浮窗对冲滤镜的逐像素颜色变换，按256级查找表预计算；以及地图缩放
+
+8位图片每个通道只有256种取值，预先对每个取值计算一次变换，
+整帧处理就退化为一次查表（Image.point，C实现），不再对每个像素做浮点幂运算
+"""
+
+import math
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+# 8位通道的全部取值 (0 .. 255)
+_VALUES = np.arange(256, dtype=np.float32)
+
+# 缩小时先按整数倍做盒式预缩小（Image.reduce），再用指定滤波器缩放剩余部分；
+# 缩小不到4倍时不预缩小，结果与直接缩放相同；倍数越大节省越多
+RESIZE_REDUCING_GAP = 2.0
+
+# 金字塔最小一层的短边不小于该值
+PYRAMID_MIN_SIZE = 64
+
+
+def _blend_values(values: np.ndarray, base: float, factor: float) -> np.ndarray:
+    """
+    按 Image.blend 的规则混合：base + factor * (value - base)
+
+    与Pillow相同用单精度计算，结果截断到 0..255 的整数
+    """
+    base = np.float32(base)
+    blended = base + np.float32(factor) * (values - base)
+    return np.clip(blended, 0.0, 255.0).astype(np.uint8).astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def filter_lut(brightness: float, contrast: float, gamma: float, mean: int = 128) -> Tuple[int, ...]:
+    """
+    生成亮度、对比度、伽马合成后的查找表
+
+    三步都是对单个通道取值的函数，合成为一张表后整帧只需查表一次；
+    每步与原先的 ImageEnhance / numpy 实现一样截断为8位，输出逐像素一致
+
+    Args:
+        brightness: 亮度偏移 (-1.0 到 1.0)，像素乘以 1+brightness
+        contrast: 对比度偏移 (-0.5 到 0.5)，以 mean 为中心拉伸 1+contrast 倍
+        gamma: 伽马值（小于0.1时按0.1处理，防止除以0），output = input^(1/gamma)
+        mean: 对比度中心，亮度调整后图片的灰度均值（见 contrast_mean）
+
+    Returns:
+        256项查找表
+    """
+    values = _VALUES
+
+    # 1. 亮度（系数限制在 0.0 到 2.0，与黑色混合）
+    if brightness != 0.0:
+        factor = max(0.0, min(2.0, 1.0 + brightness))
+        values = _blend_values(values, 0, factor)
+
+    # 2. 对比度（系数限制在 0.0 到 2.0，与均值灰色混合）
+    if contrast != 0.0:
+        factor = max(0.0, min(2.0, 1.0 + contrast))
+        values = _blend_values(values, mean, factor)
+
+    # 3. 伽马
+    if gamma != 1.0:
+        levels = np.power(values / 255.0, 1.0 / max(0.1, gamma))
+        values = np.clip(levels * 255.0, 0, 255)
+
+    return tuple(values.astype(np.uint8).tolist())
+
+
+def contrast_mean(image: Image.Image, brightness: float) -> int:
+    """
+    计算对比度调整的中心灰度（与 ImageEnhance.Contrast 相同）
+
+    即亮度调整后图片的灰度均值（四舍五入），由灰度直方图求得
+
+    Args:
+        image: RGB图片
+        brightness: 亮度偏移
+
+    Returns:
+        0..255 的灰度值
+    """
+    if brightness != 0.0:
+        image = image.point(filter_lut(brightness, 0.0, 1.0) * 3)
+    histogram = image.convert("L").histogram()
+    total = sum(histogram)
+    if not total:
+        return 0
+    return int(sum(level * count for level, count in enumerate(histogram)) / total + 0.5)
+
+
+def apply_filters(image: Image.Image, brightness: float, contrast: float, gamma: float) -> Image.Image:
+    """
+    对图片应用亮度、对比度、伽马滤镜（一次查表完成）
+
+    Args:
+        image: 要处理的图片
+        brightness: 亮度偏移
+        contrast: 对比度偏移
+        gamma: 伽马值
+
+    Returns:
+        Image.Image: 处理后的RGB图片
+    """
+    image = image.convert("RGB")
+    mean = contrast_mean(image, brightness) if contrast != 0.0 else 128
+    lut = filter_lut(brightness, contrast, gamma, mean)
+    return image.point(lut * 3)
+
+
+def prepare_source(image: Image.Image) -> Image.Image:
+    """
+    将地图原图统一为RGB/RGBA模式
+
+    调色板、灰度等模式在每次非NEAREST缩放时都会被Pillow隐式转换一次，
+    加载时转换一次，之后每次缩放都直接走RGB(A)路径
+
+    Args:
+        image: 刚加载的图片
+
+    Returns:
+        Image.Image: RGB或RGBA图片（已是这两种模式时原样返回）
+    """
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    has_alpha = image.mode in ("LA", "PA", "La") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def build_pyramid(image: Image.Image) -> List[Image.Image]:
+    """
+    构建逐层缩小一半的图片金字塔（第0层为原图）
+
+    Args:
+        image: 原图
+
+    Returns:
+        List[Image.Image]: 各层图片，第k层约为原图的 1/2^k
+    """
+    levels = [image]
+    while min(levels[-1].size) // 2 >= PYRAMID_MIN_SIZE:
+        levels.append(levels[-1].reduce(2))
+    return levels
+
+
+def resize_map_image(
+    pyramid: Sequence[Image.Image],
+    size: Tuple[int, int],
+    zoom: float,
+    high_quality: bool = False
+) -> Image.Image:
+    """
+    按缩放比例缩放地图图片
+
+    缩小到一半及以下时，从金字塔中取不小于目标尺寸的最小一层再缩放，
+    只需读取 1/4^k 的像素；整数倍缩小直接用盒式缩小
+
+    Args:
+        pyramid: build_pyramid 生成的金字塔（第0层为原图）
+        size: 目标尺寸 (width, height)
+        zoom: 相对原图的缩放比例
+        high_quality: 缩小时使用LANCZOS（默认BILINEAR，速度更快，地图上看不出差别）
+
+    Returns:
+        Image.Image: 缩放后的图片
+    """
+    # 缩放比例为 1/n（n为整数）时直接做盒式缩小：
+    # 先取 n 所含的 2 的幂对应的金字塔层，剩余的奇数倍用 Image.reduce
+    width, height = pyramid[0].size
+    factor = round(1.0 / zoom)
+    if factor >= 2 and abs(width / factor - size[0]) <= 1 and abs(height / factor - size[1]) <= 1:
+        level = min(len(pyramid) - 1, (factor & -factor).bit_length() - 1)
+        factor >>= level
+        return pyramid[level] if factor == 1 else pyramid[level].reduce(factor)
+
+    level = 0
+    if zoom <= 0.5:
+        level = min(len(pyramid) - 1, math.floor(-math.log2(zoom)))
+    image = pyramid[level]
+    if image.size == size:
+        return image
+
+    # 相对所选层级的缩放比例
+    zoom *= 2 ** level
+    if zoom < 1.0:
+        # 缩小：先整数倍预缩小减少读取量
+        resample = Image.Resampling.LANCZOS if high_quality else Image.Resampling.BILINEAR
+        return image.resize(size, resample, reducing_gap=RESIZE_REDUCING_GAP)
+    # 放大：使用BILINEAR速度更快
+    return image.resize(size, Image.Resampling.BILINEAR)
@@ -4,7 +4,13 @@ Local Map Module - Log Parser
 解析塔科夫日志文件，提取战局信息和服务器IP
 """
 
+import glob
+import logging
+import os
 import re
+import threading
+import time
+import traceback
 from datetime import datetime
 from typing import Optional, List
 from .models import RaidInfo
@@ -12,6 +18,52 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 
+# 逐行解析时的诊断输出走 debug 级别日志，未开启时不做任何格式化
+log = logging.getLogger(__name__)
+
+# 地图加载行的关键子串
+_MAP_BUNDLE_MARKER = "scene preset path:maps/"
+
+# 固定前缀的字段用 str.partition 截取，正则只用于校验截取出的短字段
+_LOCATION_PREFIX = "Location: "
+_RAID_ID_PREFIX = "shortId: "
+_RAID_ID_LENGTH = 6
+
+# 日志解析用的正则表达式（模块加载时编译一次）
+_BUNDLE_NAME_RE = re.compile(r'[a-zA-Z0-9_]+', re.ASCII)
+_RAID_ID_CHARS_RE = re.compile(r'[A-Z0-9]+', re.ASCII)
+# 日志目录名中的日期 (YYYY.MM.DD) 和时间 (H-mm-ss) 字段
+_LOG_DATE_RE = re.compile(r'\d{4}\.\d{2}\.\d{2}', re.ASCII)
+_LOG_TIME_RE = re.compile(r'\d{1,2}-\d{2}-\d{2}', re.ASCII)
+_QUEUE_TIME_RE = re.compile(r'MatchingCompleted:[0-9.,]+ real:(?P<queueTime>[0-9.,]+)', re.ASCII)
+# 服务器IP：可能出现在 "Server: " / "Connect to " / "EndPoint: " 之后，也可能单独出现，
+# 合并为一个模式，一次扫描找出行内所有IPv4
+_IP_RE = re.compile(
+    r'(?:Server: |Connect to |EndPoint: )?(?P<ip>(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3}))', re.ASCII
+)
+
+
+def _log_folder_sort_key(name: str) -> tuple:
+    """
+    日志目录名的排序键，按时间先后排序
+
+    目录名格式为 log_YYYY.MM.DD_H-mm-ss，后面可能还带有游戏版本号（_0.16.0.1.33120），
+    除小时可能只有1位外都已补零，小时补零后直接按字符串比较即可，无需解析时间戳；
+    格式不符的目录排在最前
+    """
+    parts = name.split('_', 3)
+    if (len(parts) < 3 or parts[0] != 'log'
+            or not _LOG_DATE_RE.fullmatch(parts[1]) or not _LOG_TIME_RE.fullmatch(parts[2])):
+        return (0, name)
+    hour, _, minute_second = parts[2].partition('-')
+    return (1, parts[1], hour.zfill(2), minute_second)
+
+
+def _is_server_ip_candidate(a: int, b: int) -> bool:
+    """判断IPv4地址是否可能是游戏服务器地址（排除 127.x.x.x 本地回环和 192.168.x.x 局域网）"""
+    return a != 127 and not (a == 192 and b == 168)
+
+
 class LogDirectoryWatcher(FileSystemEventHandler):
     """
     监控日志目录，检测新的 application.log 文件创建
@@ -19,20 +71,22 @@ class LogDirectoryWatcher(FileSystemEventHandler):
     当游戏重启时，会创建新的 log_YYYY.MM.DD_H-mm-ss/ 目录，
     并在其中生成新的 application.log 文件。
 
-    此类监听这些文件创建事件，立即通知 LogMonitor 切换。
+    此类监听这些文件创建事件，立即通知 LogMonitor 切换；
+    同时转发文件修改事件，让 LogMonitor 有新内容时立即读取。
     """
 
-    def __init__(self, on_new_log_file):
+    def __init__(self, on_new_log_file, on_log_modified=None):
         """
         Args:
             on_new_log_file: 回调函数 (new_log_path: str) -> None
+            on_log_modified: 文件修改回调函数 (log_path: str) -> None（可选）
         """
         super().__init__()
         self.on_new_log_file = on_new_log_file
+        self.on_log_modified = on_log_modified
 
     def on_created(self, event):
         """文件创建事件处理"""
-        import os
         if event.is_directory:
             return
 
@@ -42,6 +96,12 @@ class LogDirectoryWatcher(FileSystemEventHandler):
             print(f"[LogDirectoryWatcher] 检测到新日志文件: {event.src_path}")
             self.on_new_log_file(event.src_path)
 
+    def on_modified(self, event):
+        """文件修改事件处理"""
+        if event.is_directory or self.on_log_modified is None:
+            return
+        self.on_log_modified(event.src_path)
+
 
 class LogParser:
     """
@@ -88,93 +148,151 @@ class LogParser:
                 event_type: "map_loading" | "raid_started" | None
                 raid_info: RaidInfo 对象或 None
         """
-        # 检测地图加载
-        if "scene preset path:maps/" in line:
-            map_bundle_match = re.search(
-                r'scene preset path:maps/(?P<mapBundleName>[a-zA-Z0-9_]+)\.bundle',
-                line
-            )
-            if map_bundle_match:
-                map_bundle = map_bundle_match.group('mapBundleName')
-                print(f"[LogParser] 检测到地图Bundle: {map_bundle}")
-                if map_bundle in self.MAP_BUNDLES:
-                    map_id = self.MAP_BUNDLES[map_bundle]
-                    print(f"[LogParser] 地图ID: {map_id}")
-                    self.current_raid = RaidInfo(
-                        raid_id="",  # 在后续的TRACE-NetworkGameCreate中获取
-                        map_id=map_id,
-                        is_online=False,
-                        is_pmc=True
-                    )
-                    # 触发地图加载事件
-                    return ("map_loading", self.current_raid)
-
-        # 检测匹配完成（获取队列时间）
-        if "MatchingCompleted" in line and self.current_raid:
-            queue_time_match = re.search(
-                r'MatchingCompleted:[0-9.,]+ real:(?P<queueTime>[0-9.,]+)',
-                line
-            )
-            if queue_time_match:
-                queue_time_str = queue_time_match.group('queueTime').replace(',', '.')
-                self.current_raid.queue_time = float(queue_time_str)
+        # 除地图加载外，其余事件都依赖当前战局；尚未加载地图时绝大多数行只需一次子串测试
+        if self.current_raid is None and _MAP_BUNDLE_MARKER not in line:
+            return (None, None)
 
-        # 检测网络游戏创建（获取战局ID、地图名称、模式）
-        if "TRACE-NetworkGameCreate profileStatus" in line and self.current_raid:
-            # 获取地图名称
-            map_match = re.search(r'Location: (?P<map>[^,]+)', line)
-            if map_match:
-                self.current_raid.map_id = map_match.group('map')
-
-            # 获取战局ID
-            raid_id_match = re.search(r'shortId: (?P<raidId>[A-Z0-9]{6})', line)
-            if raid_id_match:
-                self.current_raid.raid_id = raid_id_match.group('raidId')
-                print(f"[LogParser] 检测到RaidID: {self.current_raid.raid_id}")
-
-            # 判断是否在线模式
-            self.current_raid.is_online = "RaidMode: Online" in line
-
-            # 判断是否PMC
-            if "Pmc" in line:
-                self.current_raid.is_pmc = True
-            elif "Savage" in line:
-                self.current_raid.is_pmc = False
-
-        # 检测战局开始
-        if "GameStarted" in line and self.current_raid:
-            self.current_raid.start_time = datetime.now()
-            print(f"[LogParser] ========== 战局开始 ==========")
-            print(f"[LogParser]   地图: {self.current_raid.map_id}")
-            print(f"[LogParser]   RaidID: {self.current_raid.raid_id}")
-            print(f"[LogParser]   模式: {'在线' if self.current_raid.is_online else '离线'} / {'PMC' if self.current_raid.is_pmc else 'Scav'}")
-            print(f"[LogParser] ==============================")
-            # 触发战局开始事件
-            raid_info = self.current_raid
-            return ("raid_started", raid_info)
+        # 按关键子串分派到对应的处理函数（顺序即处理顺序）
+        for marker, handler in self._LINE_HANDLERS:
+            if marker in line:
+                result = handler(self, line)
+                if result is not None:
+                    return result
 
         # 检测服务器IP（可能在不同的日志格式中）
         # 注意：需要根据实际的日志格式调整正则表达式
-        if self.current_raid and not self.current_raid.server_ip:
-            # 尝试多种可能的IP格式
-            ip_patterns = [
-                r'(?P<ip>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})',  # 标准IPv4格式
-                r'Server: (?P<ip>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})',
-                r'Connect to (?P<ip>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})',
-                r'EndPoint: (?P<ip>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})',
-            ]
-
-            for pattern in ip_patterns:
-                ip_match = re.search(pattern, line)
-                if ip_match:
-                    ip = ip_match.group('ip')
-                    # 排除本地IP
-                    if not ip.startswith('127.') and not ip.startswith('192.168.'):
-                        self.current_raid.server_ip = ip
-                        break
+        # 没有 '.' 的行不可能包含IP，跳过正则
+        if self.current_raid and not self.current_raid.server_ip and '.' in line:
+            # 取行内第一个非本地IP
+            for ip_match in _IP_RE.finditer(line):
+                # 排除本地IP
+                if _is_server_ip_candidate(int(ip_match.group(2)), int(ip_match.group(3))):
+                    self.current_raid.server_ip = ip_match.group('ip')
+                    break
 
         return (None, None)
 
+    def _handle_map_bundle(self, line: str):
+        """检测地图加载"""
+        # scene preset path:maps/<mapBundleName>.bundle
+        map_bundle, found, _ = line.partition(_MAP_BUNDLE_MARKER)[2].partition('.bundle')
+        if found and _BUNDLE_NAME_RE.fullmatch(map_bundle):
+            log.debug("[LogParser] 检测到地图Bundle: %s", map_bundle)
+            map_id = self.MAP_BUNDLES.get(map_bundle)
+            if map_id is not None:
+                log.debug("[LogParser] 地图ID: %s", map_id)
+                self.current_raid = RaidInfo(
+                    raid_id="",  # 在后续的TRACE-NetworkGameCreate中获取
+                    map_id=map_id,
+                    is_online=False,
+                    is_pmc=True
+                )
+                # 触发地图加载事件
+                return ("map_loading", self.current_raid)
+        return None
+
+    def _handle_matching_completed(self, line: str):
+        """检测匹配完成（获取队列时间）"""
+        if self.current_raid:
+            queue_time_match = _QUEUE_TIME_RE.search(line)
+            if queue_time_match:
+                queue_time_str = queue_time_match.group('queueTime').replace(',', '.')
+                self.current_raid.queue_time = float(queue_time_str)
+        return None
+
+    def _handle_network_game_create(self, line: str):
+        """检测网络游戏创建（获取战局ID、地图名称、模式）"""
+        if not self.current_raid:
+            return None
+
+        # 获取地图名称
+        _, found, rest = line.partition(_LOCATION_PREFIX)
+        if found:
+            map_name = rest.partition(',')[0]
+            if map_name:
+                self.current_raid.map_id = map_name
+
+        # 获取战局ID（前缀后的6位大写字母或数字）
+        _, found, rest = line.partition(_RAID_ID_PREFIX)
+        raid_id = rest[:_RAID_ID_LENGTH]
+        if found and len(raid_id) == _RAID_ID_LENGTH and _RAID_ID_CHARS_RE.fullmatch(raid_id):
+            self.current_raid.raid_id = raid_id
+            log.debug("[LogParser] 检测到RaidID: %s", self.current_raid.raid_id)
+
+        # 判断是否在线模式
+        self.current_raid.is_online = "RaidMode: Online" in line
+
+        # 判断是否PMC
+        if "Pmc" in line:
+            self.current_raid.is_pmc = True
+        elif "Savage" in line:
+            self.current_raid.is_pmc = False
+        return None
+
+    def _handle_game_started(self, line: str):
+        """检测战局开始"""
+        if not self.current_raid:
+            return None
+
+        raid = self.current_raid
+        raid.start_time = datetime.now()
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[LogParser] 战局开始: 地图=%s, RaidID=%s, 模式=%s / %s",
+                      raid.map_id, raid.raid_id,
+                      '在线' if raid.is_online else '离线',
+                      'PMC' if raid.is_pmc else 'Scav')
+        # 触发战局开始事件
+        raid_info = self.current_raid
+        return ("raid_started", raid_info)
+
+    # 关键子串 -> 处理函数，处理函数返回事件元组时 parse_line 立即返回
+    _LINE_HANDLERS = (
+        (_MAP_BUNDLE_MARKER, _handle_map_bundle),
+        ("MatchingCompleted", _handle_matching_completed),
+        ("TRACE-NetworkGameCreate profileStatus", _handle_network_game_create),
+        ("GameStarted", _handle_game_started),
+    )
+    # 所有关键子串的合并模式，用于在整块文本中一次扫描定位候选行
+    _MARKER_RE = re.compile('|'.join(re.escape(marker) for marker, _ in _LINE_HANDLERS))
+
+    def parse_buffer(self, text: str):
+        """
+        解析多行文本，依次产出事件
+
+        只有包含关键子串的行可能产生事件，先用合并模式在整块文本上一次扫描定位这些行，
+        其余行直接跳过；仅在战局尚未获取服务器IP时（IP可能出现在任意行）才逐行解析。
+        结果与对每一行调用 parse_line 相同。
+
+        Args:
+            text: 由完整行组成的文本
+
+        Yields:
+            (event_type, raid_info): 与 parse_line 的非空返回值相同
+        """
+        pos = 0
+        end_of_text = len(text)
+        marker_search = self._MARKER_RE.search
+
+        while pos < end_of_text:
+            if self.current_raid is not None and not self.current_raid.server_ip:
+                # 需要检测服务器IP：逐行解析
+                line_start = pos
+            else:
+                match = marker_search(text, pos)
+                if match is None:
+                    break
+                line_start = text.rfind('\n', pos, match.start()) + 1 or pos
+
+            line_end = text.find('\n', line_start)
+            if line_end < 0:
+                line_end = end_of_text
+
+            event_type, raid_info = self.parse_line(text[line_start:line_end].rstrip())
+            if event_type is not None:
+                yield event_type, raid_info
+
+            pos = line_end + 1
+
     def get_current_raid(self) -> Optional[RaidInfo]:
         """获取当前正在进行的战局信息"""
         return self.current_raid
@@ -187,6 +305,17 @@ class LogMonitor:
     持续监控塔科夫日志文件，实时解析新增内容
     """
 
+    # 读取缓冲区大小（字节）：新增内容按块读取，内存占用与单次新增量无关
+    READ_CHUNK_SIZE = 65536
+
+    # 轮询间隔（秒）：文件系统监控不可用时使用
+    POLL_INTERVAL = 5
+    # 文件系统监控可用时由修改事件唤醒，此间隔仅作为事件丢失时的兜底
+    EVENT_FALLBACK_INTERVAL = 15
+    # 连续出错时：前几次都输出，之后每隔一段时间（秒）才输出一次
+    ERROR_REPORT_BURST = 3
+    ERROR_REPORT_INTERVAL = 30
+
     def __init__(self, log_file_path: str, on_raid_start=None, on_raid_end=None,
                  on_map_loading=None, start_from_end=True, on_log_switch=None):
         """
@@ -214,6 +343,92 @@ class LogMonitor:
         self.last_dir_check_time = 0  # 移到实例属性，用于轮询备用检查
         self.fs_observer = None  # FileSystemWatcher observer
         self.dir_watcher = None  # Event handler
+        self._log_file = None  # 保持打开的日志文件句柄（仅由监控线程使用）
+        self._log_file_opened_path = None  # 句柄对应的文件路径
+        self._wake_event = threading.Event()  # 日志文件修改/切换时唤醒监控线程
+        self._monitor_thread = None  # 监控线程（持有日志文件句柄）
+        self._err_count = 0  # 连续出错次数，读取成功后清零
+        self._last_err_report = 0.0  # 上次输出错误的时间（time.monotonic）
+
+    def _get_log_file(self):
+        """
+        获取当前日志文件的句柄，文件切换后重新打开
+
+        句柄在两次轮询之间保持打开，避免每次轮询都重新打开文件
+        """
+        if self._log_file is not None and self._log_file_opened_path == self.log_file_path:
+            return self._log_file
+
+        self._close_log_file()
+        path = self.log_file_path
+        self._log_file = open(path, 'rb', buffering=self.READ_CHUNK_SIZE)
+        self._log_file_opened_path = path
+        return self._log_file
+
+    def _should_report_error(self) -> bool:
+        """
+        记录一次出错，并判断是否需要输出
+
+        文件被占用或不存在时每次轮询都会出错，限制输出频率，避免刷屏和反复格式化堆栈
+        """
+        self._err_count += 1
+        now = time.monotonic()
+        if self._err_count <= self.ERROR_REPORT_BURST or now - self._last_err_report > self.ERROR_REPORT_INTERVAL:
+            self._last_err_report = now
+            return True
+        return False
+
+    def _close_log_file(self):
+        """关闭保持打开的日志文件句柄"""
+        if self._log_file is not None:
+            try:
+                self._log_file.close()
+            except OSError:
+                pass
+            self._log_file = None
+            self._log_file_opened_path = None
+
+    def _read_new_lines(self, f):
+        """
+        从上次读取的位置按块读取新增内容并解析
+
+        以二进制按固定大小的块读取，每块只解码到最后一个换行符为止的完整行，
+        整块交给 LogParser.parse_buffer 扫描；
+        末尾尚未写完的半行不消费，下次读取时从该行开头继续
+        """
+        # 跳转到上次读取的位置
+        f.seek(self.last_position)
+
+        # 循环内用到的方法和回调先绑定为局部变量
+        read = f.read
+        chunk_size = self.READ_CHUNK_SIZE
+        parse_buffer = self.parser.parse_buffer
+        on_map_loading = self.on_map_loading
+        on_raid_start = self.on_raid_start
+
+        pending = b''
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                break
+
+            data = pending + chunk
+            complete_end = data.rfind(b'\n') + 1
+            pending = data[complete_end:]
+            if not complete_end:
+                continue
+
+            text = data[:complete_end].decode('utf-8', 'ignore')
+            for event_type, raid_info in parse_buffer(text):
+                # 处理地图加载事件
+                if event_type == "map_loading" and raid_info and on_map_loading:
+                    on_map_loading(raid_info)
+                # 处理战局开始事件
+                elif event_type == "raid_started" and raid_info and on_raid_start:
+                    on_raid_start(raid_info)
+
+        # 更新位置（不包含未完成的半行）
+        self.last_position = f.tell() - len(pending)
 
     def _get_latest_log_dir(self, logs_base_dir):
         """
@@ -222,46 +437,27 @@ class LogMonitor:
         Returns:
             最新日志目录的完整路径，如果没有找到则返回None
         """
-        import os
-        import re
-        from datetime import datetime
-
-        if not os.path.exists(logs_base_dir):
+        # scandir 一次枚举即可得到目录项类型，无需再逐个 stat
+        try:
+            with os.scandir(logs_base_dir) as entries:
+                log_folders = [
+                    entry.name for entry in entries
+                    if entry.name.startswith("log_") and entry.is_dir()
+                ]
+        except OSError:
             return None
 
-        log_folders = [
-            f for f in os.listdir(logs_base_dir)
-            if os.path.isdir(os.path.join(logs_base_dir, f)) and f.startswith("log_")
-        ]
-
         if not log_folders:
             return None
 
-        # Parse timestamps and find the latest
-        latest_folder = None
-        latest_date = None
+        # Format: log_YYYY.MM.DD_H-mm-ss (H can be 1 or 2 digits)
+        latest_folder = max(log_folders, key=_log_folder_sort_key)
 
-        for folder in log_folders:
-            # Format: log_YYYY.MM.DD_H-mm-ss (H can be 1 or 2 digits)
-            match = re.match(r'log_(\d{4})\.(\d{2})\.(\d{2})_(\d{1,2})-(\d{2})-(\d{2})', folder)
-            if match:
-                try:
-                    year, month, day, hour, minute, second = map(int, match.groups())
-                    folder_date = datetime(year, month, day, hour, minute, second)
-                    if latest_date is None or folder_date > latest_date:
-                        latest_date = folder_date
-                        latest_folder = folder
-                except ValueError:
-                    continue
-
-        # 备选方案：如果时间戳解析全部失败，返回最后一个目录
-        if latest_folder is None and log_folders:
-            latest_folder = sorted(log_folders)[-1]  # 按字母排序取最后一个
+        # 备选方案：没有符合格式的目录时，按字母排序取最后一个
+        if _log_folder_sort_key(latest_folder)[0] == 0:
             print(f"[LogMonitor] 警告：时间戳解析失败，使用备选方案选择目录: {latest_folder}")
 
-        if latest_folder:
-            return os.path.join(logs_base_dir, latest_folder)
-        return None
+        return os.path.join(logs_base_dir, latest_folder)
 
     def _on_new_log_file_detected(self, new_log_path: str):
         """
@@ -269,7 +465,6 @@ class LogMonitor:
 
         这是事件驱动的切换机制，延迟 < 100ms
         """
-        import os
         new_log_dir = os.path.dirname(new_log_path)
 
         # 检查是否真的是新目录
@@ -286,45 +481,51 @@ class LogMonitor:
         # 根据 start_from_end 设置决定起始位置
         if self.start_from_end:
             try:
-                with open(new_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(0, 2)  # 跳到末尾
-                    self.last_position = f.tell()
-                    print(f"[LogMonitor] 跳过现有内容，从位置 {self.last_position} 开始")
-            except Exception as e:
+                # 直接取文件大小作为末尾位置，无需打开文件
+                self.last_position = os.path.getsize(new_log_path)
+                print(f"[LogMonitor] 跳过现有内容，从位置 {self.last_position} 开始")
+            except OSError as e:
                 print(f"[LogMonitor] 定位文件末尾失败: {e}，从头读取")
                 self.last_position = 0
         else:
             self.last_position = 0
 
+        # 立即唤醒监控线程读取新文件
+        self._wake_event.set()
+
         # 触发回调通知 UI
         if self.on_log_switch:
             self.on_log_switch(new_log_path)
 
+    def _on_log_file_modified(self, log_path: str):
+        """
+        FileSystemWatcher 检测到文件修改时调用
+
+        只有当前监控的日志文件被修改时才唤醒监控线程
+        """
+        if os.path.normcase(log_path) == os.path.normcase(self.log_file_path):
+            self._wake_event.set()
+
     def start(self):
         """开始监控日志文件"""
-        import threading
-        import time
-        import os
-
         # Initialize directory tracking
         if os.path.exists(self.log_file_path):
             self.current_log_dir = os.path.dirname(self.log_file_path)
             # Get the Logs base directory (parent of log_YYYY.MM.DD_H-mm-ss)
             self.logs_base_dir = os.path.dirname(self.current_log_dir)
-            print(f"[LogMonitor] 基础日志目录: {self.logs_base_dir}")
-            print(f"[LogMonitor] 当前日志子目录: {self.current_log_dir}")
+            print(f"[LogMonitor] 基础日志目录: {self.logs_base_dir}\n"
+                  f"[LogMonitor] 当前日志子目录: {self.current_log_dir}")
 
         # 如果设置了从末尾开始，则跳过现有内容
         if self.start_from_end:
             try:
-                with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(0, 2)  # 跳转到文件末尾 (0 offset from SEEK_END)
-                    self.last_position = f.tell()
-                    print(f"[LogMonitor] 跳过现有日志内容，从位置 {self.last_position} 开始监控")
+                # 文件大小即末尾的字节偏移（读取端以二进制模式打开）
+                self.last_position = os.path.getsize(self.log_file_path)
+                print(f"[LogMonitor] 跳过现有日志内容，从位置 {self.last_position} 开始监控")
             except FileNotFoundError:
                 print(f"[LogMonitor] 日志文件不存在: {self.log_file_path}，将在文件创建后开始监控")
                 self.last_position = 0
-            except Exception as e:
+            except OSError as e:
                 print(f"[LogMonitor] 初始化文件位置时发生错误: {e}，从头开始监控")
                 self.last_position = 0
 
@@ -332,7 +533,8 @@ class LogMonitor:
         if self.logs_base_dir:
             try:
                 self.dir_watcher = LogDirectoryWatcher(
-                    on_new_log_file=self._on_new_log_file_detected
+                    on_new_log_file=self._on_new_log_file_detected,
+                    on_log_modified=self._on_log_file_modified
                 )
                 self.fs_observer = Observer()
                 # 递归监控 Logs/ 目录及其子目录
@@ -370,36 +572,26 @@ class LogMonitor:
 
                         self.last_dir_check_time = current_time
 
-                    # Read new log lines
-                    with open(self.log_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        # 跳转到上次读取的位置
-                        f.seek(self.last_position)
-
-                        # 读取新增的行
-                        new_lines = f.readlines()
-                        if new_lines:
-                            for line in new_lines:
-                                event_type, raid_info = self.parser.parse_line(line.strip())
+                    # Read new log lines（句柄保持打开，文件切换时才重新打开）
+                    f = self._get_log_file()
 
-                                # 处理地图加载事件
-                                if event_type == "map_loading" and raid_info and self.on_map_loading:
-                                    self.on_map_loading(raid_info)
-                                # 处理战局开始事件
-                                elif event_type == "raid_started" and raid_info and self.on_raid_start:
-                                    self.on_raid_start(raid_info)
+                    # 文件被截断（比上次读取位置短）时从头读取
+                    if os.fstat(f.fileno()).st_size < self.last_position:
+                        print(f"[LogMonitor] 日志文件被截断，从头读取: {self.log_file_path}")
+                        self.last_position = 0
 
-                        # 更新位置
-                        self.last_position = f.tell()
+                    self._read_new_lines(f)
+                    self._err_count = 0
 
                 except FileNotFoundError:
-                    print(f"[LogMonitor] 日志文件不存在: {self.log_file_path}")
+                    if self._should_report_error():
+                        print(f"[LogMonitor] 日志文件不存在: {self.log_file_path}（连续 {self._err_count} 次）")
 
                     # 立即尝试恢复：查找最新日志目录
                     if self.logs_base_dir:
                         latest_log_dir = self._get_latest_log_dir(self.logs_base_dir)
                         if latest_log_dir and latest_log_dir != self.current_log_dir:
                             # 查找新目录中的 application.log
-                            import glob
                             log_files = glob.glob(os.path.join(latest_log_dir, "*application*.log"))
                             if log_files:
                                 new_log_file = max(log_files, key=os.path.getmtime)  # 最新的
@@ -412,19 +604,30 @@ class LogMonitor:
                                 continue  # 立即重试，不睡眠
 
                 except Exception as e:
-                    print(f"[LogMonitor] 监控日志文件时发生错误: {e}")
-                    import traceback
-                    traceback.print_exc()  # 打印详细堆栈，便于调试
+                    if self._should_report_error():
+                        print(f"[LogMonitor] 监控日志文件时发生错误（连续 {self._err_count} 次）: {e}")
+                        traceback.print_exc()  # 打印详细堆栈，便于调试
 
-                # 等待5秒后再次检查
-                time.sleep(5)
+                # 等待日志修改事件唤醒；没有文件系统监控时每5秒轮询一次
+                interval = self.EVENT_FALLBACK_INTERVAL if self.fs_observer else self.POLL_INTERVAL
+                self._wake_event.wait(interval)
+                self._wake_event.clear()
 
-        thread = threading.Thread(target=monitor_loop, daemon=True)
-        thread.start()
+            self._close_log_file()
+
+        self._monitor_thread = threading.Thread(target=monitor_loop, daemon=True)
+        self._monitor_thread.start()
 
     def stop(self):
         """停止监控"""
         self.is_running = False
+        self._wake_event.set()  # 唤醒监控线程，使其立即退出
+
+        # 等待监控线程退出，确保日志文件句柄已关闭（不阻塞过久）
+        thread = self._monitor_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=1)
+        self._monitor_thread = None
 
         # 停止文件系统监控
         if hasattr(self, 'fs_observer') and self.fs_observer:
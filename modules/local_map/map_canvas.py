@@ -6,10 +6,54 @@ Canvas地图渲染器，支持缩放、平移、标记显示
 """
 
 import customtkinter as ctk
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import Canvas
-from PIL import Image, ImageTk, ImageEnhance
+from PIL import Image, ImageTk
 import math
+import numpy as np
 from typing import Optional, List, Tuple, Dict
+from .image_filters import apply_filters, build_pyramid, resize_map_image
+
+
+class _PointBuffer:
+    """
+    标记坐标的 (N, 2) 数组存储
+
+    按倍数扩容，追加均摊O(1)；xy 返回有效部分的视图，可整体做坐标变换
+    """
+
+    __slots__ = ('_data', '_size')
+
+    def __init__(self, capacity: int = 16):
+        self._data = np.empty((capacity, 2), dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def xy(self) -> np.ndarray:
+        """有效坐标 (N, 2) 的视图"""
+        return self._data[:self._size]
+
+    def append(self, x: float, y: float):
+        """追加一个坐标，容量不足时扩容为两倍"""
+        if self._size == len(self._data):
+            grown = np.empty((2 * len(self._data), 2), dtype=np.float64)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = (x, y)
+        self._size += 1
+
+    def set(self, points):
+        """用一组坐标 [(x, y), ...] 替换全部内容"""
+        self.clear()
+        for x, y in points:
+            self.append(x, y)
+
+    def clear(self):
+        """清空（保留已分配的容量）"""
+        self._size = 0
 
 
 class MapCanvas(ctk.CTkFrame):
@@ -28,8 +72,15 @@ class MapCanvas(ctk.CTkFrame):
     - 图片缓存：避免重复缩放
     - 延迟渲染：拖拽时只移动，释放后才重新渲染
     - 内存管理：正确清理旧的PhotoImage对象
+    - 缩放分档：滚轮缩放落在固定档位上，缩放后的图片缓存可反复命中
     """
 
+    # 滚轮缩放档位：每缩放2倍分为8档（每档约1.09倍）
+    ZOOM_TIERS_PER_OCTAVE = 8
+
+    # Tk线程轮询后台缩放结果的间隔（毫秒）
+    RESIZE_POLL_MS = 15
+
     def __init__(self, parent, width=800, height=600):
         super().__init__(parent)
 
@@ -51,10 +102,18 @@ class MapCanvas(ctk.CTkFrame):
         self.map_photo: Optional[ImageTk.PhotoImage] = None  # 当前显示的PhotoImage
         self.image_item = None
 
+        # 全局缓存复用淘汰的PhotoImage时跳过本画布正在显示的图片
+        from .map_resource_cache import get_resource_cache
+        get_resource_cache().register_display(self)
+
         # 图片缓存（不同缩放级别的预缩放图片）
-        self.image_cache: Dict[float, ImageTk.PhotoImage] = {}
+        self.image_cache: Dict[Tuple, ImageTk.PhotoImage] = {}
         self.cache_max_size = 10  # 最多缓存10个不同缩放级别
 
+        # 应用滤镜后的源图片金字塔（滤镜参数不变时各缩放级别共用）
+        self._source_pyramid: Optional[List[Image.Image]] = None
+        self._source_pyramid_key: Optional[Tuple[float, float, float]] = None
+
         # 视图状态
         self.zoom = 1.0
         self.min_zoom = 0.1
@@ -68,19 +127,33 @@ class MapCanvas(ctk.CTkFrame):
         self.is_dragging = False
 
         # 标记数据（用于重绘）
-        self.calibration_points: List[Tuple[float, float, str]] = []  # (map_x, map_y, label)
+        # 坐标按 (N, 2) 数组存储，重绘时整组一次换算到Canvas坐标
+        self.calibration_points = _PointBuffer()  # 校准点 (map_x, map_y)
+        self.calibration_labels: List[str] = []  # 校准点标签，与 calibration_points 一一对应
         self.player_pos: Optional[Tuple[float, float, float]] = None  # (map_x, map_y, yaw)
-        self.region_points: List[Tuple[float, float]] = []  # 区域标记点 [(map_x, map_y), ...]
-        self.region_lines: List[Tuple[float, float]] = []  # 区域连线的点列表
+        self.region_points = _PointBuffer()  # 区域标记点 (map_x, map_y)
+        self.region_lines = _PointBuffer()  # 区域连线的点列表
 
         # 回调函数
         self.on_click_callback = None
 
+        # 待执行的合并重绘（连续滚轮缩放等只在空闲时重绘一次）
+        self._render_after_id = None
+
+        # 后台缩放：缓存未命中时在工作线程中缩放图片，完成前继续显示上一帧
+        self._resize_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MapCanvasResize")
+        self._resize_future: Optional[Future] = None
+        self._resize_request: Optional[Tuple] = None  # 正在进行的缩放参数
+        self._resize_poll_after_id = None  # Tk线程轮询缩放结果的定时器
+
         # 图片滤镜参数（用于悬浮窗对冲）
         self.filter_brightness = 0.0  # -1.0 to 1.0
         self.filter_contrast = 0.0    # -0.5 to 0.5
         self.filter_gamma = 1.0       # 0.5 to 3.5
 
+        # 缩小时使用LANCZOS（默认BILINEAR，速度优先）
+        self.high_quality_downscale = False
+
         # 绑定事件
         self._bind_events()
 
@@ -133,12 +206,9 @@ class MapCanvas(ctk.CTkFrame):
     def _clear_cache(self):
         """清空本地PhotoImage缓存（不清除全局PIL Image缓存）"""
         # 注意：不清除全局PIL Image缓存，只清除本地PhotoImage引用
-        for photo in self.image_cache.values():
-            try:
-                del photo
-            except:
-                pass
         self.image_cache.clear()
+        self._source_pyramid = None
+        self._source_pyramid_key = None
 
         if self.map_photo:
             try:
@@ -162,48 +232,109 @@ class MapCanvas(ctk.CTkFrame):
         self.offset_x = self.canvas_width / 2
         self.offset_y = self.canvas_height / 2
 
-    def _get_cached_photo(self, zoom: float) -> ImageTk.PhotoImage:
+    def _photo_request(self, zoom: float) -> Tuple:
+        """全局缓存的缩放参数 (image_path, zoom, brightness, contrast, gamma, high_quality)"""
+        return (
+            self._current_image_path,
+            zoom,
+            self.filter_brightness,
+            self.filter_contrast,
+            self.filter_gamma,
+            self.high_quality_downscale
+        )
+
+    def _legacy_cache_key(self, zoom: float) -> Tuple:
+        """本地缓存键：量化缩放级别和滤镜参数（避免过多缓存）"""
+        return (
+            round(zoom, 2),
+            round(self.filter_brightness, 2),
+            round(self.filter_contrast, 2),
+            round(self.filter_gamma, 2),
+            self.high_quality_downscale
+        )
+
+    def _peek_cached_photo(self, zoom: float) -> Optional[ImageTk.PhotoImage]:
         """
-        获取缓存的PhotoImage（改用全局缓存）
+        查询已缓存的PhotoImage（全局缓存，其次本地回退缓存），不做任何缩放
 
         Args:
             zoom: 缩放比例
 
         Returns:
-            ImageTk.PhotoImage: 缩放后的图片
+            ImageTk.PhotoImage 或 None（未命中）
+        """
+        if hasattr(self, '_current_image_path'):
+            from .map_resource_cache import get_resource_cache
+            photo = get_resource_cache().peek_photo_image(*self._photo_request(zoom))
+            if photo is not None:
+                return photo
+
+        return self.image_cache.get(self._legacy_cache_key(zoom))
+
+    def _request_background_resize(self, zoom: float):
+        """
+        在工作线程中缩放图片（只涉及PIL），由Tk线程轮询结果，完成后创建PhotoImage并重绘
+
+        Tk不是线程安全的，工作线程不调用任何Tk方法（包括after）；
+        新请求到达时取消尚未开始的旧请求；已开始的旧请求完成后结果被丢弃
         """
-        # === 改用全局缓存 ===
         from .map_resource_cache import get_resource_cache
-        resource_cache = get_resource_cache()
 
-        if not hasattr(self, '_current_image_path'):
-            # 回退到旧逻辑（理论上不会执行）
-            return self._get_cached_photo_legacy(zoom)
+        request = self._photo_request(zoom)
+        if request == self._resize_request:
+            return  # 同样的缩放已在进行
 
-        photo = resource_cache.get_photo_image(
-            self._current_image_path,
-            zoom,
-            self.filter_brightness,
-            self.filter_contrast,
-            self.filter_gamma
-        )
+        if self._resize_future is not None:
+            self._resize_future.cancel()
 
-        return photo if photo else self._get_cached_photo_legacy(zoom)
-        # === 改动结束 ===
+        self._resize_request = request
+        self._resize_future = self._resize_executor.submit(get_resource_cache().scale_image, *request)
+        if self._resize_poll_after_id is None:
+            self._resize_poll_after_id = self.after(self.RESIZE_POLL_MS, self._poll_resize)
+
+    def _poll_resize(self):
+        """Tk线程定时检查当前的后台缩放是否完成"""
+        self._resize_poll_after_id = None
+        future = self._resize_future
+        if future is None:
+            return
+        if not future.done():
+            self._resize_poll_after_id = self.after(self.RESIZE_POLL_MS, self._poll_resize)
+            return
+        self._install_resized_image(self._resize_request, future)
+
+    def _install_resized_image(self, request: Tuple, future: Future):
+        """在Tk线程中用后台缩放的结果创建PhotoImage并重绘"""
+        self._resize_request = None
+        self._resize_future = None
+
+        from .map_resource_cache import get_resource_cache
+
+        photo = None
+        scaled_image = future.result()
+        if scaled_image is not None:
+            photo = get_resource_cache().put_photo_image(*request, scaled_image)
+
+        if photo is None:
+            # 全局缓存失败时回退到本地缓存逻辑
+            try:
+                self._get_cached_photo_legacy(request[1])
+            except Exception as e:
+                print(f"渲染地图失败: {e}")
+                return
+
+        self._render()
 
     def _get_cached_photo_legacy(self, zoom: float) -> ImageTk.PhotoImage:
         """旧的缓存逻辑（保留作为回退）"""
-        # 量化缩放级别和滤镜参数（避免过多缓存）
-        zoom_key = (
-            round(zoom, 2),
-            round(self.filter_brightness, 2),
-            round(self.filter_contrast, 2),
-            round(self.filter_gamma, 2)
-        )
+        zoom_key = self._legacy_cache_key(zoom)
 
         if zoom_key in self.image_cache:
             return self.image_cache[zoom_key]
 
+        # 滤镜是逐像素的：对原图处理一次，各缩放级别都从处理后的原图（金字塔）缩放
+        pyramid = self._get_source_pyramid()
+
         # 创建新的缩放图片
         img_width, img_height = self.map_image.size
         scaled_width = int(img_width * zoom)
@@ -214,42 +345,33 @@ class MapCanvas(ctk.CTkFrame):
             scaled_height = max(1, scaled_height)
 
         # 根据缩放比例选择合适的重采样方法
-        if zoom < 1.0:
-            # 缩小：使用LANCZOS获得更好质量
-            resample = Image.Resampling.LANCZOS
-        else:
-            # 放大：使用BILINEAR速度更快
-            resample = Image.Resampling.BILINEAR
-
-        scaled_image = self.map_image.resize(
-            (scaled_width, scaled_height),
-            resample
-        )
-
-        # 应用图片滤镜（用于悬浮窗对冲屏幕滤镜）
-        scaled_image = self._apply_image_filters(scaled_image)
+        scaled_image = resize_map_image(pyramid, (scaled_width, scaled_height), zoom, self.high_quality_downscale)
 
         photo = ImageTk.PhotoImage(scaled_image)
 
         # 缓存管理：如果缓存太大，删除最旧的
         if len(self.image_cache) >= self.cache_max_size:
             # 删除第一个（最旧的）
-            oldest_key = next(iter(self.image_cache))
-            old_photo = self.image_cache.pop(oldest_key)
-            try:
-                del old_photo
-            except:
-                pass
+            self.image_cache.pop(next(iter(self.image_cache)))
 
         self.image_cache[zoom_key] = photo
         return photo
 
+    def _get_source_pyramid(self) -> List[Image.Image]:
+        """获取应用滤镜后的源图片金字塔（滤镜参数改变时才重新处理）"""
+        filter_key = (self.filter_brightness, self.filter_contrast, self.filter_gamma)
+        if self._source_pyramid is None or self._source_pyramid_key != filter_key:
+            # 应用图片滤镜（用于悬浮窗对冲屏幕滤镜）
+            self._source_pyramid = build_pyramid(self._apply_image_filters(self.map_image))
+            self._source_pyramid_key = filter_key
+        return self._source_pyramid
+
     def _apply_image_filters(self, image: Image.Image) -> Image.Image:
         """
         应用图片滤镜（亮度、对比度、伽马）
 
         这用于悬浮窗对冲屏幕滤镜效果，防止过曝。
-        使用PIL的ImageEnhance进行图片级别的调整。
+        三种调整合成为一张查找表，整帧只处理一次。
 
         Args:
             image: 要处理的图片
@@ -263,44 +385,8 @@ class MapCanvas(ctk.CTkFrame):
             self.filter_gamma == 1.0):
             return image
 
-        result = image.convert("RGB")
-
-        # 1. 应用亮度调整
-        # filter_brightness范围: -1.0到1.0
-        # ImageEnhance.Brightness factor: 0.0=黑色, 1.0=原图, 2.0=加倍亮度
-        if self.filter_brightness != 0.0:
-            brightness_factor = 1.0 + self.filter_brightness
-            brightness_factor = max(0.0, min(2.0, brightness_factor))
-            enhancer = ImageEnhance.Brightness(result)
-            result = enhancer.enhance(brightness_factor)
-
-        # 2. 应用对比度调整
-        # filter_contrast范围: -0.5到0.5
-        # ImageEnhance.Contrast factor: 0.0=灰色, 1.0=原图, 2.0=加倍对比度
-        if self.filter_contrast != 0.0:
-            contrast_factor = 1.0 + self.filter_contrast
-            contrast_factor = max(0.0, min(2.0, contrast_factor))
-            enhancer = ImageEnhance.Contrast(result)
-            result = enhancer.enhance(contrast_factor)
-
-        # 3. 应用伽马校正
-        # filter_gamma范围: 0.5到3.5
-        # 伽马校正需要手动实现：output = input^(1/gamma)
-        if self.filter_gamma != 1.0:
-            import numpy as np
-
-            # 转换为numpy数组
-            img_array = np.array(result, dtype=np.float32) / 255.0
-
-            # 应用伽马校正
-            gamma = max(0.1, self.filter_gamma)  # 防止除以0
-            img_array = np.power(img_array, 1.0 / gamma)
-
-            # 转换回PIL图片
-            img_array = np.clip(img_array * 255.0, 0, 255).astype(np.uint8)
-            result = Image.fromarray(img_array, mode="RGB")
-
-        return result
+        # filter_brightness范围: -1.0到1.0，filter_contrast范围: -0.5到0.5，filter_gamma范围: 0.5到3.5
+        return apply_filters(image, self.filter_brightness, self.filter_contrast, self.filter_gamma)
 
     def set_filters(self, brightness: float = 0.0, contrast: float = 0.0, gamma: float = 1.0):
         """
@@ -325,12 +411,32 @@ class MapCanvas(ctk.CTkFrame):
 
             # 清空缓存（因为滤镜参数改变了）
             self.image_cache.clear()
+            self._source_pyramid = None
 
-            # 重新渲染
-            self._render()
+            # 重新渲染（合并连续的滑块调整）
+            self._schedule_render()
+
+    def _schedule_render(self):
+        """在Tk空闲时重绘一次，期间的多次请求合并为一次"""
+        if self._render_after_id is None:
+            self._render_after_id = self.after_idle(self._do_render)
+
+    def _do_render(self):
+        """执行合并后的重绘"""
+        self._render_after_id = None
+        self._render()
+
+    def _cancel_scheduled_render(self):
+        """取消尚未执行的合并重绘"""
+        if self._render_after_id is not None:
+            self.after_cancel(self._render_after_id)
+            self._render_after_id = None
 
     def _render(self):
         """重新渲染Canvas"""
+        # 直接重绘时，之前安排的合并重绘已无必要
+        self._cancel_scheduled_render()
+
         if not self.map_image:
             return
 
@@ -339,17 +445,27 @@ class MapCanvas(ctk.CTkFrame):
 
         # 使用缓存的图片
         try:
-            self.map_photo = self._get_cached_photo(self.zoom)
+            photo = self._peek_cached_photo(self.zoom)
+            if photo is None:
+                if hasattr(self, '_current_image_path'):
+                    # 缓存未命中：后台缩放，完成前继续显示上一帧
+                    self._request_background_resize(self.zoom)
+                    photo = self.map_photo
+                else:
+                    # 回退到旧逻辑（理论上不会执行）
+                    photo = self._get_cached_photo_legacy(self.zoom)
+            self.map_photo = photo
 
             # 计算图片位置（以中心点为基准）
             x = self.offset_x
             y = self.offset_y
 
-            self.image_item = self.canvas.create_image(
-                x, y,
-                image=self.map_photo,
-                anchor="center"
-            )
+            if self.map_photo is not None:
+                self.image_item = self.canvas.create_image(
+                    x, y,
+                    image=self.map_photo,
+                    anchor="center"
+                )
         except Exception as e:
             print(f"渲染地图失败: {e}")
             return
@@ -364,12 +480,12 @@ class MapCanvas(ctk.CTkFrame):
             self._draw_region_lines_internal()
 
         # 绘制区域标记点
-        for i, (map_x, map_y) in enumerate(self.region_points, 1):
-            self._draw_region_marker(map_x, map_y, i)
+        self._draw_region_markers()
 
-        # 绘制校准点
-        for map_x, map_y, label in self.calibration_points:
-            self._draw_calibration_marker(map_x, map_y, label)
+        # 绘制校准点（整组换算坐标，逐个绘制）
+        canvas_points = self._map_to_canvas_coords_batch(self.calibration_points.xy)
+        for canvas_x, canvas_y, label in zip(canvas_points[0::2], canvas_points[1::2], self.calibration_labels):
+            self._draw_calibration_marker_at(canvas_x, canvas_y, label)
 
         # 绘制玩家位置
         if self.player_pos:
@@ -379,7 +495,10 @@ class MapCanvas(ctk.CTkFrame):
     def _draw_calibration_marker(self, map_x: float, map_y: float, label: str = ""):
         """绘制单个校准点标记"""
         canvas_x, canvas_y = self._map_to_canvas_coords(map_x, map_y)
+        self._draw_calibration_marker_at(canvas_x, canvas_y, label)
 
+    def _draw_calibration_marker_at(self, canvas_x: float, canvas_y: float, label: str = ""):
+        """在Canvas坐标处绘制校准点标记"""
         # 绘制圆圈
         radius = 8
         self.canvas.create_oval(
@@ -432,10 +551,19 @@ class MapCanvas(ctk.CTkFrame):
             tags="player"
         )
 
+    def _draw_region_markers(self):
+        """绘制所有区域标记点（整组换算坐标，逐个绘制）"""
+        canvas_points = self._map_to_canvas_coords_batch(self.region_points.xy)
+        for i, (canvas_x, canvas_y) in enumerate(zip(canvas_points[0::2], canvas_points[1::2]), 1):
+            self._draw_region_marker_at(canvas_x, canvas_y, i)
+
     def _draw_region_marker(self, map_x: float, map_y: float, index: int):
         """绘制单个区域标记点"""
         canvas_x, canvas_y = self._map_to_canvas_coords(map_x, map_y)
+        self._draw_region_marker_at(canvas_x, canvas_y, index)
 
+    def _draw_region_marker_at(self, canvas_x: float, canvas_y: float, index: int):
+        """在Canvas坐标处绘制区域标记点"""
         # 绘制圆圈（蓝色）
         radius = 6
         self.canvas.create_oval(
@@ -462,32 +590,21 @@ class MapCanvas(ctk.CTkFrame):
             return
 
         # 转换所有点到Canvas坐标
-        canvas_points = []
-        for map_x, map_y in self.region_lines:
-            canvas_x, canvas_y = self._map_to_canvas_coords(map_x, map_y)
-            canvas_points.extend([canvas_x, canvas_y])
-
-        # 绘制多边形边界线
-        for i in range(0, len(canvas_points) - 2, 2):
-            self.canvas.create_line(
-                canvas_points[i], canvas_points[i+1],
-                canvas_points[i+2], canvas_points[i+3],
-                fill="#0080ff",
-                width=2,
-                dash=(5, 3),
-                tags="region"
-            )
+        canvas_points = self._map_to_canvas_coords_batch(self.region_lines.xy)
+        if not canvas_points:
+            return
 
-        # 绘制闭合线（连接最后一个点和第一个点）
+        # 绘制多边形边界线（一条折线完成所有边，3个点以上时回到第一个点闭合）
+        line_points = canvas_points
         if len(self.region_lines) >= 3:
-            self.canvas.create_line(
-                canvas_points[-2], canvas_points[-1],
-                canvas_points[0], canvas_points[1],
-                fill="#0080ff",
-                width=2,
-                dash=(5, 3),
-                tags="region"
-            )
+            line_points = canvas_points + canvas_points[:2]
+        self.canvas.create_line(
+            *line_points,
+            fill="#0080ff",
+            width=2,
+            dash=(5, 3),
+            tags="region"
+        )
 
         # 绘制半透明填充区域
         if len(self.region_lines) >= 3:
@@ -538,16 +655,17 @@ class MapCanvas(ctk.CTkFrame):
         mouse_x = event.x
         mouse_y = event.y
 
-        # 计算缩放因子
+        # 计算缩放方向
         if event.num == 4 or event.delta > 0:  # 向上滚动
-            zoom_factor = 1.1
+            tier_step = 1
         elif event.num == 5 or event.delta < 0:  # 向下滚动
-            zoom_factor = 0.9
+            tier_step = -1
         else:
             return
 
-        # 计算新的缩放比例
-        new_zoom = self.zoom * zoom_factor
+        # 计算新的缩放比例：移动到相邻档位 2^(tier/8)
+        tier = round(math.log2(self.zoom) * self.ZOOM_TIERS_PER_OCTAVE) + tier_step
+        new_zoom = 2 ** (tier / self.ZOOM_TIERS_PER_OCTAVE)
         if new_zoom < self.min_zoom or new_zoom > self.max_zoom:
             return
 
@@ -562,7 +680,8 @@ class MapCanvas(ctk.CTkFrame):
         self.offset_y = mouse_y - dy * scale_ratio
 
         self.zoom = new_zoom
-        self._render()
+        # 连续滚动时只按最终缩放比例重绘一次
+        self._schedule_render()
 
     def _canvas_to_map_coords(self, canvas_x: float, canvas_y: float) -> Tuple[Optional[float], Optional[float]]:
         """
@@ -616,6 +735,25 @@ class MapCanvas(ctk.CTkFrame):
 
         return canvas_x, canvas_y
 
+    def _map_to_canvas_coords_batch(self, points) -> List[float]:
+        """
+        批量将地图图片坐标转换为Canvas坐标
+
+        Args:
+            points: 地图图片坐标 [(map_x, map_y), ...] 或 (N, 2) 数组
+
+        Returns:
+            List[float]: 交错排列的Canvas坐标 [x0, y0, x1, y1, ...]，可直接传给 create_line
+        """
+        if not self.map_image or len(points) == 0:
+            return []
+
+        img_width, img_height = self.map_image.size
+        canvas_points = np.asarray(points, dtype=np.float64).reshape(-1, 2) - (img_width / 2, img_height / 2)
+        canvas_points *= self.zoom
+        canvas_points += (self.offset_x, self.offset_y)
+        return canvas_points.ravel().tolist()
+
     def add_calibration_marker(self, map_x: float, map_y: float, label: str = ""):
         """
         添加校准点标记
@@ -625,7 +763,8 @@ class MapCanvas(ctk.CTkFrame):
             label: 标签文字
         """
         # 保存到数据
-        self.calibration_points.append((map_x, map_y, label))
+        self.calibration_points.append(map_x, map_y)
+        self.calibration_labels.append(label)
 
         # 绘制标记
         self._draw_calibration_marker(map_x, map_y, label)
@@ -634,6 +773,7 @@ class MapCanvas(ctk.CTkFrame):
         """清除所有校准点标记"""
         self.canvas.delete("calibration")
         self.calibration_points.clear()
+        self.calibration_labels.clear()
 
     def show_player_position(self, map_x: float, map_y: float, yaw: float = 0.0):
         """
@@ -666,7 +806,7 @@ class MapCanvas(ctk.CTkFrame):
             index: 点的序号（用于显示标签）
         """
         # 保存到数据
-        self.region_points.append((map_x, map_y))
+        self.region_points.append(map_x, map_y)
 
         # 绘制标记
         self._draw_region_marker(map_x, map_y, index)
@@ -679,7 +819,7 @@ class MapCanvas(ctk.CTkFrame):
             points: 区域点列表 [(map_x, map_y), ...]
         """
         # 保存到数据
-        self.region_lines = list(points)
+        self.region_lines.set(points)
 
         # 清除旧的连线
         self.canvas.delete("region")
@@ -689,8 +829,7 @@ class MapCanvas(ctk.CTkFrame):
             self._draw_region_lines_internal()
 
         # 重新绘制区域标记点
-        for i, (map_x, map_y) in enumerate(self.region_points, 1):
-            self._draw_region_marker(map_x, map_y, i)
+        self._draw_region_markers()
 
     def clear_region_markers(self):
         """清除所有区域标记"""
@@ -708,7 +847,7 @@ class MapCanvas(ctk.CTkFrame):
         zoom = max(self.min_zoom, min(self.max_zoom, zoom))
         if zoom != self.zoom:
             self.zoom = zoom
-            self._render()
+            self._schedule_render()
 
     def reset_view(self):
         """重置视图到默认状态"""
@@ -724,6 +863,17 @@ class MapCanvas(ctk.CTkFrame):
         """
         self.on_click_callback = callback
 
+    def destroy(self):
+        """销毁前取消尚未执行的重绘和后台缩放"""
+        self._cancel_scheduled_render()
+        if self._resize_poll_after_id is not None:
+            self.after_cancel(self._resize_poll_after_id)
+            self._resize_poll_after_id = None
+        self._resize_request = None
+        self._resize_future = None
+        self._resize_executor.shutdown(wait=False, cancel_futures=True)
+        super().destroy()
+
 
 # 测试代码
 if __name__ == "__main__":
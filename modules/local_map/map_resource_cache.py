@@ -9,9 +9,10 @@
 """
 
 import threading
-from PIL import Image, ImageEnhance, ImageTk
-from typing import Dict, Tuple, Optional
-import numpy as np
+import weakref
+from PIL import Image, ImageTk
+from typing import Dict, List, Tuple, Optional
+from .image_filters import apply_filters, build_pyramid, prepare_source, resize_map_image
 
 
 class MapResourceCache:
@@ -44,9 +45,20 @@ class MapResourceCache:
         # PIL Image缓存: {image_path: PIL.Image}
         self._image_cache: Dict[str, Image.Image] = {}
 
-        # PhotoImage缓存: {cache_key: ImageTk.PhotoImage}
-        # cache_key = (image_path, zoom, brightness, contrast, gamma)
-        self._photo_cache: Dict[Tuple, ImageTk.PhotoImage] = {}
+        # 缩放源图片金字塔缓存: {(image_path, brightness, contrast, gamma): [PIL.Image, ...]}
+        # 滤镜是逐像素的，对原图处理一次后所有缩放级别都从这里缩放
+        self._pyramid_cache: Dict[Tuple, List[Image.Image]] = {}
+
+        # PhotoImage缓存: {cache_key: (ImageTk.PhotoImage, (尺寸, 模式))}
+        # cache_key = (image_path, zoom, brightness, contrast, gamma, high_quality)
+        self._photo_cache: Dict[Tuple, Tuple[ImageTk.PhotoImage, Tuple]] = {}
+
+        # 淘汰的PhotoImage按 (尺寸, 模式) 留用：同尺寸的新图片直接 paste 进去，
+        # 避免反复创建/销毁Tk图片（调整滤镜时各缩放级别的尺寸不变）
+        self._photo_pool: Dict[Tuple, List[ImageTk.PhotoImage]] = {}
+
+        # 显示PhotoImage的画布（map_photo属性），正在显示的图片不会被复用
+        self._photo_displays = weakref.WeakSet()
 
         # Transform缓存: {cache_key: CoordinateTransform}
         # cache_key = (map_id, layer_id, player_pos_hash)
@@ -54,6 +66,8 @@ class MapResourceCache:
 
         # 缓存大小限制
         self.photo_cache_max_size = 20  # 最多20个不同缩放级别
+        self.photo_pool_max_size = 4  # 留用的PhotoImage总数
+        self.pyramid_cache_max_size = 3  # 原尺寸图片占用大，只保留最近3组滤镜参数
         self.transform_cache_max_size = 50  # 最多50个transform结果
 
         self._initialized = True
@@ -76,7 +90,7 @@ class MapResourceCache:
 
         try:
             print(f"[加载新图] PIL Image: {image_path}")
-            img = Image.open(image_path)
+            img = prepare_source(Image.open(image_path))
 
             # 限制图片尺寸（防止内存溢出）
             max_dimension = 4096
@@ -116,6 +130,10 @@ class MapResourceCache:
                     except:
                         pass
 
+                # 以及由该图片生成的金字塔
+                for key in [k for k in self._pyramid_cache if k[0] == image_path]:
+                    del self._pyramid_cache[key]
+
     def clear_all_images(self):
         """清除所有图片缓存"""
         with self._lock:
@@ -125,18 +143,80 @@ class MapResourceCache:
                 except:
                     pass
             self._image_cache.clear()
+            self._pyramid_cache.clear()
             self._photo_cache.clear()
+            self._photo_pool.clear()
             print("[清除] 所有图片缓存已清空")
 
+    def _get_source_pyramid(
+        self,
+        image_path: str,
+        base_image: Image.Image,
+        brightness: float,
+        contrast: float,
+        gamma: float
+    ) -> List[Image.Image]:
+        """
+        获取缩放用的源图片金字塔（带缓存）
+
+        每组滤镜参数只对原图查表一次并构建一次金字塔，之后切换缩放级别不再重复处理像素
+
+        Args:
+            image_path: 图片路径（缓存键）
+            base_image: 原图
+            brightness, contrast, gamma: 滤镜参数
+
+        Returns:
+            List[PIL.Image]: 金字塔，第0层为（应用滤镜后的）原尺寸图片
+        """
+        filter_key = (image_path, round(brightness, 2), round(contrast, 2), round(gamma, 2))
+
+        with self._lock:
+            pyramid = self._pyramid_cache.get(filter_key)
+        if pyramid is not None:
+            return pyramid
+
+        source_image = base_image
+        if brightness != 0.0 or contrast != 0.0 or gamma != 1.0:
+            source_image = apply_filters(base_image, brightness, contrast, gamma)
+        pyramid = build_pyramid(source_image)
+
+        with self._lock:
+            if len(self._pyramid_cache) >= self.pyramid_cache_max_size:
+                self._pyramid_cache.pop(next(iter(self._pyramid_cache)))
+            self._pyramid_cache[filter_key] = pyramid
+
+        return pyramid
+
     # ==================== PhotoImage管理 ====================
 
+    @staticmethod
+    def _photo_cache_key(
+        image_path: str,
+        zoom: float,
+        brightness: float,
+        contrast: float,
+        gamma: float,
+        high_quality: bool
+    ) -> Tuple:
+        """PhotoImage缓存键（量化参数，避免过多缓存）"""
+        return (
+            image_path,
+            round(zoom, 2),
+            round(brightness, 2),
+            round(contrast, 2),
+            round(gamma, 2),
+            high_quality
+        )
+
     def get_photo_image(
         self,
         image_path: str,
         zoom: float,
         brightness: float = 0.0,
         contrast: float = 0.0,
-        gamma: float = 1.0
+        gamma: float = 1.0,
+        high_quality: bool = False
     ) -> Optional[ImageTk.PhotoImage]:
         """
         获取PhotoImage对象（带缓存和滤镜处理）
@@ -147,55 +227,109 @@ class MapResourceCache:
             brightness: 亮度偏移 (-1.0 to 1.0)
             contrast: 对比度偏移 (-0.5 to 0.5)
             gamma: 伽马值 (0.5 to 3.5)
+            high_quality: 缩小时使用LANCZOS（默认BILINEAR）
 
         Returns:
             ImageTk.PhotoImage 或 None
         """
-        # 量化参数（避免过多缓存）
-        cache_key = (
-            image_path,
-            round(zoom, 2),
-            round(brightness, 2),
-            round(contrast, 2),
-            round(gamma, 2)
-        )
+        photo = self.peek_photo_image(image_path, zoom, brightness, contrast, gamma, high_quality)
+        if photo is not None:
+            return photo
+
+        scaled_image = self.scale_image(image_path, zoom, brightness, contrast, gamma, high_quality)
+        if scaled_image is None:
+            return None
+
+        return self.put_photo_image(image_path, zoom, brightness, contrast, gamma, high_quality, scaled_image)
 
+    def peek_photo_image(
+        self,
+        image_path: str,
+        zoom: float,
+        brightness: float = 0.0,
+        contrast: float = 0.0,
+        gamma: float = 1.0,
+        high_quality: bool = False
+    ) -> Optional[ImageTk.PhotoImage]:
+        """只查询缓存的PhotoImage，未命中时返回None（不做任何缩放）"""
+        cache_key = self._photo_cache_key(image_path, zoom, brightness, contrast, gamma, high_quality)
         with self._lock:
-            if cache_key in self._photo_cache:
-                return self._photo_cache[cache_key]
+            cached = self._photo_cache.get(cache_key)
+        return cached[0] if cached else None
+
+    def scale_image(
+        self,
+        image_path: str,
+        zoom: float,
+        brightness: float = 0.0,
+        contrast: float = 0.0,
+        gamma: float = 1.0,
+        high_quality: bool = False
+    ) -> Optional[Image.Image]:
+        """
+        生成缩放并应用滤镜后的PIL图片
+
+        只涉及PIL，不创建Tk对象，可在工作线程中调用
 
+        Returns:
+            PIL.Image 或 None（加载或处理失败）
+        """
         # 获取PIL Image
         base_image = self.get_image(image_path)
         if base_image is None:
             return None
 
         try:
+            # 应用滤镜（对原图只处理一次，各缩放级别共用）
+            pyramid = self._get_source_pyramid(image_path, base_image, brightness, contrast, gamma)
+
             # 缩放
             img_width, img_height = base_image.size
             scaled_width = max(1, int(img_width * zoom))
             scaled_height = max(1, int(img_height * zoom))
 
-            resample = Image.Resampling.LANCZOS if zoom < 1.0 else Image.Resampling.BILINEAR
-            scaled_image = base_image.resize((scaled_width, scaled_height), resample)
+            return resize_map_image(pyramid, (scaled_width, scaled_height), zoom, high_quality)
+
+        except Exception as e:
+            print(f"[错误] 缩放图片失败: {e}")
+            return None
 
-            # 应用滤镜
-            if brightness != 0.0 or contrast != 0.0 or gamma != 1.0:
-                scaled_image = self._apply_filters(scaled_image, brightness, contrast, gamma)
+    def put_photo_image(
+        self,
+        image_path: str,
+        zoom: float,
+        brightness: float,
+        contrast: float,
+        gamma: float,
+        high_quality: bool,
+        scaled_image: Image.Image
+    ) -> Optional[ImageTk.PhotoImage]:
+        """
+        由 scale_image 的结果创建PhotoImage并缓存
 
-            # 创建PhotoImage
-            photo = ImageTk.PhotoImage(scaled_image)
+        PhotoImage属于Tk对象，必须在Tk主线程中调用
+
+        Returns:
+            ImageTk.PhotoImage 或 None
+        """
+        cache_key = self._photo_cache_key(image_path, zoom, brightness, contrast, gamma, high_quality)
 
-            # 缓存管理（LRU简化版：删除最旧的）
+        try:
+            # 优先复用同尺寸的PhotoImage，没有可用的才创建
+            pool_key = (scaled_image.size, scaled_image.mode)
+            photo = self._take_pooled_photo(pool_key)
+            if photo is not None:
+                photo.paste(scaled_image)
+            else:
+                photo = ImageTk.PhotoImage(scaled_image)
+
+            # 缓存管理（LRU简化版：淘汰最旧的）
             with self._lock:
                 if len(self._photo_cache) >= self.photo_cache_max_size:
                     oldest_key = next(iter(self._photo_cache))
-                    old_photo = self._photo_cache.pop(oldest_key)
-                    try:
-                        del old_photo
-                    except:
-                        pass
+                    self._release_photo(*self._photo_cache.pop(oldest_key))
 
-                self._photo_cache[cache_key] = photo
+                self._photo_cache[cache_key] = (photo, pool_key)
                 print(f"[新建缓存] PhotoImage: zoom={zoom:.2f}, 缓存大小={len(self._photo_cache)}")
 
             return photo
@@ -204,31 +338,38 @@ class MapResourceCache:
             print(f"[错误] 创建PhotoImage失败: {e}")
             return None
 
-    def _apply_filters(self, image: Image.Image, brightness: float, contrast: float, gamma: float) -> Image.Image:
-        """应用图片滤镜"""
-        result = image.convert("RGB")
-
-        # 亮度
-        if brightness != 0.0:
-            factor = max(0.0, min(2.0, 1.0 + brightness))
-            enhancer = ImageEnhance.Brightness(result)
-            result = enhancer.enhance(factor)
-
-        # 对比度
-        if contrast != 0.0:
-            factor = max(0.0, min(2.0, 1.0 + contrast))
-            enhancer = ImageEnhance.Contrast(result)
-            result = enhancer.enhance(factor)
-
-        # 伽马
-        if gamma != 1.0:
-            img_array = np.array(result, dtype=np.float32) / 255.0
-            gamma_val = max(0.1, gamma)
-            img_array = np.power(img_array, 1.0 / gamma_val)
-            img_array = np.clip(img_array * 255.0, 0, 255).astype(np.uint8)
-            result = Image.fromarray(img_array, mode="RGB")
-
-        return result
+    def register_display(self, display):
+        """登记显示PhotoImage的画布（通过其map_photo属性判断图片是否正在显示）"""
+        self._photo_displays.add(display)
+
+    def _is_photo_displayed(self, photo: ImageTk.PhotoImage) -> bool:
+        """PhotoImage是否正被某个画布显示"""
+        return any(getattr(display, 'map_photo', None) is photo for display in list(self._photo_displays))
+
+    def _take_pooled_photo(self, pool_key: Tuple) -> Optional[ImageTk.PhotoImage]:
+        """从复用池取出一个同尺寸且未在显示的PhotoImage（Tk主线程）"""
+        with self._lock:
+            pooled = self._photo_pool.get(pool_key)
+            if not pooled:
+                return None
+            for i, photo in enumerate(pooled):
+                # 淘汰的图片可能仍作为上一帧显示在画布上，修改它会改变画面
+                if not self._is_photo_displayed(photo):
+                    del pooled[i]
+                    if not pooled:
+                        del self._photo_pool[pool_key]
+                    return photo
+        return None
+
+    def _release_photo(self, photo: ImageTk.PhotoImage, pool_key: Tuple):
+        """将淘汰的PhotoImage放回复用池（调用方持有锁），池满时丢弃最早放入的"""
+        if sum(len(pooled) for pooled in self._photo_pool.values()) >= self.photo_pool_max_size:
+            oldest_key = next(iter(self._photo_pool))
+            oldest = self._photo_pool[oldest_key]
+            oldest.pop(0)
+            if not oldest:
+                del self._photo_pool[oldest_key]
+        self._photo_pool.setdefault(pool_key, []).append(photo)
 
     # ==================== CoordinateTransform管理 ====================
 
@@ -4,6 +4,7 @@ Local Map Module - Data Models
 数据结构设计用于支持多层地图系统和坐标映射
 """
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
@@ -28,7 +29,7 @@ class MapName(Enum):
     WOODS = "Woods"
 
 
-@dataclass
+@dataclass(slots=True)
 class Position3D:
     """
     3D坐标位置
@@ -91,7 +92,7 @@ class Rotation:
         return yaw * (180.0 / math.pi)
 
 
-@dataclass
+@dataclass(slots=True)
 class CalibrationPoint:
     """
     校准点
@@ -107,7 +108,7 @@ class CalibrationPoint:
         return f"Game{self.game_pos} -> Map({self.map_x:.1f}, {self.map_y:.1f})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Region:
     """
     楼层图的激活区域定义
@@ -117,6 +118,33 @@ class Region:
     """
     points: List[Tuple[float, float]] = field(default_factory=list)  # 区域边界点列表 [(map_x1, map_y1), ...]
 
+    # 轴对齐包围盒 (xmin, ymin, xmax, ymax)，构造时计算（区域点在构造后不再修改）
+    _bbox: Optional[Tuple[float, float, float, float]] = field(default=None, init=False, repr=False, compare=False)
+    # 点坐标的元组形式及其哈希，用于判断两个区域是否为同一区域（JSON加载的点是列表）
+    # 哈希只计算一次：哈希不同即可直接判定不同区域，无需逐点比较
+    points_key: Tuple[Tuple[float, float], ...] = field(default=(), init=False, repr=False, compare=False)
+    points_hash: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.points_key = tuple(tuple(p) for p in self.points)
+        self.points_hash = hash(self.points_key)
+        if self.points:
+            xs = [p[0] for p in self.points]
+            ys = [p[1] for p in self.points]
+            self._bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def bbox_overlaps(self, other: 'Region') -> bool:
+        """
+        包围盒是否重叠（含边界接触）
+
+        包围盒不重叠的两个区域一定不相交，用于在多边形相交检测前快速排除
+        """
+        if self._bbox is None or other._bbox is None:
+            return False
+        ax1, ay1, ax2, ay2 = self._bbox
+        bx1, by1, bx2, by2 = other._bbox
+        return ax1 <= bx2 and bx1 <= ax2 and ay1 <= by2 and by1 <= ay2
+
     def contains_point(self, map_x: float, map_y: float) -> bool:
         """
         判断地图坐标是否在区域内（多边形点包含判断）
@@ -167,6 +195,10 @@ class Region:
         Returns:
             bool: True表示两个区域重合，False表示不重合
         """
+        # 包围盒不重叠则不可能相交
+        if not self.bbox_overlaps(other):
+            return False
+
         # 方法1：检查 self 的任一顶点是否在 other 内
         for point in self.points:
             if other.contains_point(point[0], point[1]):
@@ -240,7 +272,7 @@ class Region:
                 q[1] <= max(p[1], r[1]) and q[1] >= min(p[1], r[1]))
 
 
-@dataclass
+@dataclass(slots=True)
 class MapLayer:
     """
     地图层级
@@ -359,12 +391,28 @@ class MapConfig:
     layers: List[MapLayer] = field(default_factory=list)
     default_layer_id: int = 0  # 默认层级
 
+    # 层级ID索引（由add_layer/remove_layer维护）
+    _layer_index: Dict[int, MapLayer] = field(default_factory=dict, init=False, repr=False, compare=False)
+    # 派生缓存：楼层图列表、同区域楼层的高度区间索引
+    # 增删层级时自动清空；直接修改层级的类型/高度/区域后需调用invalidate_layer_caches
+    _floor_maps_cache: Optional[Tuple[MapLayer, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _height_index: Optional[Dict[int, list]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._rebuild_layer_index()
+
+    def _rebuild_layer_index(self):
+        """重建层级ID索引（ID重复时与线性查找一致，取第一个）"""
+        self._layer_index = {}
+        for layer in self.layers:
+            self._layer_index.setdefault(layer.layer_id, layer)
+
     def get_layer_by_id(self, layer_id: int) -> Optional[MapLayer]:
         """根据层级ID获取层级"""
-        for layer in self.layers:
-            if layer.layer_id == layer_id:
-                return layer
-        return None
+        if len(self._layer_index) != len(self.layers):
+            # layers列表被直接修改过，索引已过期
+            self._rebuild_layer_index()
+        return self._layer_index.get(layer_id)
 
     def get_layer_by_height(self, y: float) -> Optional[MapLayer]:
         """
@@ -385,9 +433,82 @@ class MapConfig:
                 return layer
         return None
 
-    def get_floor_maps(self) -> List[MapLayer]:
+    def get_floor_maps(self) -> Tuple[MapLayer, ...]:
         """获取所有楼层图（非大地图）"""
-        return [layer for layer in self.layers if not layer.is_base_map]
+        if self._floor_maps_cache is None:
+            self._floor_maps_cache = tuple(layer for layer in self.layers if not layer.is_base_map)
+        return self._floor_maps_cache
+
+    def invalidate_layer_caches(self):
+        """层级的类型、高度或区域被修改后，清除楼层图缓存和高度索引"""
+        self._floor_maps_cache = None
+        self._height_index = None
+
+    def _build_height_index(self) -> Dict[int, list]:
+        """
+        按区域分组楼层，每组按height_min排序
+
+        Returns:
+            {区域点哈希: [(区域点元组, height_min列表, height_max前缀最大值列表, 楼层列表), ...]}
+            （同一哈希下可能有多个区域，需再比较点元组）
+        """
+        groups: Dict[tuple, List[MapLayer]] = {}
+        for layer in self.get_floor_maps():
+            if layer.region is not None:
+                groups.setdefault(layer.region.points_key, []).append(layer)
+
+        index: Dict[int, list] = {}
+        for key, layers in groups.items():
+            layers.sort(key=lambda l: l.height_min)
+            max_height_maxs = []
+            running_max = float('-inf')
+            for layer in layers:
+                running_max = max(running_max, layer.height_max)
+                max_height_maxs.append(running_max)
+            index.setdefault(hash(key), []).append(
+                (key, [l.height_min for l in layers], max_height_maxs, layers)
+            )
+        return index
+
+    def find_height_conflict(
+        self,
+        region: Region,
+        layer_id: int,
+        height_min: float,
+        height_max: float
+    ) -> Optional[MapLayer]:
+        """
+        查找同一区域内高度范围与给定范围重合的楼层
+
+        二分定位height_min < height_max的候选，再向前扫描，
+        直到前缀最大height_max不再超过height_min
+
+        Args:
+            region: 区域
+            layer_id: 当前层级ID（排除自己）
+            height_min: 最小高度
+            height_max: 最大高度
+
+        Returns:
+            MapLayer: 第一个冲突的楼层，没有冲突返回None
+        """
+        if self._height_index is None:
+            self._height_index = self._build_height_index()
+
+        # 先按缓存的哈希查找，哈希相同再比较点坐标
+        for key, height_mins, max_height_maxs, layers in self._height_index.get(region.points_hash, ()):
+            if key == region.points_key:
+                break
+        else:
+            return None
+
+        i = bisect_left(height_mins, height_max) - 1
+        while i >= 0 and max_height_maxs[i] > height_min:
+            layer = layers[i]
+            if layer.layer_id != layer_id and layer.height_max > height_min:
+                return layer
+            i -= 1
+        return None
 
     def get_layers_sharing_region(self, owner_layer_id: int) -> List[MapLayer]:
         """
@@ -452,6 +573,8 @@ class MapConfig:
         self.layers.append(layer)
         # 按层级ID排序
         self.layers.sort(key=lambda l: l.layer_id)
+        self._layer_index.setdefault(layer.layer_id, layer)
+        self.invalidate_layer_caches()
 
     def remove_layer(self, layer_id: int) -> bool:
         """
@@ -466,6 +589,8 @@ class MapConfig:
         for i, layer in enumerate(self.layers):
             if layer.layer_id == layer_id:
                 self.layers.pop(i)
+                self._rebuild_layer_index()
+                self.invalidate_layer_caches()
                 return True
         return False
 
@@ -489,7 +614,7 @@ class PlayerPosition:
     layer_id: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RaidInfo:
     """
     战局信息
@@ -571,7 +696,7 @@ class CoordinateTransform:
         需要至少3个点
 
         Args:
-            points: 校准点列表
+            points: 校准点列表（或 coordinate_transform.CalibrationPointSet）
             player_pos: 玩家当前位置（可选，用于局部插值）
             use_local_interpolation: 是否启用局部插值（默认True）
 
@@ -607,7 +732,7 @@ class MapViewState:
     show_rotation: bool = True  # 是否显示旋转方向
 
 
-@dataclass
+@dataclass(slots=True)
 class FloatingMapConfig:
     """
     浮动小地图配置
@@ -43,6 +43,7 @@ class OverlayMapWindow(ctk.CTkToplevel):
         self._resize_start_height = 0
         self._resize_start_pos_x = 0
         self._resize_start_pos_y = 0
+        self._pending_geometry: Optional[str] = None  # 待应用的窗口几何（合并拖拽事件）
 
         # 玩家居中相关
         self._player_map_x: Optional[float] = None
@@ -242,11 +243,31 @@ class OverlayMapWindow(ctk.CTkToplevel):
             if new_height == 200:
                 new_y = self._resize_start_pos_y + self._resize_start_height - 200
 
-        self.geometry(f"{int(new_width)}x{int(new_height)}+{int(new_x)}+{int(new_y)}")
+        self._schedule_geometry(f"{int(new_width)}x{int(new_height)}+{int(new_x)}+{int(new_y)}")
+
+    def _schedule_geometry(self, geometry: str):
+        """
+        合并拖拽期间的几何更新：每次geometry()都会触发<Configure>和CTk子控件重绘，
+        空闲时只应用最后一次
+        """
+        if self._pending_geometry is None:
+            self.after_idle(self._flush_geometry)
+        self._pending_geometry = geometry
+
+    def _flush_geometry(self):
+        """应用最近一次待处理的几何更新"""
+        if self._pending_geometry is not None:
+            geometry = self._pending_geometry
+            self._pending_geometry = None
+            self.geometry(geometry)
 
     def _on_edge_resize_end(self, event):
         """左键释放，结束边缘调整大小"""
         if self._resize_edge:
+            # 先应用尚未处理的几何更新
+            self._flush_geometry()
+            self.update_idletasks()
+
             # 保存最终位置和大小
             self.window_width = self.winfo_width()
             self.window_height = self.winfo_height()
@@ -314,7 +335,7 @@ class OverlayMapWindow(ctk.CTkToplevel):
                 if new_height == 200:
                     new_y = self._resize_start_pos_y + self._resize_start_height - 200
 
-            self.geometry(f"{int(new_width)}x{int(new_height)}+{int(new_x)}+{int(new_y)}")
+            self._schedule_geometry(f"{int(new_width)}x{int(new_height)}+{int(new_x)}+{int(new_y)}")
 
         elif self._dragging:
             # 移动窗口模式：实时移动
@@ -390,6 +411,9 @@ class OverlayMapWindow(ctk.CTkToplevel):
     def _on_window_release(self, event):
         """窗口释放事件"""
         if self._resize_edge or self._dragging:
+            # 先应用尚未处理的几何更新
+            self._flush_geometry()
+            self.update_idletasks()
             # 保存最终位置和大小
             self.window_width = self.winfo_width()
             self.window_height = self.winfo_height()
@@ -10,7 +10,6 @@ import os
 import math
 import threading
 import time
-import keyboard
 import json
 from typing import Optional, Tuple
 from .map_canvas import MapCanvas
@@ -23,6 +22,7 @@ from .overlay_window import OverlayMapWindow
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from utils.i18n import t
+from ui.components.fonts import get_font
 from utils.hotkey_manager import get_hotkey_manager
 
 # Map variant groups - maps that should be displayed as one entry in UI
@@ -37,7 +37,7 @@ class LocalMapUI(ctk.CTkFrame):
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
 
-        self.config_manager = MapConfigManager()
+        self.config_manager = MapConfigManager(scheduler=self)
         self.current_map_id: Optional[str] = None
         self.current_layer_id: int = 0
         self.last_detected_variant: dict = {}  # Track last detected variant for grouped maps (e.g., {"factory": "factory4_day"})
@@ -203,14 +203,14 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.title"),
-            font=ctk.CTkFont(size=16, weight="bold")
+            font=get_font(size=16, weight="bold")
         ).pack(pady=(5, 10))
 
         # --- 地图选择 ---
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.map_selection.select_map"),
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         ).pack(pady=(5, 2), anchor="w", padx=10)
 
         self.map_selector = ctk.CTkComboBox(
@@ -226,7 +226,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.map_selection.select_layer"),
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         ).pack(pady=(2, 2), anchor="w", padx=10)
 
         self.layer_selector = ctk.CTkComboBox(
@@ -249,7 +249,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.sections.map_management"),
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=get_font(size=12, weight="bold")
         ).pack(pady=(5, 5))
 
         self.import_map_btn = ctk.CTkButton(
@@ -325,7 +325,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.sections.calibration_system"),
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=get_font(size=12, weight="bold")
         ).pack(pady=(5, 5))
 
         self.calibration_mode_switch = ctk.CTkSwitch(
@@ -338,7 +338,7 @@ class LocalMapUI(ctk.CTkFrame):
         self.calibration_info = ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.calibration.calibration_info", count=0),
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             text_color="gray60"
         )
         self.calibration_info.pack(pady=3)
@@ -365,13 +365,13 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.sections.floor_regions"),
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=get_font(size=12, weight="bold")
         ).pack(pady=(5, 5))
 
         region_hint = ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.floor_regions.hint"),
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             text_color="gray60"
         )
         region_hint.pack(pady=(0, 5))
@@ -402,7 +402,7 @@ class LocalMapUI(ctk.CTkFrame):
         self.region_info = ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.floor_regions.region_info", count=0),
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             text_color="gray60"
         )
         self.region_info.pack(pady=3)
@@ -418,7 +418,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.left_panel,
             text=t("local_map.sections.view_control"),
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=get_font(size=12, weight="bold")
         ).pack(pady=(5, 5))
 
         zoom_frame = ctk.CTkFrame(self.left_panel, fg_color="transparent")
@@ -427,7 +427,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             zoom_frame,
             text=t("local_map.view_control.zoom"),
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         ).pack(side="left", padx=5)
 
         self.zoom_slider = ctk.CTkSlider(
@@ -474,7 +474,7 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             row1,
             text=t("local_map.sections.core_functions"),
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=get_font(size=13, weight="bold"),
             text_color="#90EE90"
         ).pack(side="left", padx=(0, 10))
 
@@ -484,7 +484,7 @@ class LocalMapUI(ctk.CTkFrame):
             command=self._toggle_tracking_mode,
             fg_color="#2d5a2d",
             progress_color="#4a9d4a",
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.tracking_mode_switch.pack(side="left", padx=5)
         self.tracking_mode_switch.select()
@@ -495,7 +495,7 @@ class LocalMapUI(ctk.CTkFrame):
             command=self._toggle_player_centered,
             fg_color="#2d5a2d",
             progress_color="#4a9d4a",
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.player_centered_switch.pack(side="left", padx=5)
         self.player_centered_switch.select()
@@ -507,7 +507,7 @@ class LocalMapUI(ctk.CTkFrame):
             command=self._toggle_auto_clear,
             fg_color="#2d5a2d",
             progress_color="#4a9d4a",
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.auto_clear_switch.pack(side="left", padx=5)
 
@@ -531,7 +531,7 @@ class LocalMapUI(ctk.CTkFrame):
             height=28,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.overlay_toggle_btn.pack(side="left", padx=2)
 
@@ -544,7 +544,7 @@ class LocalMapUI(ctk.CTkFrame):
             state="disabled",
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.overlay_lock_btn.pack(side="left", padx=2)
 
@@ -556,7 +556,7 @@ class LocalMapUI(ctk.CTkFrame):
             height=28,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         )
         self.hotkey_btn.pack(side="left", padx=2)
 
@@ -568,7 +568,7 @@ class LocalMapUI(ctk.CTkFrame):
             height=28,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         )
         self.zoom_in_hotkey_btn.pack(side="left", padx=2)
 
@@ -580,7 +580,7 @@ class LocalMapUI(ctk.CTkFrame):
             height=28,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         )
         self.zoom_out_hotkey_btn.pack(side="left", padx=2)
 
@@ -591,27 +591,27 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             row3,
             text=t("local_map.core_functions.window_size"),
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         ).pack(side="left", padx=(0, 2))
 
         self.overlay_width_entry = ctk.CTkEntry(
             row3,
             width=50,
             height=24,
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             placeholder_text=t("local_map.core_functions.width_placeholder")
         )
         self.overlay_width_entry.insert(0, "400")
         self.overlay_width_entry.pack(side="left", padx=1)
         self.overlay_width_entry.bind("<FocusOut>", lambda e: self.focus_set())
 
-        ctk.CTkLabel(row3, text="×", font=ctk.CTkFont(size=10)).pack(side="left", padx=1)
+        ctk.CTkLabel(row3, text="×", font=get_font(size=10)).pack(side="left", padx=1)
 
         self.overlay_height_entry = ctk.CTkEntry(
             row3,
             width=50,
             height=24,
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             placeholder_text=t("local_map.core_functions.height_placeholder")
         )
         self.overlay_height_entry.insert(0, "400")
@@ -621,14 +621,14 @@ class LocalMapUI(ctk.CTkFrame):
         ctk.CTkLabel(
             row3,
             text=t("local_map.core_functions.zoom_step"),
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         ).pack(side="left", padx=(8, 2))
 
         self.zoom_step_entry = ctk.CTkEntry(
             row3,
             width=45,
             height=24,
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             placeholder_text="0.2"
         )
         self.zoom_step_entry.insert(0, str(self.zoom_step))
@@ -643,14 +643,14 @@ class LocalMapUI(ctk.CTkFrame):
             height=24,
             fg_color="#2d5a2d",
             hover_color="#4a9d4a",
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         )
         self.apply_size_btn.pack(side="left", padx=3)
 
         ctk.CTkLabel(
             row3,
             text=t("local_map.core_functions.opacity"),
-            font=ctk.CTkFont(size=10)
+            font=get_font(size=10)
         ).pack(side="left", padx=(5, 2))
 
         self.opacity_slider = ctk.CTkSlider(
@@ -678,23 +678,24 @@ class LocalMapUI(ctk.CTkFrame):
         self.status_label = ctk.CTkLabel(
             self.map_panel,
             text=t("local_map.status.please_select_import"),
-            font=ctk.CTkFont(size=11)
+            font=get_font(size=11)
         )
         self.status_label.grid(row=1, column=0, pady=(0, 5))
 
     def _load_maps(self):
         """加载地图列表"""
-        maps = self.config_manager.get_all_maps()
+        # 只需要地图ID，不触发地图配置的加载
+        map_ids = self.config_manager.get_map_ids()
 
         # Group maps by variant and use localized names
         seen_groups = set()
         map_entries = []
 
-        for m in maps:
+        for map_id in map_ids:
             # Check if this map belongs to a variant group
             group_key = None
             for group, variants in MAP_VARIANTS.items():
-                if m.map_id in variants:
+                if map_id in variants:
                     group_key = group
                     break
 
@@ -703,14 +704,14 @@ class LocalMapUI(ctk.CTkFrame):
                 continue
 
             # Get localized name
-            localized_name = t(f"maps.{m.map_id}")
+            localized_name = t(f"maps.{map_id}")
 
             # For grouped maps, use the group key for internal reference
             if group_key:
                 seen_groups.add(group_key)
-                map_entries.append((localized_name, group_key, m.map_id))  # (display, group_key, first_variant)
+                map_entries.append((localized_name, group_key, map_id))  # (display, group_key, first_variant)
             else:
-                map_entries.append((localized_name, m.map_id, m.map_id))  # (display, map_id, map_id)
+                map_entries.append((localized_name, map_id, map_id))  # (display, map_id, map_id)
 
         # Create display values (just the localized names)
         map_names = [entry[0] for entry in map_entries]
@@ -913,6 +914,7 @@ class LocalMapUI(ctk.CTkFrame):
                     layer = map_config.get_layer_by_id(layer_id)
                     if layer:
                         layer.is_base_map = is_base_map
+                        map_config.invalidate_layer_caches()
                         self.config_manager.save_config()
 
                 # 重新加载地图列表
@@ -959,6 +961,7 @@ class LocalMapUI(ctk.CTkFrame):
             layer.height_max = height_max
             layer.rotation_offset = rotation_offset
             layer.is_base_map = is_base_map
+            map_config.invalidate_layer_caches()
             self.config_manager.save_config()
             messagebox.showinfo(t("common.success"), t("local_map.messages.layer_config_updated"))
 
@@ -2707,13 +2710,8 @@ class LocalMapUI(ctk.CTkFrame):
                     layers=layers
                 )
 
-                # 保存到配置管理器
-                if existing:
-                    # 删除旧的
-                    del self.config_manager.maps[map_id]
-
-                self.config_manager.maps[map_id] = map_config
-                self.config_manager.save_config()
+                # 保存到配置管理器（替换旧配置并清除其坐标变换缓存）
+                self.config_manager.replace_map_config(map_id, map_config)
 
                 # 刷新UI
                 self._load_maps()
@@ -2745,6 +2743,10 @@ class LocalMapUI(ctk.CTkFrame):
         self._stop_screenshot_monitoring()
         self._stop_log_monitoring()
 
+        # 写入尚未保存的地图配置和功能配置修改
+        self.config_manager.flush()
+        self.func_config.flush()
+
         # 关闭悬浮窗
         if self.overlay_window:
             self.overlay_window.destroy()
@@ -2812,13 +2814,13 @@ class LayerConfigDialog(ctk.CTkToplevel):
         ctk.CTkLabel(
             scroll_frame,
             text="导入类型:",
-            font=ctk.CTkFont(size=12, weight="bold")
+            font=get_font(size=12, weight="bold")
         ).pack(pady=(10, 5))
 
         type_hint = ctk.CTkLabel(
             scroll_frame,
             text="大地图：全景地图，作为基础层（每个地图必须先导入大地图）\n楼层图：特定建筑的楼层地图（需要在大地图上标记激活区域）",
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             text_color="gray"
         )
         type_hint.pack(pady=(0, 5))
@@ -2890,7 +2892,7 @@ class LayerConfigDialog(ctk.CTkToplevel):
         rotation_hint = ctk.CTkLabel(
             scroll_frame,
             text="如果地图相对游戏世界旋转了，请输入旋转角度\n例如：地图上北下南 = 0°，地图旋转180° = 180°",
-            font=ctk.CTkFont(size=10),
+            font=get_font(size=10),
             text_color="gray"
         )
         rotation_hint.pack(pady=(0, 5))
@@ -2995,7 +2997,7 @@ class PathSettingsDialog(ctk.CTkToplevel):
         info_label = ctk.CTkLabel(
             self,
             text="配置塔科夫截图和日志文件夹路径",
-            font=ctk.CTkFont(size=14, weight="bold")
+            font=get_font(size=14, weight="bold")
         )
         info_label.pack(pady=(20, 10))
 
@@ -3044,7 +3046,7 @@ class PathSettingsDialog(ctk.CTkToplevel):
             self,
             text="提示: 截图路径通常在\"文档\\Escape From Tarkov\\Screenshots\"\n"
                  "日志路径通常在游戏安装目录的\"Logs\"文件夹",
-            font=ctk.CTkFont(size=11),
+            font=get_font(size=11),
             text_color="gray"
         )
         hint_label.pack(pady=10)
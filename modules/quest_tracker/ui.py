@@ -1,4 +1,5 @@
 import customtkinter as ctk
+from ui.components.fonts import get_font
 
 
 class QuestTrackerUI(ctk.CTkFrame):
@@ -17,7 +18,7 @@ class QuestTrackerUI(ctk.CTkFrame):
         title = ctk.CTkLabel(
             placeholder,
             text="任务追踪",
-            font=ctk.CTkFont(size=32, weight="bold")
+            font=get_font(size=32, weight="bold")
         )
         title.pack(pady=50)
 
@@ -29,7 +30,7 @@ class QuestTrackerUI(ctk.CTkFrame):
                  "• 标记任务完成状态\n"
                  "• 用 tarkovtracker.org API 云端同步管理任务进度\n"
                  "• 支持纯本地追踪任务进度功能",
-            font=ctk.CTkFont(size=14),
+            font=get_font(size=14),
             justify="left"
         )
         description.pack(pady=20)
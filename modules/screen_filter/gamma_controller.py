@@ -1,7 +1,7 @@
 import ctypes
 from ctypes import wintypes
-import math
 from typing import List, Tuple, Dict
+import numpy as np
 from screeninfo import get_monitors
 from modules.screen_filter.models import FilterConfig
 from utils.i18n import get_current_language
@@ -60,10 +60,22 @@ gdi32.CreateDCW.restype = HDC
 gdi32.DeleteDC.argtypes = [HDC]
 gdi32.DeleteDC.restype = BOOL
 
+# Normalized ramp input (0.0 .. 1.0), shared by every LUT build
+RAMP_INPUT = np.arange(256, dtype=np.float64) / 255.0
+RAMP_PTR = ctypes.POINTER(RAMP)
+
 class GammaController:
     def __init__(self):
         self.monitors = self._enumerate_monitors()
 
+        # Ramp cache: config values -> precomputed 3x256 LUT (shared by all monitors)
+        self._ramp_cache: Dict[Tuple[float, ...], np.ndarray] = {}
+        self.ramp_cache_max_size = 32
+
+        # Per-monitor state: DC kept open across applies, and the ramp last written
+        self._monitor_dcs: Dict[str, int] = {}
+        self._last_ramp_keys: Dict[str, Tuple[float, ...]] = {}
+
     def _enumerate_monitors(self) -> List[Dict[str, str]]:
         """Enumerate all monitors with enhanced metadata"""
         monitors = []
@@ -121,72 +133,111 @@ class GammaController:
         return monitors
 
     def get_monitors(self):
-        # Refresh list in case monitors changed
+        # Refresh list in case monitors changed; cached DCs may belong to a stale display setup
+        self.close()
         self.monitors = self._enumerate_monitors()
         return self.monitors
 
-    def apply_config(self, config: FilterConfig, device_names: List[str]):
-        ramp = self._generate_ramp(config)
-        
+    def apply_config(self, config: FilterConfig, device_names: List[str], force: bool = False):
+        """
+        Write the config's gamma ramp to the given monitors
+
+        Monitors that already show this ramp are skipped unless force is set
+        (e.g. a preset hotkey, where the game may have reset the ramp).
+        """
+        key = self._ramp_key(config)
+        lut = self._generate_ramp(config)
+        # The C-contiguous [3][256] uint16 LUT has the RAMP layout, pass it without copying
+        ramp_ref = lut.ctypes.data_as(RAMP_PTR)
+
         for device_name in device_names:
-            # Create DC for the specific monitor
-            hdc = gdi32.CreateDCW(device_name, None, None, None)
+            if not force and self._last_ramp_keys.get(device_name) == key:
+                continue
+
+            hdc = self._get_monitor_dc(device_name)
             if hdc:
-                success = gdi32.SetDeviceGammaRamp(hdc, ctypes.byref(ramp))
+                success = gdi32.SetDeviceGammaRamp(hdc, ramp_ref)
                 if not success:
+                    # The cached DC may be stale (display change), retry once with a fresh one
+                    self._release_monitor_dcs([device_name])
+                    hdc = self._get_monitor_dc(device_name)
+                    success = bool(hdc) and gdi32.SetDeviceGammaRamp(hdc, ramp_ref)
+                if success:
+                    self._last_ramp_keys[device_name] = key
+                else:
+                    self._last_ramp_keys.pop(device_name, None)
                     print(f"Failed to set gamma ramp for {device_name}")
-                gdi32.DeleteDC(hdc)
             else:
                 print(f"Failed to create DC for {device_name}")
 
-    def _calculate_value(self, value: float, gamma: float, contrast: float, brightness: float) -> int:
+    def _get_monitor_dc(self, device_name: str):
+        """Get the DC for a monitor, creating it once and keeping it open"""
+        hdc = self._monitor_dcs.get(device_name)
+        if hdc is None:
+            hdc = gdi32.CreateDCW(device_name, None, None, None)
+            if hdc:
+                self._monitor_dcs[device_name] = hdc
+        return hdc
+
+    def _release_monitor_dcs(self, device_names: List[str]):
+        """Delete cached DCs and forget what was written to those monitors"""
+        for device_name in device_names:
+            hdc = self._monitor_dcs.pop(device_name, None)
+            if hdc:
+                gdi32.DeleteDC(hdc)
+            self._last_ramp_keys.pop(device_name, None)
+
+    @staticmethod
+    def _ramp_key(config: FilterConfig) -> Tuple[float, ...]:
+        """Values that affect the gamma ramp (overlay offsets do not)"""
+        return (config.gamma, config.contrast, config.brightness,
+                config.red_scale, config.green_scale, config.blue_scale)
+
+    def _generate_ramp(self, config: FilterConfig) -> np.ndarray:
+        key = self._ramp_key(config)
+        lut = self._ramp_cache.get(key)
+        if lut is not None:
+            return lut
+
+        lut = self._build_lut(config)
+
+        # Evict oldest entry when the cache is full
+        if len(self._ramp_cache) >= self.ramp_cache_max_size:
+            self._ramp_cache.pop(next(iter(self._ramp_cache)))
+        self._ramp_cache[key] = lut
+        return lut
+
+    @staticmethod
+    def _build_lut(config: FilterConfig) -> np.ndarray:
+        """Compute the 3x256 uint16 ramp (R, G, B rows) in one NumPy pass"""
         # 1. Contrast
-        contrast_factor = 1.0 + contrast
-        contrasted = ((value - 0.5) * contrast_factor + 0.5)
-        contrasted = max(0.0, min(1.0, contrasted))
+        contrast_factor = 1.0 + config.contrast
+        contrasted = np.clip((RAMP_INPUT - 0.5) * contrast_factor + 0.5, 0.0, 1.0)
 
         # 2. Gamma
         # Avoid division by zero
-        if gamma < 0.01: gamma = 0.01
-        gamma_corrected = math.pow(contrasted, 1.0 / gamma)
+        gamma = max(config.gamma, 0.01)
+        gamma_corrected = np.power(contrasted, 1.0 / gamma)
 
         # 3. Brightness (Multiplicative)
         # brightness = 0.0 -> factor 1.0
         # brightness = 1.0 -> factor 2.0
         # brightness = -1.0 -> factor 0.0
-        brightness_factor = 1.0 + brightness
-        brightened = gamma_corrected * brightness_factor
-        brightened = max(0.0, min(1.0, brightened))
-
-        return int(brightened * 65535)
-
-    def _generate_ramp(self, config: FilterConfig) -> RAMP:
-        ramp = RAMP()
-        
-        for i in range(256):
-            base_val = i / 255.0
-            
-            # Calculate for each channel
-            # Note: channel_scale is applied at the end
-            
-            # Red
-            val_r = self._calculate_value(base_val, config.gamma, config.contrast, config.brightness)
-            val_r = int(val_r * config.red_scale)
-            ramp.Red[i] = min(65535, max(0, val_r))
-
-            # Green
-            val_g = self._calculate_value(base_val, config.gamma, config.contrast, config.brightness)
-            val_g = int(val_g * config.green_scale)
-            ramp.Green[i] = min(65535, max(0, val_g))
-
-            # Blue
-            val_b = self._calculate_value(base_val, config.gamma, config.contrast, config.brightness)
-            val_b = int(val_b * config.blue_scale)
-            ramp.Blue[i] = min(65535, max(0, val_b))
-            
-        return ramp
+        brightness_factor = 1.0 + config.brightness
+        brightened = np.clip(gamma_corrected * brightness_factor, 0.0, 1.0)
+        base = np.trunc(brightened * 65535)
+
+        # Channel scale is applied at the end
+        scales = np.array([config.red_scale, config.green_scale, config.blue_scale])
+        lut = np.trunc(base[np.newaxis, :] * scales[:, np.newaxis])
+        return np.ascontiguousarray(np.clip(lut, 0, 65535), dtype=np.uint16)
+
+    def close(self):
+        """Delete all cached monitor DCs"""
+        self._release_monitor_dcs(list(self._monitor_dcs))
 
     def reset_monitors(self, device_names: List[str]):
         # Reset to linear ramp
         default_config = FilterConfig() # Default is 0/0/1.0 which is linear
-        self.apply_config(default_config, device_names)
+        self.apply_config(default_config, device_names, force=True)
+        self._release_monitor_dcs(device_names)
@@ -18,6 +18,7 @@ class ConfigManager:
             config_file = path_manager.get_filter_config_path()
 
         self.config_file = config_file
+        self._presets_cache: Optional[List[FilterPreset]] = None  # Parsed presets, reset on mutation
 
         # Load old config to detect changes
         old_presets = None
@@ -178,8 +179,15 @@ class ConfigManager:
     # === Preset Management ===
 
     def get_all_presets(self) -> List[FilterPreset]:
-        """Get all presets"""
-        return [FilterPreset.from_dict(p) for p in self.config.get("presets", [])]
+        """
+        Get all presets
+
+        The parsed list is cached until the next preset mutation, so callers
+        get shared objects and must not modify them without update_preset().
+        """
+        if self._presets_cache is None:
+            self._presets_cache = [FilterPreset.from_dict(p) for p in self.config.get("presets", [])]
+        return list(self._presets_cache)
 
     def get_preset_by_id(self, preset_id: str) -> Optional[FilterPreset]:
         """Get preset by ID"""
@@ -193,6 +201,7 @@ class ConfigManager:
         if "presets" not in self.config:
             self.config["presets"] = []
         self.config["presets"].append(preset.to_dict())
+        self._presets_cache = None
 
     def update_preset(self, preset: FilterPreset):
         """Update an existing preset"""
@@ -200,6 +209,7 @@ class ConfigManager:
         for i, p in enumerate(presets):
             if p.get("id") == preset.id:
                 presets[i] = preset.to_dict()
+                self._presets_cache = None
                 return
 
     def delete_preset(self, preset_id: str):
@@ -208,7 +218,14 @@ class ConfigManager:
             p for p in self.config.get("presets", [])
             if p.get("id") != preset_id
         ]
+        self._presets_cache = None
 
     def set_all_presets(self, presets: List[FilterPreset]):
         """Replace all presets"""
         self.config["presets"] = [p.to_dict() for p in presets]
+        self._presets_cache = None
+
+    def reset_to_defaults(self):
+        """Replace the whole configuration with the default one"""
+        self.config = self._create_default_config()
+        self._presets_cache = None
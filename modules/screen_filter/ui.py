@@ -1,6 +1,7 @@
+import copy
 import customtkinter as ctk
+import tkinter as tk
 from tkinter import messagebox
-import keyboard
 import threading
 import time
 from typing import List
@@ -10,12 +11,58 @@ from modules.screen_filter.gamma_controller import GammaController
 from modules.screen_filter.state_manager import ConfigManager
 from modules.screen_filter.value_mapper import ValueMapper
 from utils.i18n import t
+from ui.components.fonts import get_font
 from utils.hotkey_manager import get_hotkey_manager
 
 
+# Slider specs: (label translation key, FilterConfig attribute, min, max, default, step)
+MAIN_SLIDERS = (
+    ("screen_filter.controls.brightness", "brightness", -100, 100, 0, 1),
+    ("screen_filter.controls.contrast", "contrast", -50, 50, 0, 1),
+    ("screen_filter.controls.gamma", "gamma", 0.5, 3.0, 1.0, 0.01),
+)
+RGB_SLIDERS = (
+    ("screen_filter.controls.red", "red_scale", 0, 255, 255, 1),
+    ("screen_filter.controls.green", "green_scale", 0, 255, 255, 1),
+    ("screen_filter.controls.blue", "blue_scale", 0, 255, 255, 1),
+)
+OVERLAY_SLIDERS = (
+    ("screen_filter.overlay_compensation.brightness_offset", "overlay_brightness_offset", -100, 100, 0, 1),
+    ("screen_filter.overlay_compensation.gamma_offset", "overlay_gamma_offset", -1.0, 1.0, 0, 0.01),
+    ("screen_filter.overlay_compensation.contrast_offset", "overlay_contrast_offset", -50, 50, 0, 1),
+)
+
+# UI value -> algorithm value, per FilterConfig attribute (missing = used as-is)
+UI_TO_ALGO = {
+    "brightness": ValueMapper.ui_to_algo_brightness,
+    "contrast": ValueMapper.ui_to_algo_contrast,
+    "gamma": ValueMapper.ui_to_algo_gamma,
+    "red_scale": ValueMapper.ui_to_algo_rgb,
+    "green_scale": ValueMapper.ui_to_algo_rgb,
+    "blue_scale": ValueMapper.ui_to_algo_rgb,
+    "overlay_brightness_offset": ValueMapper.ui_to_algo_brightness,
+    "overlay_contrast_offset": ValueMapper.ui_to_algo_contrast,
+    # 伽马偏移直接使用值，不需要映射
+}
+
+
+def _identity(value):
+    return value
+
+
+def _format_fraction(value) -> str:
+    return f"{value:.2f}"
+
+
+def _format_integer(value) -> str:
+    return f"{int(value)}"
+
+
 class ScreenFilterUI(ctk.CTkFrame):
     """Screen Filter Tab UI Component"""
 
+    APPLY_DEBOUNCE_MS = 33  # Max one gamma write per frame while dragging
+
     def __init__(self, parent):
         super().__init__(parent, fg_color="transparent")
 
@@ -33,7 +80,10 @@ class ScreenFilterUI(ctk.CTkFrame):
         self.waiting_for_hotkey = None  # Preset waiting for hotkey assignment
         self.get_overlay_window = None  # Callback to get overlay window reference
         self.delete_mode = False  # Delete mode flag
-        self.preset_hotkey_buttons = {}  # preset.id -> CTkButton reference for visual feedback
+        self._listbox_presets: List[FilterPreset] = []  # Listbox index -> preset
+        self._sliders = {}  # attr_name -> CTkSlider
+        self._value_labels = {}  # attr_name -> CTkLabel showing the slider value
+        self._apply_after_id = None  # Pending debounced apply from slider drags
 
         # Layout
         self.grid_columnconfigure(1, weight=1)
@@ -66,12 +116,12 @@ class ScreenFilterUI(ctk.CTkFrame):
     def _create_sidebar(self):
         self.sidebar_frame = ctk.CTkFrame(self, width=250, corner_radius=0)
         self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
-        self.sidebar_frame.grid_rowconfigure(3, weight=1)  # preset_list_frame now at row 3
+        self.sidebar_frame.grid_rowconfigure(3, weight=1)  # preset_listbox now at row 3
 
         self.title_label = ctk.CTkLabel(
             self.sidebar_frame,
             text=t("screen_filter.title"),
-            font=ctk.CTkFont(size=18, weight="bold")
+            font=get_font(size=18, weight="bold")
         )
         self.title_label.grid(row=0, column=0, padx=20, pady=(20, 10))
 
@@ -91,11 +141,34 @@ class ScreenFilterUI(ctk.CTkFrame):
         )
         self.delete_preset_btn.grid(row=2, column=0, padx=20, pady=(5, 10))
 
-        self.preset_list_frame = ctk.CTkScrollableFrame(
+        # Native listbox: Tk draws the rows itself instead of one CTk canvas per button
+        self.preset_listbox = tk.Listbox(
             self.sidebar_frame,
-            label_text=t("screen_filter.sidebar.new_preset").replace("+ ", "")
+            bg="#2b2b2b",
+            fg="white",
+            selectbackground="gray",
+            activestyle="none",
+            exportselection=False,
+            highlightthickness=0,
+            borderwidth=0,
+            font=get_font(size=13)
+        )
+        self.preset_listbox.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+        self.preset_listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self.preset_listbox.bind("<Double-Button-1>", self._on_listbox_double_click)
+        self.preset_listbox.bind("<Button-3>", self._on_listbox_right_click)
+
+        # Right-click menu for the preset under the cursor
+        self.preset_menu = tk.Menu(self, tearoff=0)
+        self.preset_menu.add_command(
+            label=t("screen_filter.hotkeys.set_title"),
+            command=lambda: self._on_preset_menu_action(self.set_preset_hotkey)
+        )
+        self.preset_menu.add_command(
+            label=t("screen_filter.sidebar.delete_preset"),
+            command=lambda: self._on_preset_menu_action(self._delete_preset_with_check)
         )
-        self.preset_list_frame.grid(row=3, column=0, padx=20, pady=10, sticky="nsew")
+        self._menu_preset: FilterPreset = None
 
         self.reset_defaults_btn = ctk.CTkButton(
             self.sidebar_frame,
@@ -117,7 +190,7 @@ class ScreenFilterUI(ctk.CTkFrame):
         self.preset_title = ctk.CTkLabel(
             self.header_frame,
             text=t("screen_filter.sidebar.preset_name_prompt").replace(":", "..."),
-            font=ctk.CTkFont(size=24, weight="bold")
+            font=get_font(size=24, weight="bold")
         )
         self.preset_title.pack(side="left")
 
@@ -153,7 +226,7 @@ class ScreenFilterUI(ctk.CTkFrame):
         self.validation_warning_label = ctk.CTkLabel(
             self.header_frame,
             text="",
-            font=ctk.CTkFont(size=12),
+            font=get_font(size=12),
             text_color="orange"
         )
 
@@ -164,7 +237,7 @@ class ScreenFilterUI(ctk.CTkFrame):
         ctk.CTkLabel(
             self.monitor_frame,
             text=t("screen_filter.monitors.select"),
-            font=ctk.CTkFont(weight="bold")
+            font=get_font(weight="bold")
         ).pack(anchor="w", padx=10, pady=5)
 
         self.monitor_checkboxes_frame = ctk.CTkFrame(
@@ -177,84 +250,62 @@ class ScreenFilterUI(ctk.CTkFrame):
         self.controls_frame = ctk.CTkFrame(self.main_frame)
         self.controls_frame.pack(fill="both", expand=True)
 
-        # Brightness
-        self._create_slider(self.controls_frame, t("screen_filter.controls.brightness"), "brightness", -100, 100, 0)
-        # Contrast
-        self._create_slider(self.controls_frame, t("screen_filter.controls.contrast"), "contrast", -50, 50, 0)
-        # Gamma
-        self._create_slider(self.controls_frame, t("screen_filter.controls.gamma"), "gamma", 0.5, 3.0, 1.0, step=0.01)
+        # Brightness / Contrast / Gamma
+        for spec in MAIN_SLIDERS:
+            self._create_slider(self.controls_frame, *spec)
 
         # RGB
         ctk.CTkLabel(
             self.controls_frame,
             text="RGB",
-            font=ctk.CTkFont(weight="bold")
+            font=get_font(weight="bold")
         ).pack(anchor="w", padx=20, pady=(20, 5))
 
-        self._create_slider(self.controls_frame, t("screen_filter.controls.red"), "red_scale", 0, 255, 255, step=1, scale_factor=1/255)
-        self._create_slider(self.controls_frame, t("screen_filter.controls.green"), "green_scale", 0, 255, 255, step=1, scale_factor=1/255)
-        self._create_slider(self.controls_frame, t("screen_filter.controls.blue"), "blue_scale", 0, 255, 255, step=1, scale_factor=1/255)
+        for spec in RGB_SLIDERS:
+            self._create_slider(self.controls_frame, *spec)
 
         # Overlay Compensation (Prevent Overexposure)
         ctk.CTkLabel(
             self.controls_frame,
             text=t("screen_filter.overlay_compensation.title"),
-            font=ctk.CTkFont(weight="bold")
+            font=get_font(weight="bold")
         ).pack(anchor="w", padx=20, pady=(20, 5))
 
         ctk.CTkLabel(
             self.controls_frame,
             text=t("screen_filter.overlay_compensation.description"),
-            font=ctk.CTkFont(size=11),
+            font=get_font(size=11),
             text_color="gray60"
         ).pack(anchor="w", padx=20, pady=(0, 5))
 
-        self._create_slider(self.controls_frame, t("screen_filter.overlay_compensation.brightness_offset"), "overlay_brightness_offset", -100, 100, 0)
-        self._create_slider(self.controls_frame, t("screen_filter.overlay_compensation.gamma_offset"), "overlay_gamma_offset", -1.0, 1.0, 0, step=0.01)
-        self._create_slider(self.controls_frame, t("screen_filter.overlay_compensation.contrast_offset"), "overlay_contrast_offset", -50, 50, 0)
+        for spec in OVERLAY_SLIDERS:
+            self._create_slider(self.controls_frame, *spec)
 
-    def _create_slider(self, parent, label, attr_name, min_val, max_val, default_val, step=1, scale_factor=1):
+    def _create_slider(self, parent, label_key, attr_name, min_val, max_val, default_val, step=1):
         frame = ctk.CTkFrame(parent, fg_color="transparent")
         frame.pack(fill="x", padx=20, pady=5)
 
-        lbl = ctk.CTkLabel(frame, text=label, width=150, anchor="w")
+        lbl = ctk.CTkLabel(frame, text=t(label_key), width=150, anchor="w")
         lbl.pack(side="left")
 
         val_lbl = ctk.CTkLabel(frame, text=str(default_val), width=50)
         val_lbl.pack(side="right")
 
+        # Resolve per-slider behaviour once instead of on every drag event
+        format_value = _format_fraction if step < 1 else _format_integer
+        to_algo = UI_TO_ALGO.get(attr_name, _identity)
+
         def on_change(val):
             # Update label
-            if step < 1:
-                val_lbl.configure(text=f"{val:.2f}")
-            else:
-                val_lbl.configure(text=f"{int(val)}")
+            val_lbl.configure(text=format_value(val))
 
             # Update config
             if self.current_preset:
                 # Convert UI value to algorithm value using ValueMapper
-                if attr_name == "brightness":
-                    final_val = ValueMapper.ui_to_algo_brightness(val)
-                elif attr_name == "contrast":
-                    final_val = ValueMapper.ui_to_algo_contrast(val)
-                elif attr_name == "gamma":
-                    final_val = ValueMapper.ui_to_algo_gamma(val)
-                elif attr_name.endswith("_scale"):
-                    final_val = ValueMapper.ui_to_algo_rgb(val)
-                elif attr_name == "overlay_brightness_offset":
-                    final_val = ValueMapper.ui_to_algo_brightness(val)
-                elif attr_name == "overlay_contrast_offset":
-                    final_val = ValueMapper.ui_to_algo_contrast(val)
-                elif attr_name == "overlay_gamma_offset":
-                    # 伽马偏移直接使用值，不需要映射
-                    final_val = val
-                else:
-                    final_val = val
-
-                setattr(self.current_preset.config, attr_name, final_val)
-
-                # Validate and apply
-                self._validate_and_apply_config()
+                setattr(self.current_preset.config, attr_name, to_algo(val))
+
+                # Validate and apply (debounced, drags fire on every step)
+                self._schedule_apply()
 
         slider = ctk.CTkSlider(
             frame,
@@ -265,10 +316,12 @@ class ScreenFilterUI(ctk.CTkFrame):
         )
         slider.set(default_val)
         slider.pack(side="left", fill="x", expand=True, padx=10)
+        # Make sure the final value lands as soon as the drag ends
+        slider.bind("<ButtonRelease-1>", lambda event: self._flush_pending_apply())
 
         # Store reference to update later
-        setattr(self, f"slider_{attr_name}", slider)
-        setattr(self, f"label_{attr_name}", val_lbl)
+        self._sliders[attr_name] = slider
+        self._value_labels[attr_name] = val_lbl
 
     def refresh_monitors(self):
         # Clear existing
@@ -298,7 +351,8 @@ class ScreenFilterUI(ctk.CTkFrame):
 
     def on_monitor_selection_change(self):
         self.update_selected_monitors()
-        self.apply_current_config()
+        # Explicit user action: rewrite the ramp even if the controller thinks it is current
+        self._validate_and_apply_config(force=True)
 
     def on_reset_on_close_change(self):
         """Handle reset_on_close checkbox change"""
@@ -308,44 +362,86 @@ class ScreenFilterUI(ctk.CTkFrame):
         self.selected_monitors = [dev for dev, var in self.monitor_vars.items() if var.get()]
 
     def load_presets_ui(self):
-        # Clear list and button references
-        for widget in self.preset_list_frame.winfo_children():
-            widget.destroy()
-        self.preset_hotkey_buttons.clear()
-
+        """Refill the preset listbox from the config"""
         presets = self.config_manager.get_all_presets()
+        self._listbox_presets = presets
+
+        self.preset_listbox.delete(0, tk.END)
         for p in presets:
-            # Container frame for each preset
-            preset_container = ctk.CTkFrame(self.preset_list_frame, fg_color="transparent")
-            preset_container.pack(fill="x", pady=2)
-
-            # Preset name button
-            btn = ctk.CTkButton(
-                preset_container,
-                text=p.name,
-                command=lambda p=p: self.on_preset_click(p),
-                fg_color="transparent" if self.current_preset != p else "gray",
-                border_width=1,
-                anchor="w"
-            )
-            btn.pack(side="left", fill="x", expand=True)
-
-            # Hotkey button (clickable to change)
-            hotkey_btn = ctk.CTkButton(
-                preset_container,
-                text=p.hotkey or t("screen_filter.hotkeys.not_set"),
-                width=60,
-                fg_color="darkblue",
-                command=lambda p=p: self.set_preset_hotkey(p)
-            )
-            hotkey_btn.pack(side="left", padx=2)
+            self.preset_listbox.insert(tk.END, self._format_preset_row(p))
+
+        self._refresh_selection()
+
+    def _format_preset_row(self, preset: FilterPreset, hotkey_text: str = None) -> str:
+        """Listbox text for a preset: name plus its hotkey"""
+        if hotkey_text is None:
+            hotkey_text = preset.hotkey or t("screen_filter.hotkeys.not_set")
+        return f"{preset.name}  [{hotkey_text}]"
+
+    def _preset_index(self, preset_id: str) -> int:
+        """Listbox index of a preset, or -1 if not listed"""
+        for i, p in enumerate(self._listbox_presets):
+            if p.id == preset_id:
+                return i
+        return -1
+
+    def _set_preset_row_text(self, preset: FilterPreset, hotkey_text: str):
+        """Rewrite one listbox row in place (e.g. for hotkey assignment feedback)"""
+        index = self._preset_index(preset.id)
+        if index < 0:
+            return
+        self.preset_listbox.delete(index)
+        self.preset_listbox.insert(index, self._format_preset_row(preset, hotkey_text))
+        self._refresh_selection()
 
-            # Store button reference for visual feedback during assignment
-            self.preset_hotkey_buttons[p.id] = hotkey_btn
+    def _refresh_selection(self):
+        """Highlight the current preset in the listbox"""
+        self.preset_listbox.selection_clear(0, tk.END)
+        if self.current_preset:
+            index = self._preset_index(self.current_preset.id)
+            if index >= 0:
+                self.preset_listbox.selection_set(index)
+
+    def _on_listbox_select(self, event):
+        selection = self.preset_listbox.curselection()
+        if not selection:
+            return
+        self.on_preset_click(self._listbox_presets[selection[0]])
+        # Delete mode or a cancelled delete must not leave a stale highlight
+        self._refresh_selection()
+
+    def _on_listbox_double_click(self, event):
+        index = self.preset_listbox.nearest(event.y)
+        if 0 <= index < len(self._listbox_presets):
+            self.set_preset_hotkey(self._listbox_presets[index])
+
+    def _on_listbox_right_click(self, event):
+        index = self.preset_listbox.nearest(event.y)
+        if not 0 <= index < len(self._listbox_presets):
+            return
+        self._menu_preset = self._listbox_presets[index]
+        try:
+            self.preset_menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            self.preset_menu.grab_release()
+
+    def _on_preset_menu_action(self, action):
+        if self._menu_preset is not None:
+            action(self._menu_preset)
+            self._menu_preset = None
+
+    def _delete_preset_with_check(self, preset: FilterPreset):
+        """Delete a preset unless it is one of the defaults"""
+        if not preset.is_default:
+            self.delete_preset(preset.id)
+        else:
+            messagebox.showwarning(t("common.warning"), t("screen_filter.sidebar.cannot_delete_default"))
 
     def select_preset(self, preset: FilterPreset):
-        self.current_preset = preset
+        # Edit a private copy: presets from the config manager are shared
+        self.current_preset = copy.deepcopy(preset)
         self.preset_title.configure(text=preset.name)
+        self._refresh_selection()
 
         # Update sliders - convert algorithm values to UI values
         c = preset.config
@@ -361,12 +457,12 @@ class ScreenFilterUI(ctk.CTkFrame):
         self._update_slider("overlay_gamma_offset", c.overlay_gamma_offset)
         self._update_slider("overlay_contrast_offset", ValueMapper.algo_to_ui_contrast(c.overlay_contrast_offset))
 
-        # Validate and apply
-        self._validate_and_apply_config()
+        # Validate and apply (forced: re-selecting a preset restores a ramp the game may have reset)
+        self._validate_and_apply_config(force=True)
 
     def _update_slider(self, attr_name, value):
-        slider = getattr(self, f"slider_{attr_name}")
-        label = getattr(self, f"label_{attr_name}")
+        slider = self._sliders[attr_name]
+        label = self._value_labels[attr_name]
         slider.set(value)
         # Trigger label update
         if isinstance(value, float):
@@ -374,8 +470,29 @@ class ScreenFilterUI(ctk.CTkFrame):
         else:
             label.configure(text=f"{int(value)}")
 
-    def _validate_and_apply_config(self):
-        """Validate config and apply if valid, show warning if not"""
+    def _schedule_apply(self):
+        """Coalesce slider changes into one gamma write per APPLY_DEBOUNCE_MS"""
+        if self._apply_after_id is not None:
+            self.after_cancel(self._apply_after_id)
+        self._apply_after_id = self.after(self.APPLY_DEBOUNCE_MS, self._do_apply)
+
+    def _do_apply(self):
+        """Run the debounced apply"""
+        self._apply_after_id = None
+        self.apply_current_config()
+
+    def _flush_pending_apply(self):
+        """Apply immediately if a debounced apply is still pending"""
+        if self._apply_after_id is not None:
+            self.after_cancel(self._apply_after_id)
+            self._do_apply()
+
+    def _validate_and_apply_config(self, force: bool = False):
+        """
+        Validate config and apply if valid, show warning if not
+
+        Monitors already showing the ramp are skipped by the controller unless force is set.
+        """
         if not self.current_preset or not self.selected_monitors:
             return
 
@@ -386,7 +503,8 @@ class ScreenFilterUI(ctk.CTkFrame):
             # Apply valid configuration
             self.gamma_controller.apply_config(
                 self.current_preset.config,
-                self.selected_monitors
+                self.selected_monitors,
+                force=force
             )
             # Hide warning
             if self.validation_warning_label:
@@ -404,7 +522,8 @@ class ScreenFilterUI(ctk.CTkFrame):
             # Apply safe configuration instead
             self.gamma_controller.apply_config(
                 safe_config,
-                self.selected_monitors
+                self.selected_monitors,
+                force=force
             )
 
         # Apply overlay compensation if overlay window exists
@@ -481,9 +600,8 @@ class ScreenFilterUI(ctk.CTkFrame):
                     return True
             return False
 
-        # Update button text to show visual feedback
-        if preset.id in self.preset_hotkey_buttons:
-            self.preset_hotkey_buttons[preset.id].configure(text=t("screen_filter.hotkeys.press_any"))
+        # Update row text to show visual feedback
+        self._set_preset_row_text(preset, t("screen_filter.hotkeys.press_any"))
 
         # Enter assignment mode immediately (non-blocking)
         self.hotkey_manager.enter_assignment_mode(
@@ -502,6 +620,8 @@ class ScreenFilterUI(ctk.CTkFrame):
 
         # Update preset with new hotkey
         preset.hotkey = key_name
+        if self.current_preset and self.current_preset.id == preset.id:
+            self.current_preset.hotkey = key_name
         self.config_manager.update_preset(preset)
         self.config_manager.save_config()
 
@@ -557,10 +677,7 @@ class ScreenFilterUI(ctk.CTkFrame):
         """Handle preset click - either select or delete depending on mode"""
         if self.delete_mode:
             # In delete mode - try to delete (only non-default presets)
-            if not preset.is_default:
-                self.delete_preset(preset.id)
-            else:
-                messagebox.showwarning(t("common.warning"), t("screen_filter.sidebar.cannot_delete_default"))
+            self._delete_preset_with_check(preset)
         else:
             # Normal mode - select preset
             self.select_preset(preset)
@@ -587,7 +704,7 @@ class ScreenFilterUI(ctk.CTkFrame):
     def reset_to_defaults(self):
         if messagebox.askyesno(t("common.confirm"), t("screen_filter.messages.reset_defaults_confirm")):
             # Reset to default configuration
-            self.config_manager.config = self.config_manager._create_default_config()
+            self.config_manager.reset_to_defaults()
             self.config_manager.save_config()
             self.load_presets_ui()
             self.select_preset(self.config_manager.get_all_presets()[0])
@@ -621,10 +738,11 @@ class ScreenFilterUI(ctk.CTkFrame):
 
     def _apply_preset(self, preset: FilterPreset):
         """Apply a preset configuration"""
-        # Apply screen filter
+        # Apply screen filter (forced: the game may have reset the ramp meanwhile)
         self.gamma_controller.apply_config(
             preset.config,
-            self.selected_monitors
+            self.selected_monitors,
+            force=True
         )
         # Apply overlay compensation
         self._apply_overlay_compensation(preset.config)
@@ -633,6 +751,11 @@ class ScreenFilterUI(ctk.CTkFrame):
         """Clean up resources when tab is closed"""
         self.running = False
 
+        # Drop any pending debounced apply
+        if self._apply_after_id is not None:
+            self.after_cancel(self._apply_after_id)
+            self._apply_after_id = None
+
         # Unregister all hotkeys
         self._unregister_preset_hotkeys()
 
@@ -641,3 +764,6 @@ class ScreenFilterUI(ctk.CTkFrame):
             print("[屏幕滤镜] 应用关闭，正在重置滤镜...")
             self.gamma_controller.reset_monitors(self.selected_monitors)
             print("[屏幕滤镜] 滤镜已重置")
+
+        # Release the monitor DCs held by the gamma controller
+        self.gamma_controller.close()
@@ -0,0 +1,33 @@
+"""
+Shared CTkFont instances
+
+Every CTkFont registers a named font with Tk, so widgets share one instance
+per (size, weight) instead of constructing a new font each time.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import customtkinter as ctk
+
+
+_fonts: Dict[Tuple[Optional[int], str], ctk.CTkFont] = {}
+
+
+def get_font(size: Optional[int] = None, weight: str = "normal") -> ctk.CTkFont:
+    """
+    Get the shared font for a size/weight pair (created on first use,
+    which must happen after the Tk root window exists)
+
+    Args:
+        size: Font size, None for the theme default
+        weight: "normal" or "bold"
+
+    Returns:
+        Shared CTkFont instance - do not configure() it
+    """
+    key = (size, weight)
+    font = _fonts.get(key)
+    if font is None:
+        font = ctk.CTkFont(size=size, weight=weight)
+        _fonts[key] = font
+    return font
@@ -5,7 +5,7 @@
 
 import json
 import os
-from typing import Callable, Optional
+from typing import Callable, Optional, Tuple
 from pathlib import Path
 
 
@@ -36,6 +36,9 @@ class GlobalConfig:
         # 回调函数列表
         self._callbacks: list[Callable[[str, str], None]] = []
 
+        # 路径自动检测结果缓存（仅内存）: {path_type: (value, timestamp)}
+        self._detection_cache: dict[str, Tuple[str, float]] = {}
+
         # 加载配置
         self._load_config()
 
@@ -153,6 +156,31 @@ class GlobalConfig:
             self._notify_change('language', language)
             print(f"[全局配置] 语言已更新: {old_lang} -> {language}")
 
+    # ========== 路径检测缓存 ==========
+
+    def get_detection_cache(self, path_type: str) -> Optional[Tuple[str, float]]:
+        """
+        获取路径自动检测的缓存结果
+
+        Args:
+            path_type: 路径类型 ('screenshots_path' / 'logs_path')
+
+        Returns:
+            (检测结果, 检测时间戳)，未检测过则返回None；检测结果可能为空字符串（未找到）
+        """
+        return self._detection_cache.get(path_type)
+
+    def set_detection_cache(self, path_type: str, value: str, timestamp: float):
+        """
+        记录路径自动检测结果（包括未找到的结果）
+
+        Args:
+            path_type: 路径类型 ('screenshots_path' / 'logs_path')
+            value: 检测结果
+            timestamp: 检测时间 (time.time())
+        """
+        self._detection_cache[path_type] = (value, timestamp)
+
     # ========== 通用配置存储 ==========
 
     def get(self, key: str, default=None):
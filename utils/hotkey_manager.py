@@ -1,15 +1,27 @@
 """
 Unified Global Hotkey Manager for T2 Tarkov Toolbox
-Centralizes all keyboard monitoring into a single thread to avoid threading conflicts
+Centralizes all keyboard monitoring on the keyboard library's global hook,
+so hotkeys are dispatched by OS key events instead of a polling thread
 """
 
-import keyboard
 import threading
 import time
-from typing import Optional, Callable, Dict
+from typing import Optional, Callable, Dict, Any
 from dataclasses import dataclass, field
 
 
+_keyboard_module = None
+
+
+def _keyboard():
+    """Import the keyboard library on first use (it installs a low-level hook DLL)"""
+    global _keyboard_module
+    if _keyboard_module is None:
+        import keyboard
+        _keyboard_module = keyboard
+    return _keyboard_module
+
+
 @dataclass
 class HotkeyBinding:
     """Represents a registered hotkey"""
@@ -18,7 +30,8 @@ class HotkeyBinding:
     callback: Callable[[], None]  # Function to call when pressed
     context: str = "global"     # "global" or tab name for context-awareness
     debounce: float = 0.2       # Debounce time in seconds
-    last_triggered: float = 0.0  # Timestamp of last trigger
+    last_triggered: float = 0.0  # time.monotonic() of last trigger
+    handle: Any = None          # keyboard.on_press_key handle while hooked
 
 
 @dataclass
@@ -34,7 +47,7 @@ class AssignmentRequest:
 class HotkeyManager:
     """
     Unified global hotkey manager - Singleton
-    Manages all application hotkeys in a single thread
+    Manages all application hotkeys via keyboard.on_press_key callbacks
     """
 
     _instance = None
@@ -53,50 +66,52 @@ class HotkeyManager:
         self._hotkey_registry: Dict[str, HotkeyBinding] = {}
         self._assignment_mode: Optional[AssignmentRequest] = None
 
-        # Thread management
-        self._thread: Optional[threading.Thread] = None
+        # Hook management
         self._running = False
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._assignment_hook = None
+        self._assignment_timer: Optional[threading.Timer] = None
+        self._suppress_until = 0.0  # Ignore hotkeys right after an assignment
 
         # Context management
         self._current_context = "global"
 
-        # Polling configuration
-        self.POLL_INTERVAL = 0.1  # 100ms polling
+        # Debounce configuration
         self.DEBOUNCE_TIME = 0.2  # 200ms debounce
+        self.ASSIGNMENT_COOLDOWN = 0.5  # Ignore the captured key's repeats
+
+        # Error reporting backoff for the hook thread
+        self._error_streak = 0
+        self._error_quiet_until = 0.0
+        self.ERROR_BACKOFF_MAX = 5.0
 
         self._initialized = True
         print("[HotkeyManager] Initialized")
 
     def start(self):
-        """Start the hotkey monitoring thread"""
-        if self._running:
-            print("[HotkeyManager] Already running")
-            return
+        """Hook all registered hotkeys into the keyboard library"""
+        with self._lock:
+            if self._running:
+                print("[HotkeyManager] Already running")
+                return
 
-        self._running = True
-        self._thread = threading.Thread(
-            target=self._hotkey_loop,
-            daemon=True,
-            name="HotkeyManager"
-        )
-        self._thread.start()
+            self._running = True
+            for binding in self._hotkey_registry.values():
+                self._hook_binding(binding)
         print("[HotkeyManager] Started")
 
     def stop(self):
-        """Stop the hotkey monitoring thread"""
-        if not self._running:
-            return
-
-        print("[HotkeyManager] Stopping...")
-        self._running = False
+        """Remove every keyboard hook installed by the manager"""
+        with self._lock:
+            if not self._running:
+                return
 
-        # Wait for thread to finish (with timeout)
-        if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=2.0)
+            print("[HotkeyManager] Stopping...")
+            self._running = False
 
-            if self._thread.is_alive():
-                print("[HotkeyManager] Warning: Thread did not stop cleanly")
+            for binding in self._hotkey_registry.values():
+                self._unhook_binding(binding)
+            self._clear_assignment_mode()
 
         print("[HotkeyManager] Stopped")
 
@@ -128,6 +143,10 @@ class HotkeyManager:
                     print(f"[HotkeyManager] Key '{key}' already registered to '{existing_id}'")
                     return False
 
+            # Replace any previous binding with the same ID
+            if hotkey_id in self._hotkey_registry:
+                self._unhook_binding(self._hotkey_registry[hotkey_id])
+
             # Register the hotkey
             binding = HotkeyBinding(
                 hotkey_id=hotkey_id,
@@ -138,6 +157,8 @@ class HotkeyManager:
             )
 
             self._hotkey_registry[hotkey_id] = binding
+            if self._running:
+                self._hook_binding(binding)
             print(f"[HotkeyManager] Registered: {hotkey_id} -> {key} (context: {context})")
             return True
 
@@ -154,6 +175,7 @@ class HotkeyManager:
         with self._lock:
             if hotkey_id in self._hotkey_registry:
                 binding = self._hotkey_registry.pop(hotkey_id)
+                self._unhook_binding(binding)
                 print(f"[HotkeyManager] Unregistered: {hotkey_id} ({binding.key})")
                 return True
             else:
@@ -178,7 +200,10 @@ class HotkeyManager:
 
             binding = self._hotkey_registry[hotkey_id]
             old_key = binding.key
+            self._unhook_binding(binding)
             binding.key = new_key.upper()
+            if self._running:
+                self._hook_binding(binding)
             print(f"[HotkeyManager] Updated: {hotkey_id} from {old_key} to {new_key}")
             return True
 
@@ -206,12 +231,27 @@ class HotkeyManager:
                 print(f"[HotkeyManager] Already in assignment mode for {self._assignment_mode.requester_id}")
                 return False
 
-            self._assignment_mode = AssignmentRequest(
+            request = AssignmentRequest(
                 requester_id=requester_id,
                 callback=callback,
                 conflict_check=conflict_check,
                 timeout=timeout
             )
+            self._assignment_mode = request
+
+            try:
+                self._assignment_hook = _keyboard().on_press(self._handle_assignment_event)
+            except Exception as e:
+                print(f"[HotkeyManager] Error hooking assignment mode: {e}")
+                self._assignment_mode = None
+                return False
+
+            # Expire the request without a polling loop
+            self._assignment_timer = threading.Timer(
+                timeout, self._on_assignment_timeout, args=(request,)
+            )
+            self._assignment_timer.daemon = True
+            self._assignment_timer.start()
 
             print(f"[HotkeyManager] Entered assignment mode for {requester_id}")
             return True
@@ -223,7 +263,7 @@ class HotkeyManager:
                 return False
 
             print(f"[HotkeyManager] Cancelled assignment mode for {self._assignment_mode.requester_id}")
-            self._assignment_mode = None
+            self._clear_assignment_mode()
             return True
 
     def set_active_context(self, context: str):
@@ -249,120 +289,169 @@ class HotkeyManager:
         with self._lock:
             return self._hotkey_registry.get(hotkey_id)
 
-    def _hotkey_loop(self):
-        """Main polling loop - runs in dedicated thread"""
-        print("[HotkeyManager] Hotkey loop started")
+    @staticmethod
+    def _split_key(key: str):
+        """Split "CTRL+S" into the trigger key and its modifiers ("+" alone is a key)"""
+        parts = key.lower().split("+") if len(key) > 1 else [key.lower()]
+        return parts[-1], parts[:-1]
 
-        while self._running:
-            try:
-                # Assignment mode takes priority
-                if self._assignment_mode:
-                    self._handle_assignment_mode()
-                    continue
-
-                # Normal detection mode
-                active_hotkeys = self._get_active_hotkeys()
-
-                current_time = time.time()
-
-                for binding in active_hotkeys:
-                    # Skip if still in debounce period
-                    if current_time - binding.last_triggered < binding.debounce:
-                        continue
-
-                    # Check if key is pressed
-                    try:
-                        if keyboard.is_pressed(binding.key):
-                            binding.last_triggered = current_time
-
-                            # Call callback in separate thread to avoid blocking
-                            threading.Thread(
-                                target=self._safe_callback,
-                                args=(binding.callback,),
-                                daemon=True
-                            ).start()
-
-                            print(f"[HotkeyManager] Hotkey triggered: {binding.hotkey_id} ({binding.key})")
+    def _hook_binding(self, binding: HotkeyBinding):
+        """
+        Install the keyboard hook for a binding (caller holds the lock)
 
-                    except Exception as e:
-                        print(f"[HotkeyManager] Error checking key {binding.key}: {e}")
-                        continue
+        Hooks the trigger key itself rather than using add_hotkey: add_hotkey only
+        fires when exactly that combination is down, so holding a movement key or
+        Shift in game would block it. Modifiers are checked when the key fires.
+        """
+        trigger, modifiers = self._split_key(binding.key)
+        hotkey_id = binding.hotkey_id
+        try:
+            binding.handle = _keyboard().on_press_key(
+                trigger,
+                lambda event: self._on_hotkey(hotkey_id, modifiers)
+            )
+        except Exception as e:
+            binding.handle = None
+            print(f"[HotkeyManager] Error hooking key {binding.key}: {e}")
 
-                time.sleep(self.POLL_INTERVAL)
+    def _unhook_binding(self, binding: HotkeyBinding):
+        """Remove the keyboard hook for a binding (caller holds the lock)"""
+        if binding.handle is None:
+            return
 
-            except Exception as e:
-                print(f"[HotkeyManager] Error in hotkey loop: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(0.5)
+        try:
+            _keyboard().unhook(binding.handle)
+        except (KeyError, ValueError) as e:
+            print(f"[HotkeyManager] Error unhooking key {binding.key}: {e}")
+        binding.handle = None
 
-        print("[HotkeyManager] Hotkey loop stopped")
+    def _on_hotkey(self, hotkey_id: str, modifiers=()):
+        """Dispatch a hotkey event - runs in the keyboard library's hook thread"""
+        try:
+            if modifiers and not all(_keyboard().is_pressed(m) for m in modifiers):
+                return
+        except Exception as e:
+            self._report_error("Error checking modifiers", e)
+            return
 
-    def _handle_assignment_mode(self):
+        with self._lock:
+            # Assignment mode takes priority
+            if self._assignment_mode is not None:
+                return
+
+            binding = self._hotkey_registry.get(hotkey_id)
+            if binding is None:
+                return
+
+            # Only global hotkeys and hotkeys of the current context are active
+            if binding.context != "global" and binding.context != self._current_context:
+                return
+
+            # Skip if still in debounce period
+            current_time = time.monotonic()
+            if current_time < self._suppress_until:
+                return
+            if current_time - binding.last_triggered < binding.debounce:
+                return
+            binding.last_triggered = current_time
+            callback = binding.callback
+
+        # Call callback in separate thread so a slow callback can't block the hook
+        threading.Thread(
+            target=self._safe_callback,
+            args=(callback,),
+            daemon=True
+        ).start()
+
+        print(f"[HotkeyManager] Hotkey triggered: {binding.hotkey_id} ({binding.key})")
+
+    def _handle_assignment_event(self, event):
         """Handle key capture during assignment mode"""
         request = self._assignment_mode
-
-        # Check timeout
-        if time.time() - request.start_time > request.timeout:
-            print(f"[HotkeyManager] Assignment mode timeout for {request.requester_id}")
-            with self._lock:
-                self._assignment_mode = None
+        if request is None or event.name is None:
             return
 
         try:
-            # Read key event (blocking, but with short timeout via loop)
-            event = keyboard.read_event(suppress=False)
+            key_name = event.name.upper()
 
-            if event.event_type == keyboard.KEY_DOWN:
-                key_name = event.name.upper()
+            print(f"[HotkeyManager] Captured key: {key_name}")
 
-                print(f"[HotkeyManager] Captured key: {key_name}")
+            # Check for conflicts
+            has_conflict = False
+            if request.conflict_check:
+                has_conflict = request.conflict_check(key_name)
 
-                # Check for conflicts
-                has_conflict = False
-                if request.conflict_check:
-                    has_conflict = request.conflict_check(key_name)
+            if has_conflict:
+                # Keep waiting for another key
+                print(f"[HotkeyManager] Key '{key_name}' conflicts for {request.requester_id}")
+                return
 
-                if not has_conflict:
-                    # Success - call callback with captured key
-                    print(f"[HotkeyManager] Key '{key_name}' accepted for {request.requester_id}")
+            with self._lock:
+                if self._assignment_mode is not request:
+                    return
+                # Clear assignment mode first
+                self._clear_assignment_mode()
+                self._suppress_until = time.monotonic() + self.ASSIGNMENT_COOLDOWN
+
+            # Success - call callback with captured key
+            print(f"[HotkeyManager] Key '{key_name}' accepted for {request.requester_id}")
+
+            # Call callback in separate thread
+            threading.Thread(
+                target=request.callback,
+                args=(key_name,),
+                daemon=True
+            ).start()
 
-                    # Clear assignment mode first
-                    with self._lock:
-                        self._assignment_mode = None
+        except Exception as e:
+            self._report_error("Error in assignment mode", e)
 
-                    # Call callback in separate thread
-                    threading.Thread(
-                        target=request.callback,
-                        args=(key_name,),
-                        daemon=True
-                    ).start()
+    def _on_assignment_timeout(self, request: AssignmentRequest):
+        """Expire an assignment request that captured no key"""
+        with self._lock:
+            if self._assignment_mode is not request:
+                return
 
-                    time.sleep(0.5)  # Debounce
-                else:
-                    print(f"[HotkeyManager] Key '{key_name}' conflicts for {request.requester_id}")
-                    time.sleep(0.5)  # Debounce
+            print(f"[HotkeyManager] Assignment mode timeout for {request.requester_id}")
+            self._clear_assignment_mode()
 
-        except Exception as e:
-            print(f"[HotkeyManager] Error in assignment mode: {e}")
-            time.sleep(0.1)
+    def _clear_assignment_mode(self):
+        """Drop the current assignment request and its hook (caller holds the lock)"""
+        self._assignment_mode = None
 
-    def _get_active_hotkeys(self):
-        """Get hotkeys active in current context"""
-        with self._lock:
-            active = []
-            for binding in self._hotkey_registry.values():
-                # Include global hotkeys and context-specific hotkeys
-                if binding.context == "global" or binding.context == self._current_context:
-                    active.append(binding)
-            return active
+        if self._assignment_timer is not None:
+            self._assignment_timer.cancel()
+            self._assignment_timer = None
+
+        if self._assignment_hook is not None:
+            try:
+                _keyboard().unhook(self._assignment_hook)
+            except (KeyError, ValueError) as e:
+                print(f"[HotkeyManager] Error unhooking assignment mode: {e}")
+            self._assignment_hook = None
 
     def _safe_callback(self, callback: Callable[[], None]):
         """Safely execute callback with exception handling"""
         try:
             callback()
+            self._error_streak = 0
         except Exception as e:
-            print(f"[HotkeyManager] Callback error: {e}")
+            self._report_error("Callback error", e)
+
+    def _report_error(self, message: str, error: Exception):
+        """
+        Print an error from the hook thread with backoff: a persistent error
+        (e.g. on every key repeat) is reported at most once per backoff window,
+        doubling up to ERROR_BACKOFF_MAX, so console output can't pile up
+        """
+        self._error_streak = min(self._error_streak + 1, 6)
+        now = time.monotonic()
+        if now < self._error_quiet_until:
+            return
+
+        self._error_quiet_until = now + min(0.1 * (2 ** self._error_streak), self.ERROR_BACKOFF_MAX)
+        print(f"[HotkeyManager] {message} (streak={self._error_streak}): {error}")
+        if self._error_streak == 1:
             import traceback
             traceback.print_exc()
 
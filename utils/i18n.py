@@ -5,7 +5,7 @@ i18n 翻译管理器 - 单例模式
 
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict
 
 
 class I18nManager:
@@ -26,6 +26,7 @@ class I18nManager:
         self.locales_dir = Path(__file__).parent.parent / "locales"
         self.current_language = None  # 延迟初始化，首次调用t()时从配置读取
         self.translations = {}
+        self._lookup_cache: Dict[str, Optional[str]] = {}  # 键 -> 已解析的翻译（切换语言时清空）
 
         # 不再立即加载 - 改为首次调用t()时自动加载
 
@@ -43,6 +44,7 @@ class I18nManager:
     def _load_translations(self):
         """从JSON文件加载翻译"""
         locale_file = self.locales_dir / f"{self.current_language}.json"
+        self._lookup_cache.clear()
 
         if not locale_file.exists():
             print(f"[i18n] 警告：翻译文件不存在 {locale_file}")
@@ -76,16 +78,7 @@ class I18nManager:
             self.current_language = config.get_language()
             self._load_translations()
 
-        # 支持嵌套键
-        keys = key.split('.')
-        value = self.translations
-
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                value = None
-                break
+        value = self._lookup(key)
 
         if value is None:
             print(f"[i18n] 缺失翻译键: {key}")
@@ -102,6 +95,25 @@ class I18nManager:
 
         return value
 
+    def _lookup(self, key: str) -> Optional[str]:
+        """解析点分隔的翻译键，结果按键缓存"""
+        try:
+            return self._lookup_cache[key]
+        except KeyError:
+            pass
+
+        # 支持嵌套键
+        value = self.translations
+        for k in key.split('.'):
+            if isinstance(value, dict):
+                value = value.get(k)
+            else:
+                value = None
+                break
+
+        self._lookup_cache[key] = value
+        return value
+
 
 # 全局单例实例
 _i18n_manager = I18nManager()
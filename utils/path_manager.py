@@ -7,7 +7,9 @@
 T2-Tarkov-Toolbox.exe (或开发目录)
 ├── config/              # 配置文件目录（自动创建）
 │   ├── filter_config.json
-│   └── map_config.json
+│   └── map_config/     # 地图配置（按地图分片）
+│       ├── maps/       # 每个地图一个文件: <map_id>.json
+│       └── floating_map.json
 ├── assets/              # 资源目录（自动创建）
 │   └── maps/           # 地图图片目录
 │       ├── bigmap/     # 各地图子目录